@@ -0,0 +1,195 @@
+import math
+import threading
+from collections import OrderedDict, deque
+
+EMA_SPAN = 7
+TRADING_DAYS = 252
+# (pair, window) statistics kept up to date; the least recently viewed go first
+MAX_TRACKED = 64
+
+class _Welford:
+    """Running mean and squared deviations with O(1) add and remove"""
+
+    __slots__ = ("n", "mean", "m2")
+
+    def __init__(self, n=0, mean=0.0, m2=0.0):
+        self.n, self.mean, self.m2 = n, mean, m2
+
+    def add(self, x):
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.n <= 1:
+            self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        self.n -= 1
+        delta = x - self.mean
+        self.mean -= delta / self.n
+        self.m2 -= delta * (x - self.mean)
+
+    def with_value(self, x):
+        """Copy including one more value"""
+        copy = _Welford(self.n, self.mean, self.m2)
+        copy.add(x)
+        return copy
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas)"""
+        return math.sqrt(max(self.m2, 0.0) / (self.n - 1)) if self.n > 1 else 0.0
+
+class RollingPairStats:
+    """Time-windowed statistics of one daily rate series, updated in O(1)
+
+    Holds the points of the last ``days`` days: Welford mean/variance of the
+    rates and of their log returns, monotonic deques for the rolling min and
+    max, running least-squares sums for the trend and an EMA. The newest
+    point stays provisional so that a later snapshot on the same day
+    replaces it instead of adding a second point.
+    """
+
+    def __init__(self, days, ema_span=EMA_SPAN):
+        self.days = days
+        self.alpha = 2.0 / (ema_span + 1)
+        self._points = deque()
+        self._mins = deque()
+        self._maxs = deque()
+        self._returns = deque()
+        self._rates = _Welford()
+        self._log_returns = _Welford()
+        self._sums = [0.0, 0.0, 0.0, 0.0]  # t, y, t*t, t*y
+        self._ema = None
+        self._origin = None
+        self._pending = None
+
+    def add(self, day, value):
+        """Add the closing rate of ``day`` (an ordinal); same-day calls replace it"""
+        if self._origin is None:
+            self._origin = day
+        if self._pending is not None:
+            if day < self._pending[0]:
+                return
+            if day > self._pending[0]:
+                self._commit(*self._pending)
+        self._pending = (day, value)
+        while self._points and self._points[0][0] < day - self.days:
+            self._evict()
+
+    def _commit(self, day, value):
+        if self._points:
+            log_return = math.log(value / self._points[-1][1])
+            self._returns.append(log_return)
+            self._log_returns.add(log_return)
+        self._points.append((day, value))
+        self._rates.add(value)
+        t = day - self._origin
+        for i, term in enumerate((t, value, t * t, t * value)):
+            self._sums[i] += term
+        while self._mins and self._mins[-1][1] >= value:
+            self._mins.pop()
+        self._mins.append((day, value))
+        while self._maxs and self._maxs[-1][1] <= value:
+            self._maxs.pop()
+        self._maxs.append((day, value))
+        self._ema = value if self._ema is None else self.alpha * value + (1 - self.alpha) * self._ema
+
+    def _evict(self):
+        day, value = self._points.popleft()
+        self._rates.remove(value)
+        if self._returns:
+            self._log_returns.remove(self._returns.popleft())
+        t = day - self._origin
+        for i, term in enumerate((t, value, t * t, t * value)):
+            self._sums[i] -= term
+        if self._mins[0][0] == day:
+            self._mins.popleft()
+        if self._maxs[0][0] == day:
+            self._maxs.popleft()
+
+    def summary(self):
+        """Current statistics including the provisional newest point, or None"""
+        if self._pending is None:
+            return None
+        day, value = self._pending
+        rates = self._rates.with_value(value)
+        log_returns = self._log_returns
+        if self._points:
+            log_returns = log_returns.with_value(math.log(value / self._points[-1][1]))
+        previous = self._points[-1][1] if self._points else value
+
+        t = day - self._origin
+        n = rates.n
+        sum_t, sum_y, sum_tt, sum_ty = (s + term for s, term in zip(self._sums, (t, value, t * t, t * value)))
+        denominator = n * sum_tt - sum_t * sum_t
+        slope = (n * sum_ty - sum_t * sum_y) / denominator if denominator else 0.0
+        intercept = (sum_y - slope * sum_t) / n
+        ema = value if self._ema is None else self.alpha * value + (1 - self.alpha) * self._ema
+
+        return {
+            "current": value,
+            "previous": previous,
+            "count": n,
+            "mean": rates.mean,
+            "std": rates.std,
+            "min": min(self._mins[0][1], value) if self._mins else value,
+            "max": max(self._maxs[0][1], value) if self._maxs else value,
+            "trend_slope": slope,
+            "trend_intercept": intercept,
+            "trend_origin": self._origin,
+            "log_return_mean": log_returns.mean,
+            "log_return_std": log_returns.std,
+            "annualized_volatility": log_returns.std * math.sqrt(TRADING_DAYS),
+            "ema": ema,
+        }
+
+def trend_values(summary, ordinals):
+    """Trend-line values of a summary at the given day ordinals (scalar or array)"""
+    return summary["trend_intercept"] + summary["trend_slope"] * (ordinals - summary["trend_origin"])
+
+class AnalyticsBook:
+    """Rolling statistics per (pair, window), seeded once from history
+
+    ``on_snapshot`` is a ``RateStore`` listener that feeds every tracked
+    pair its new rate in O(1). At most ``maxsize`` entries are tracked,
+    evicting the least recently viewed.
+    """
+
+    def __init__(self, load_history, history_generation=lambda: 0, maxsize=MAX_TRACKED):
+        self._load_history = load_history
+        self._history_generation = history_generation
+        self._generation = None
+        self.maxsize = maxsize
+        self._stats = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _reseed_if_rewritten(self):
+        """Drop every seeded entry once the history was merged into, e.g. by an import in another process"""
+        generation = self._history_generation()
+        if generation != self._generation:
+            self._stats.clear()
+            self._generation = generation
+
+    def stats(self, from_currency, to_currency, days):
+        key = (from_currency, to_currency, days)
+        with self._lock:
+            self._reseed_if_rewritten()
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = RollingPairStats(days)
+                for day, value in zip(*self._load_history(from_currency, to_currency, days)):
+                    stats.add(int(day), float(value))
+                self._stats[key] = stats
+                if len(self._stats) > self.maxsize:
+                    self._stats.popitem(last=False)
+            self._stats.move_to_end(key)
+            return stats.summary()
+
+    def on_snapshot(self, rates, timestamp):
+        day = timestamp.date().toordinal()
+        with self._lock:
+            for (from_currency, to_currency, _), stats in self._stats.items():
+                if from_currency in rates and to_currency in rates:
+                    stats.add(day, rates[to_currency] / rates[from_currency])
@@ -0,0 +1,206 @@
+import argparse
+import asyncio
+import functools
+import io
+import math
+import numpy as np
+from aiohttp import web
+from batch_convert import convert_batch, convert_batch_exact, convert_csv
+from exact_conversion import ROUNDING_MODES
+from currency_core import RATES_UNAVAILABLE, convert, get_metrics, get_rate_matrix, pair_history
+from metrics import METRICS_ENABLED, timer
+
+MAX_HISTORY_DAYS = 3650
+# Larger amounts lose cents in float64 and overflow minor units on the exact path
+MAX_AMOUNT = 1e15
+
+def error_response(message, status=400):
+    return web.json_response({"error": message}, status=status)
+
+def parse_rounding(value):
+    """Rounding mode from a query/body value; None selects float conversion"""
+    if value in (None, ""):
+        return None
+    if value not in ROUNDING_MODES:
+        raise ValueError(f"rounding must be one of {', '.join(ROUNDING_MODES)}")
+    return value
+
+def parse_amount(value):
+    """Finite amount within MAX_AMOUNT from a query value"""
+    amount = float(value)
+    if not math.isfinite(amount) or abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"amount must be a finite number of at most {MAX_AMOUNT:g} in absolute value")
+    return amount
+
+def parse_codes(value, rows, field):
+    """A batch's ``from``/``to`` field: one code for every row or a list of codes"""
+    if isinstance(value, str):
+        return [value] * rows
+    if isinstance(value, list) and all(isinstance(code, str) for code in value):
+        return value
+    raise ValueError(f"{field} must be a currency code or a list of currency codes")
+
+def json_number(value):
+    """JSON-safe number: NaN becomes null, Decimals become strings"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    return str(value)
+
+async def handle_convert(request):
+    """GET /convert?from=USD&to=INR&amount=100[&rounding=ROUND_HALF_EVEN]"""
+    query = request.query
+    try:
+        from_currency = query["from"].upper()
+        to_currency = query["to"].upper()
+        amount = parse_amount(query.get("amount", 1))
+        rounding = parse_rounding(query.get("rounding"))
+        rate_matrix = get_rate_matrix()
+        converted, rate = convert(amount, from_currency, to_currency, rounding, rate_matrix)
+    except KeyError as e:
+        return error_response(f"Unknown currency or missing parameter: {e}")
+    except RATES_UNAVAILABLE:
+        return error_response("Exchange rates are unavailable", status=503)
+    except (ValueError, ArithmeticError) as e:
+        return error_response(str(e) or type(e).__name__)
+    return web.json_response({
+        "from": from_currency,
+        "to": to_currency,
+        "amount": json_number(amount),
+        "converted_amount": json_number(converted),
+        "rate": rate,
+        "timestamp": rate_matrix.timestamp.isoformat()
+    })
+
+async def handle_rates(request):
+    """GET /rates?base=USD[&symbols=EUR,GBP]"""
+    base_currency = request.query.get("base", "USD").upper()
+    symbols = request.query.get("symbols")
+    try:
+        rate_matrix = get_rate_matrix()
+        currencies = symbols.upper().split(",") if symbols else None
+        if base_currency not in rate_matrix:
+            raise KeyError(base_currency)
+        rates = rate_matrix.rates_for(base_currency, currencies)
+    except KeyError as e:
+        return error_response(f"Unknown currency: {e}")
+    except RATES_UNAVAILABLE:
+        return error_response("Exchange rates are unavailable", status=503)
+    return web.json_response({
+        "base": base_currency,
+        "timestamp": rate_matrix.timestamp.isoformat(),
+        "rates": rates
+    })
+
+async def handle_batch(request):
+    """POST /batch with a JSON body or a CSV ledger
+
+    JSON: ``{"amounts": [...], "from": "USD" | [...], "to": "EUR" | [...],
+    "rounding": optional}``. CSV bodies (``Content-Type: text/csv``) are
+    converted like ``batch_convert.py`` with ``from``/``to``/``rounding``
+    taken from the query string.
+    """
+    try:
+        rate_matrix = get_rate_matrix()
+    except RATES_UNAVAILABLE:
+        return error_response("Exchange rates are unavailable", status=503)
+
+    try:
+        if request.content_type == "text/csv":
+            query = request.query
+            output = io.StringIO()
+            source = io.StringIO(await request.text())
+            # Large ledgers convert off the event loop so other requests keep being served
+            await asyncio.get_running_loop().run_in_executor(None, functools.partial(
+                convert_csv, rate_matrix, source, output, default_from=query.get("from"),
+                default_to=query.get("to"), rounding=parse_rounding(query.get("rounding"))
+            ))
+            return web.Response(text=output.getvalue(), content_type="text/csv")
+
+        body = await request.json()
+        if not isinstance(body, dict):
+            raise ValueError("body must be a JSON object")
+        amounts = np.asarray(body["amounts"], dtype=np.float64) if isinstance(body["amounts"], list) else None
+        if amounts is None or amounts.ndim != 1:
+            raise ValueError("amounts must be a list of numbers")
+        from_codes = parse_codes(body["from"], len(amounts), "from")
+        to_codes = parse_codes(body["to"], len(amounts), "to")
+        if not len(amounts) == len(from_codes) == len(to_codes):
+            raise ValueError("amounts, from and to must have the same length")
+        rounding = parse_rounding(body.get("rounding"))
+        if rounding is None:
+            rates, converted = convert_batch(rate_matrix, amounts, from_codes, to_codes)
+            converted = [json_number(value) for value in converted.tolist()]
+        else:
+            rates, converted = convert_batch_exact(rate_matrix, amounts, from_codes, to_codes, rounding)
+            converted = [value or None for value in converted.tolist()]
+    except KeyError as e:
+        return error_response(f"Missing field: {e}")
+    except (TypeError, ValueError) as e:
+        return error_response(str(e))
+    return web.json_response({
+        "timestamp": rate_matrix.timestamp.isoformat(),
+        "rates": [json_number(rate) for rate in rates.tolist()],
+        "converted_amounts": converted
+    })
+
+async def handle_history(request):
+    """GET /history?from=USD&to=INR&days=30"""
+    query = request.query
+    try:
+        from_currency = query["from"].upper()
+        to_currency = query["to"].upper()
+        days = int(query.get("days", 30))
+        if not 1 <= days <= MAX_HISTORY_DAYS:
+            raise ValueError(f"days must be between 1 and {MAX_HISTORY_DAYS}")
+    except KeyError as e:
+        return error_response(f"Missing parameter: {e}")
+    except ValueError as e:
+        return error_response(str(e))
+    dates, rates = pair_history(from_currency, to_currency, days)
+    return web.json_response({
+        "from": from_currency,
+        "to": to_currency,
+        "dates": dates.astype(str).tolist(),
+        "rates": rates.tolist()
+    })
+
+async def handle_metrics(request):
+    """GET /metrics in the Prometheus text format"""
+    return web.Response(text=get_metrics().export(), content_type="text/plain", charset="utf-8")
+
+@web.middleware
+async def time_requests(request, handler):
+    """Time each request under its route, so unknown paths share one series"""
+    resource = request.match_info.route.resource
+    with timer(f"api {resource.canonical if resource else 'unmatched'}"):
+        return await handler(request)
+
+def create_app():
+    """aiohttp application serving the shared rate engine"""
+    app = web.Application(middlewares=[time_requests] if METRICS_ENABLED else [])
+    app.add_routes([
+        web.get("/convert", handle_convert),
+        web.get("/rates", handle_rates),
+        web.post("/batch", handle_batch),
+        web.get("/history", handle_history),
+        web.get("/metrics", handle_metrics),
+    ])
+    app.on_startup.append(warm_rate_store)
+    return app
+
+async def warm_rate_store(app):
+    """Load the first snapshot off the event loop so requests never fetch inline"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, get_rate_matrix)
+    except RATES_UNAVAILABLE:
+        pass
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Currency conversion REST/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args(argv)
+    web.run_app(create_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import numpy as np
+
+# Cycles returning less than this fraction over break-even are ignored (1 basis point)
+DEFAULT_THRESHOLD = 1e-4
+
+def quote_matrix(snapshots, codes):
+    """Best cross quote per pair across several ``{code: rate}`` snapshots
+
+    Each snapshot alone is internally consistent; taking the best rate for
+    every pair over all sources exposes the drift between them. Pairs no
+    snapshot quotes are NaN.
+    """
+    quotes = np.full((len(codes), len(codes)), np.nan)
+    for rates in snapshots:
+        base_rates = np.array([rates.get(code, np.nan) for code in codes], dtype=np.float64)
+        cross = base_rates[np.newaxis, :] / base_rates[:, np.newaxis]
+        quotes = np.fmax(quotes, cross)
+    np.fill_diagonal(quotes, np.nan)
+    return quotes
+
+def scan_triangles(quotes, codes, threshold=DEFAULT_THRESHOLD, limit=100):
+    """Triangles ``a -> b -> c -> a`` whose quotes multiply above ``1 + threshold``
+
+    Works on log quotes one starting currency at a time, so each step is an
+    ``n x n`` vectorized sum. Each cycle is reported once, starting from its
+    lowest-indexed currency. Returns the total number of such triangles and
+    up to ``limit`` ``(spread, (a, b, c))`` tuples, widest spread first.
+    """
+    logs = np.log(quotes)
+    n = len(codes)
+    cutoff = np.log1p(threshold)
+    hits = []
+    for a in range(n - 2):
+        # totals[b, c] = log(a->b) + log(b->c) + log(c->a), with b, c > a
+        totals = logs[a, a + 1:, np.newaxis] + logs[a + 1:, a + 1:] + logs[np.newaxis, a + 1:, a]
+        b, c = np.nonzero(totals > cutoff)
+        if len(b):
+            hits.append((np.full(len(b), a), b + a + 1, c + a + 1, totals[b, c]))
+    if not hits:
+        return 0, []
+    a, b, c, totals = (np.concatenate(column) for column in zip(*hits))
+    order = np.argsort(-totals, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+    spreads = np.expm1(totals[order]).tolist()
+    return len(totals), [
+        (spread, (codes[i], codes[j], codes[k]))
+        for spread, i, j, k in zip(spreads, a[order].tolist(), b[order].tolist(), c[order].tolist())
+    ]
+
+def find_arbitrage_cycle(quotes, codes, threshold=DEFAULT_THRESHOLD):
+    """One profitable cycle of any length via Bellman-Ford on ``-log`` quotes
+
+    Relaxes every edge at once per iteration, O(n^3) in total. Returns
+    ``(spread, cycle)`` with ``cycle`` starting and ending at the same
+    currency, or None when the cycle found does not beat ``1 + threshold``.
+    """
+    n = len(codes)
+    weights = -np.log(quotes)
+    weights[np.isnan(weights)] = np.inf
+    distance = np.zeros(n)
+    predecessor = np.full(n, -1)
+    updated = -1
+    for _ in range(n):
+        candidates = distance[:, np.newaxis] + weights
+        best = candidates.argmin(axis=0)
+        best_distance = candidates[best, np.arange(n)]
+        improved = best_distance < distance - 1e-12
+        if not improved.any():
+            return None
+        distance[improved] = best_distance[improved]
+        predecessor[improved] = best[improved]
+        updated = int(np.flatnonzero(improved)[0])
+
+    # Still improving after n rounds: walk back n steps to land inside the cycle
+    node = updated
+    for _ in range(n):
+        node = predecessor[node]
+    cycle = [node]
+    current = predecessor[node]
+    while current != node:
+        cycle.append(current)
+        current = predecessor[current]
+    cycle.append(node)
+    cycle.reverse()
+    spread = float(np.prod([quotes[i, j] for i, j in zip(cycle, cycle[1:])]) - 1)
+    if spread <= threshold:
+        return None
+    return spread, tuple(codes[i] for i in cycle)
@@ -0,0 +1,132 @@
+import argparse
+import sys
+import time
+import numpy as np
+from rate_engine import build_rate_matrix, fetch_base_rates, SNAPSHOT_BASE
+from snapshot_store import SnapshotStore
+from exact_conversion import (
+    ROUNDING_MODES, amounts_to_minor_units, convert_batch_minor, format_minor_units, minor_unit_exponents
+)
+
+CHUNK_SIZE = 100_000
+AMOUNT_COLUMN = "amount"
+FROM_COLUMN = "from_currency"
+TO_COLUMN = "to_currency"
+
+def currency_indices(rate_matrix, codes):
+    """Map an array of currency codes to matrix indices, -1 when unknown"""
+    import pandas as pd
+
+    inverse, unique_codes = pd.factorize(pd.Series(codes, copy=False), use_na_sentinel=False)
+    lookup = np.array([rate_matrix.index.get(code, -1) for code in unique_codes], dtype=np.intp)
+    return lookup[inverse]
+
+def convert_batch(rate_matrix, amounts, from_codes, to_codes):
+    """Convert arrays of amounts between mixed currency pairs in one pass
+
+    Returns ``(rates, converted)`` as float64 arrays; rows with an unknown
+    currency get NaN.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    from_idx = currency_indices(rate_matrix, from_codes)
+    to_idx = currency_indices(rate_matrix, to_codes)
+    known = (from_idx >= 0) & (to_idx >= 0)
+    rates = np.full(len(amounts), np.nan)
+    rates[known] = rate_matrix.matrix[from_idx[known], to_idx[known]]
+    return rates, amounts * rates
+
+def convert_batch_exact(rate_matrix, amounts, from_codes, to_codes, rounding=ROUNDING_MODES[0]):
+    """Exact counterpart of ``convert_batch`` on scaled-integer minor units
+
+    Amounts are rounded to the source currency's minor unit first, with the
+    same ``rounding`` mode and result as ``convert_exact``. Returns
+    ``(rates, converted)`` with converted amounts as exact decimal strings,
+    empty for rows with an unknown currency or a missing or non-finite amount.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    from_idx = currency_indices(rate_matrix, from_codes)
+    to_idx = currency_indices(rate_matrix, to_codes)
+    from_exponents = minor_unit_exponents(rate_matrix, from_idx)
+    to_exponents = minor_unit_exponents(rate_matrix, to_idx)
+    minor_amounts, representable = amounts_to_minor_units(amounts, from_exponents, rounding)
+    converted, valid = convert_batch_minor(rate_matrix, minor_amounts, from_idx, to_idx, rounding)
+    rates = np.full(len(amounts), np.nan)
+    rates[valid] = rate_matrix.matrix[from_idx[valid], to_idx[valid]]
+    # A blank amount must not come out as a converted zero
+    valid &= representable
+    formatted = np.array(format_minor_units(converted, to_exponents), dtype=object)
+    formatted[~valid] = ""
+    return rates, formatted
+
+def convert_frame(rate_matrix, frame, default_from=None, default_to=None, rounding=None):
+    """Add ``rate`` and ``converted_amount`` columns to a ledger DataFrame
+
+    With a ``rounding`` mode the amounts are converted exactly in minor units.
+    """
+    from_codes = frame[FROM_COLUMN] if FROM_COLUMN in frame else np.full(len(frame), default_from)
+    to_codes = frame[TO_COLUMN] if TO_COLUMN in frame else np.full(len(frame), default_to)
+    if rounding is None:
+        rates, converted = convert_batch(rate_matrix, frame[AMOUNT_COLUMN], from_codes, to_codes)
+    else:
+        rates, converted = convert_batch_exact(rate_matrix, frame[AMOUNT_COLUMN], from_codes, to_codes, rounding)
+    frame = frame.assign(rate=rates, converted_amount=converted)
+    if FROM_COLUMN not in frame:
+        frame.insert(0, FROM_COLUMN, default_from)
+    if TO_COLUMN not in frame:
+        frame.insert(1, TO_COLUMN, default_to)
+    return frame
+
+def convert_csv(rate_matrix, source, destination, chunksize=CHUNK_SIZE, default_from=None, default_to=None, rounding=None):
+    """Stream a CSV ledger through ``convert_frame`` chunk by chunk
+
+    Memory stays bounded by ``chunksize`` regardless of file size. Returns
+    the number of rows written.
+    """
+    import pandas as pd
+
+    rows = 0
+    reader = pd.read_csv(source, chunksize=chunksize, dtype={FROM_COLUMN: str, TO_COLUMN: str})
+    for i, chunk in enumerate(reader):
+        converted = convert_frame(rate_matrix, chunk, default_from, default_to, rounding)
+        converted.to_csv(destination, header=(i == 0), index=False)
+        rows += len(converted)
+    return rows
+
+def load_rate_matrix(refresh=False):
+    """Latest persisted snapshot as a RateMatrix, fetching when asked or missing"""
+    store = SnapshotStore()
+    persisted = None if refresh else store.latest()
+    if persisted is None or persisted[1] != SNAPSHOT_BASE:
+        rates = fetch_base_rates(SNAPSHOT_BASE)
+        store.append(rates, SNAPSHOT_BASE)
+        return build_rate_matrix(rates, sorted(rates))
+    timestamp, _, rates = persisted
+    return build_rate_matrix(rates, sorted(rates), timestamp)
+
+def main(argv=None):
+    """Headless CSV bulk conversion"""
+    parser = argparse.ArgumentParser(description="Convert a CSV ledger of amounts between currencies")
+    parser.add_argument("source", help="input CSV with an 'amount' column and optional 'from_currency'/'to_currency' columns")
+    parser.add_argument("destination", nargs="?", help="output CSV (default: stdout)")
+    parser.add_argument("--from", dest="default_from", help="source currency for rows without 'from_currency'")
+    parser.add_argument("--to", dest="default_to", help="target currency for rows without 'to_currency'")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows per processing chunk")
+    parser.add_argument("--exact", nargs="?", const=ROUNDING_MODES[0], choices=ROUNDING_MODES, metavar="ROUNDING",
+                        help="convert exactly in minor units with the given rounding mode (default ROUND_HALF_EVEN)")
+    parser.add_argument("--refresh", action="store_true", help="fetch fresh rates instead of the last persisted snapshot")
+    args = parser.parse_args(argv)
+
+    rate_matrix = load_rate_matrix(args.refresh)
+    started = time.perf_counter()
+    if args.destination:
+        with open(args.destination, "w", newline="") as destination:
+            rows = convert_csv(rate_matrix, args.source, destination, args.chunksize,
+                               args.default_from, args.default_to, args.exact)
+    else:
+        rows = convert_csv(rate_matrix, args.source, sys.stdout, args.chunksize,
+                           args.default_from, args.default_to, args.exact)
+    elapsed = time.perf_counter() - started
+    print(f"Converted {rows:,} rows in {elapsed:.2f}s using rates from {rate_matrix.timestamp:%Y-%m-%d %H:%M:%S}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+from rate_engine import build_rate_matrix
+from exact_conversion import ROUND_HALF_EVEN, convert_batch_minor
+
+SAMPLE_RATES = {
+    "USD": 1.0, "EUR": 0.9213, "GBP": 0.7871, "JPY": 151.37, "INR": 83.412,
+    "AUD": 1.5123, "CAD": 1.3671, "CHF": 0.9012, "CNY": 7.2391, "SGD": 1.3462,
+    "AED": 3.6725, "SAR": 3.7502, "KRW": 1368.55, "BRL": 5.0123, "RUB": 92.315
+}
+
+def best_of(func, repeat=5):
+    """Best wall time of ``repeat`` calls in seconds"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def bench_exact(rows=1_000_000):
+    """Float vs scaled-integer exact conversion on a mixed-pair batch"""
+    rate_matrix = build_rate_matrix(SAMPLE_RATES, list(SAMPLE_RATES))
+    rng = np.random.default_rng(0)
+    from_idx = rng.integers(0, len(rate_matrix.codes), rows)
+    to_idx = rng.integers(0, len(rate_matrix.codes), rows)
+    print(f"exact conversion, {rows:,} rows")
+    # Ledger-sized amounts take the single-multiply path, huge ones the split path
+    for label, max_minor in [("up to 10M minor units", 10 ** 7), ("up to 1e14 minor units", 10 ** 14)]:
+        minor_amounts = rng.integers(1, max_minor, rows)
+        amounts = minor_amounts / 100.0
+        float_time = best_of(lambda: amounts * rate_matrix.matrix[from_idx, to_idx])
+        exact_time = best_of(lambda: convert_batch_minor(rate_matrix, minor_amounts, from_idx, to_idx, ROUND_HALF_EVEN))
+        print(f"  {label}: float64 {float_time * 1000:7.1f} ms, "
+              f"scaled-integer {exact_time * 1000:7.1f} ms ({exact_time / float_time:.1f}x)")
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STARTUP_SCRIPT = """
+import sys, time
+started = time.perf_counter()
+{imports}
+imported = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("live_currency_converter.py", default_timeout=120)
+rendered_from = time.perf_counter()
+app.run()
+print(imported - started, time.perf_counter() - rendered_from + imported - started)
+"""
+
+def run_startup(imports):
+    """Import time and time-to-first-render in a fresh interpreter"""
+    script = STARTUP_SCRIPT.format(imports=imports)
+    output = subprocess.run([sys.executable, "-c", script], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    import_time, first_render = map(float, output.stdout.split()[-2:])
+    return import_time, first_render
+
+def bench_startup(repeat=3):
+    """Cold import time and time-to-first-render, eager vs lazy heavy imports"""
+    variants = [
+        ("eager pandas/plotly", "import streamlit, numpy, pandas, plotly.graph_objects"),
+        ("lazy (current)", "import streamlit, numpy"),
+    ]
+    print("cold start (best of %d fresh interpreters)" % repeat)
+    for label, imports in variants:
+        runs = [run_startup(imports) for _ in range(repeat)]
+        import_time = min(run[0] for run in runs)
+        first_render = min(run[1] for run in runs)
+        print(f"  {label:20s} imports {import_time * 1000:7.1f} ms, first render {first_render * 1000:7.1f} ms")
+
+def synthetic_history(points):
+    """Minute-spaced random-walk rate history shaped like get_historical_data"""
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    rates = 83.0 * np.exp(np.cumsum(rng.normal(0, 1e-4, points)))
+    return pd.DataFrame({
+        'date': pd.date_range("2020-01-01", periods=points, freq="min"),
+        'rate': rates,
+        'open': rates,
+        'high': rates * 1.0005,
+        'low': rates * 0.9995,
+        'change_pct': np.concatenate([[0], np.diff(rates) / rates[:-1] * 100])
+    })
+
+def bench_charts(sizes=(1_000, 100_000, 1_000_000)):
+    """Figure build time and JSON size with and without downsampling"""
+    from charts import create_candlestick_chart, create_line_chart, prepare_chart_data
+
+    # Warm up plotly's lazy validators so the first size is not penalized
+    create_line_chart(synthetic_history(10), "USD", "INR").to_json()
+    print("chart figures (build = downsample + figure + to_json)")
+    for points in sizes:
+        data = synthetic_history(points)
+        for chart_type, builder in [("Line Chart", create_line_chart), ("Candlestick", create_candlestick_chart)]:
+            for label, prepare in [("raw", lambda d: d), ("downsampled", lambda d: prepare_chart_data(d, chart_type))]:
+                started = time.perf_counter()
+                payload = builder(prepare(data), "USD", "INR").to_json()
+                elapsed = time.perf_counter() - started
+                print(f"  {points:>9,} pts {chart_type:12s} {label:12s} "
+                      f"{elapsed * 1000:9.1f} ms {len(payload) / 1024:10,.0f} KB")
+
+def bench_arbitrage(currencies=160, providers=3, noise=1e-4):
+    """Triangle scan and Bellman-Ford over drifting quotes from several providers"""
+    from arbitrage import find_arbitrage_cycle, quote_matrix, scan_triangles
+
+    rng = np.random.default_rng(0)
+    codes = [f"C{i:03d}" for i in range(currencies)]
+    base_rates = np.exp(rng.normal(0, 2, currencies))
+    snapshots = [dict(zip(codes, (base_rates * (1 + rng.normal(0, noise, currencies))).tolist()))
+                 for _ in range(providers)]
+    quotes = quote_matrix(snapshots, codes)
+    print(f"arbitrage scan, {currencies} currencies from {providers} providers")
+    for threshold in (1e-4, 1e-3):
+        total, _ = scan_triangles(quotes, codes, threshold)
+        elapsed = best_of(lambda: scan_triangles(quotes, codes, threshold))
+        print(f"  triangles  > {threshold * 10_000:4.0f} bp {elapsed * 1000:8.1f} ms  ({total:,} found)")
+    elapsed = best_of(lambda: find_arbitrage_cycle(quotes, codes))
+    print(f"  bellman-ford cycle  {elapsed * 1000:8.1f} ms")
+
+def bench_alerts(alerts=50_000, pairs=14):
+    """Per-snapshot alert evaluation against bisect-indexed thresholds"""
+    import sqlite3
+    import tempfile
+    from rate_alerts import AlertEngine
+
+    rng = np.random.default_rng(0)
+    codes = list(SAMPLE_RATES)[1:pairs + 1]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "alerts.db")
+        AlertEngine(path)
+        targets = rng.integers(0, len(codes), alerts)
+        rows = [
+            ("bench", "USD", codes[target], "above" if side else "below",
+             SAMPLE_RATES[codes[target]] * (1 + (0.05 if side else -0.05) * spread), None, 0.0)
+            for target, side, spread in zip(targets.tolist(), rng.integers(0, 2, alerts).tolist(),
+                                             rng.random(alerts).tolist())
+        ]
+        with sqlite3.connect(path) as conn:
+            conn.executemany("INSERT INTO alerts (user_id, from_currency, to_currency, kind, value, reference, "
+                             "created_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        started = time.perf_counter()
+        engine = AlertEngine(path)
+        print(f"rate alerts, {alerts:,} alerts on {pairs} pairs (loaded in "
+              f"{(time.perf_counter() - started) * 1000:,.0f} ms)")
+        quiet = best_of(lambda: engine.check(SAMPLE_RATES), repeat=20)
+        print(f"  snapshot, nothing fires   {quiet * 1000:8.3f} ms")
+        moved = {code: rate * 1.01 for code, rate in SAMPLE_RATES.items()}
+        moved["USD"] = 1.0
+        started = time.perf_counter()
+        fired = engine.check(moved)
+        print(f"  snapshot, 1% move         {(time.perf_counter() - started) * 1000:8.3f} ms  ({len(fired):,} fired)")
+
+def bench_comparison(days=180, currencies=(15, 160)):
+    """One-pass comparison block and correlation heatmap build"""
+    from charts import create_correlation_heatmap
+    from comparison import compare_currencies
+
+    rng = np.random.default_rng(0)
+    print(f"currency comparison, {days} days")
+    for count in currencies:
+        codes = ["USD"] + [f"C{i:03d}" for i in range(count - 1)]
+        block = np.exp(np.cumsum(rng.normal(0, 0.005, (days, count)), axis=0))
+        block[:, 0] = 1.0
+        dates = np.arange(days).astype("datetime64[D]")
+        compute = best_of(lambda: compare_currencies(dates, block, codes, "USD"))
+        comparison = compare_currencies(dates, block, codes, "USD")
+        figure = best_of(lambda: create_correlation_heatmap(comparison, "USD").to_json(), repeat=3)
+        print(f"  {count:4d} currencies  compute {compute * 1000:7.1f} ms  heatmap {figure * 1000:7.1f} ms")
+
+def bench_forecast(days=365, horizon=30):
+    """Full refit vs incremental update, and forecast time, per model"""
+    from forecasting import MODELS
+
+    rng = np.random.default_rng(0)
+    values = (83 * np.exp(np.cumsum(rng.normal(0, 0.004, days)))).tolist()
+    print(f"forecasting, {days} days, {horizon}-day horizon")
+    for name, model_class in MODELS.items():
+        refit = best_of(lambda: model_class().fit(values))
+        model = model_class().fit(values[:-1])
+        update = best_of(lambda: model.update(values[-1]), repeat=100)
+        forecast = best_of(lambda: model.forecast(horizon))
+        print(f"  {name:12s}  refit {refit * 1000:7.2f} ms  update {update * 1e6:6.1f} us  forecast {forecast * 1000:6.2f} ms")
+
+def bench_metrics(calls=200_000):
+    """Per-call overhead of stage timers, enabled and disabled"""
+    import metrics
+
+    def noop():
+        pass
+
+    print(f"stage timers, {calls:,} calls")
+    baseline = best_of(lambda: [noop() for _ in range(calls)])
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        wrapped = metrics.timed("bench")(noop)
+        decorated = best_of(lambda: [wrapped() for _ in range(calls)])
+
+        def block():
+            for _ in range(calls):
+                with metrics.timer("bench"):
+                    pass
+        context = best_of(block)
+        label = "enabled" if enabled else "disabled"
+        print(f"  {label:8s}  decorator +{(decorated - baseline) / calls * 1e9:6.0f} ns/call  "
+              f"context manager {context / calls * 1e9:6.0f} ns/call")
+
+BENCHMARKS = {
+    "exact": bench_exact,
+    "startup": bench_startup,
+    "charts": bench_charts,
+    "arbitrage": bench_arbitrage,
+    "alerts": bench_alerts,
+    "comparison": bench_comparison,
+    "forecast": bench_forecast,
+    "metrics": bench_metrics,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    parser.add_argument("names", nargs="*", help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+
+if __name__ == "__main__":
+    main()
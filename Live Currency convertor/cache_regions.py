@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+
+REGION_SIZES = {"live": 16, "history": 64, "figures": 64}
+
+class CacheRegion:
+    """Bounded LRU of values tagged with the data version they were built from
+
+    A lookup with a newer version rebuilds the entry in place, so each key
+    is invalidated on its own when its data changes. Counts hits and misses.
+    """
+
+    def __init__(self, name, maxsize):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key, version, build):
+        """Value cached for ``key`` at ``version``, calling ``build()`` otherwise"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = build()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key=None):
+        """Drop one key, or the whole region"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class CacheRegions:
+    """Named cache regions invalidated independently of each other"""
+
+    def __init__(self, sizes=REGION_SIZES):
+        self._regions = {name: CacheRegion(name, size) for name, size in sizes.items()}
+
+    def __getitem__(self, name):
+        return self._regions[name]
+
+    def __iter__(self):
+        return iter(self._regions.values())
+
+    def invalidate(self, name, key=None):
+        self._regions[name].invalidate(key)
@@ -0,0 +1,286 @@
+import numpy as np
+from downsampling import aggregate_bars, downsample_indices
+from metrics import timed
+
+# Roughly the pixel width of a wide-layout chart: more points per trace cannot be seen
+MAX_CHART_POINTS = 1500
+MARKER_POINT_LIMIT = 200
+
+def prepare_chart_data(data, chart_type, max_points=MAX_CHART_POINTS):
+    """Downsample historical data before it is handed to a chart builder
+
+    Line and area charts keep a MinMaxLTTB selection of rows; candlestick and
+    OHLC charts merge consecutive bars so highs and lows are preserved.
+    """
+    if len(data) <= max_points:
+        return data
+    
+    if chart_type in ("Candlestick", "OHLC"):
+        starts, open_, high, low, close = aggregate_bars(
+            data['open'].to_numpy(), data['high'].to_numpy(), data['low'].to_numpy(),
+            data['rate'].to_numpy(), max_points
+        )
+        bars = data.iloc[starts].copy()
+        bars['open'], bars['high'], bars['low'], bars['rate'] = open_, high, low, close
+        return bars
+    
+    x = data['date'].to_numpy().astype('datetime64[s]').astype(np.float64)
+    return data.iloc[downsample_indices(x, data['rate'].to_numpy(), max_points)]
+
+@timed("create_line_chart")
+def create_line_chart(data, from_currency, to_currency, trend=None, forecast=None):
+    """Create line chart for exchange rates
+
+    ``trend`` optionally holds precomputed trend-line values per row; without
+    it the trend is fitted here. ``forecast`` optionally holds ``date``,
+    ``mean``, ``lower`` and ``upper`` arrays drawn past the last rate with
+    their confidence band, and ``model``, the name in the legend.
+    """
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    # Markers and spline smoothing only pay off on short series
+    detailed = len(data) <= MARKER_POINT_LIMIT
+    
+    fig.add_trace(go.Scatter(
+        x=data['date'],
+        y=data['rate'],
+        mode='lines+markers' if detailed else 'lines',
+        name=f'{from_currency}/{to_currency}',
+        line=dict(color='#667eea', width=3 if detailed else 2, shape='spline' if detailed else 'linear'),
+        marker=dict(size=6, color='#667eea', symbol='circle', line=dict(width=2, color='white')),
+        hovertemplate=(
+            '<b>%{fullData.name}</b><br>'
+            'Date: %{x|%B %d, %Y}<br>'
+            'Rate: %{y:.4f}<br>'
+            'Change: %{customdata:.2f}%<br>'
+            '<extra></extra>'
+        ),
+        customdata=data['change_pct']
+    ))
+    
+    # Add trend line, fitted against time so downsampled points keep their spacing
+    if trend is not None:
+        trend_line = trend
+    else:
+        elapsed_days = (data['date'] - data['date'].iloc[0]).dt.total_seconds().to_numpy() / 86400
+        z = np.polyfit(elapsed_days, data['rate'], 1)
+        trend_line = np.poly1d(z)(elapsed_days)
+    
+    fig.add_trace(go.Scatter(
+        x=data['date'],
+        y=trend_line,
+        mode='lines',
+        name='Trend',
+        line=dict(color='rgba(255, 99, 132, 0.6)', width=2, dash='dash'),
+        hovertemplate='Trend: %{y:.4f}<extra></extra>'
+    ))
+    
+    if forecast is not None:
+        # Band first: the lower edge fills up to the upper one
+        fig.add_trace(go.Scatter(
+            x=forecast['date'],
+            y=forecast['upper'],
+            mode='lines',
+            line=dict(width=0),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast['date'],
+            y=forecast['lower'],
+            mode='lines',
+            line=dict(width=0),
+            fill='tonexty',
+            fillcolor='rgba(118, 75, 162, 0.15)',
+            name='95% band',
+            hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatter(
+            x=forecast['date'],
+            y=forecast['mean'],
+            mode='lines',
+            name=f"{forecast['model']} forecast",
+            line=dict(color='#764ba2', width=2, dash='dot'),
+            hovertemplate='Forecast: %{y:.4f}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=dict(text=f'{from_currency} to {to_currency} Exchange Rate Trend', x=0.5, font=dict(size=20, color='#2c3e50')),
+        xaxis=dict(title='Date', showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)', showline=True, linecolor='#2c3e50', tickformat='%b %d'),
+        yaxis=dict(title=f'Exchange Rate ({from_currency} to {to_currency})', showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)', showline=True, linecolor='#2c3e50', tickformat='.4f'),
+        template='plotly_white',
+        height=500,
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=50, r=50, t=80, b=50)
+    )
+    
+    return fig
+
+@timed("create_area_chart")
+def create_area_chart(data, from_currency, to_currency):
+    """Create area chart for exchange rates"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=data['date'],
+        y=data['rate'],
+        mode='lines',
+        name=f'{from_currency}/{to_currency}',
+        line=dict(color='#667eea', width=2),
+        fill='tonexty',
+        fillcolor='rgba(102, 126, 234, 0.3)',
+        hovertemplate='<b>Rate:</b> %{y:.4f}<br><b>Date:</b> %{x}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=f'{from_currency} to {to_currency} Exchange Rate Area Chart',
+        xaxis_title='Date',
+        yaxis_title='Exchange Rate',
+        template='plotly_white',
+        height=500,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@timed("create_candlestick_chart")
+def create_candlestick_chart(data, from_currency, to_currency):
+    """Create candlestick chart for exchange rates"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=go.Candlestick(
+        x=data['date'],
+        open=data['open'],
+        high=data['high'],
+        low=data['low'],
+        close=data['rate'],
+        name=f'{from_currency}/{to_currency}',
+        increasing_line_color='#00ff88',
+        decreasing_line_color='#ff4444'
+    ))
+    
+    fig.update_layout(
+        title=f'{from_currency} to {to_currency} Candlestick Chart',
+        xaxis_title='Date',
+        yaxis_title='Exchange Rate',
+        template='plotly_white',
+        height=500,
+        xaxis_rangeslider_visible=False
+    )
+    
+    return fig
+
+@timed("create_ohlc_chart")
+def create_ohlc_chart(data, from_currency, to_currency):
+    """Create OHLC chart for exchange rates"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=go.Ohlc(
+        x=data['date'],
+        open=data['open'],
+        high=data['high'],
+        low=data['low'],
+        close=data['rate'],
+        name=f'{from_currency}/{to_currency}',
+        increasing_line_color='#00ff88',
+        decreasing_line_color='#ff4444'
+    ))
+    
+    fig.update_layout(
+        title=f'{from_currency} to {to_currency} OHLC Chart',
+        xaxis_title='Date',
+        yaxis_title='Exchange Rate',
+        template='plotly_white',
+        height=500,
+        xaxis_rangeslider_visible=False
+    )
+    
+    return fig
+
+@timed("create_correlation_heatmap")
+def create_correlation_heatmap(comparison, quote_currency):
+    """Heatmap of the correlation matrix of daily log returns"""
+    import plotly.graph_objects as go
+    
+    codes = comparison['codes']
+    fig = go.Figure(go.Heatmap(
+        z=comparison['correlation'],
+        x=codes,
+        y=codes,
+        zmin=-1,
+        zmax=1,
+        colorscale='RdBu',
+        reversescale=True,
+        hovertemplate='%{y} / %{x}<br>Correlation: %{z:.2f}<extra></extra>'
+    ))
+    
+    fig.update_layout(
+        title=dict(text=f'Correlation of Daily Returns (in {quote_currency})', x=0.5),
+        template='plotly_white',
+        height=max(400, min(900, 24 * len(codes))),
+        yaxis=dict(autorange='reversed')
+    )
+    
+    return fig
+
+@timed("create_performance_chart")
+def create_performance_chart(comparison, quote_currency):
+    """Each currency's rate rebased to 100 on the first day"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    
+    for i, code in enumerate(comparison['codes']):
+        fig.add_trace(go.Scatter(
+            x=comparison['dates'],
+            y=comparison['performance'][:, i],
+            mode='lines',
+            name=code,
+            hovertemplate=f'{code}: %{{y:.2f}}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=dict(text=f'Normalized Performance in {quote_currency} (start = 100)', x=0.5),
+        xaxis_title='Date',
+        yaxis_title='Index',
+        template='plotly_white',
+        height=450,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+@timed("create_beta_chart")
+def create_beta_chart(comparison, quote_currency, window):
+    """Rolling betas of each currency's returns against the benchmark currency"""
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    benchmark = comparison['benchmark']
+    
+    for i, code in enumerate(comparison['codes']):
+        if code == benchmark:
+            continue
+        fig.add_trace(go.Scatter(
+            x=comparison['dates'][1:],
+            y=comparison['betas'][:, i],
+            mode='lines',
+            name=code,
+            hovertemplate=f'{code}: %{{y:.2f}}<extra></extra>'
+        ))
+    
+    fig.update_layout(
+        title=dict(text=f'{window}-Day Rolling Beta vs {benchmark} (in {quote_currency})', x=0.5),
+        xaxis_title='Date',
+        yaxis_title='Beta',
+        template='plotly_white',
+        height=450,
+        hovermode='x unified'
+    )
+    
+    return fig
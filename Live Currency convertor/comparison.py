@@ -0,0 +1,71 @@
+import numpy as np
+
+DEFAULT_BETA_WINDOW = 20
+
+def quote_block(base_block, codes, quote_currency):
+    """Rates of every currency in ``quote_currency`` from a base-relative block
+
+    ``base_block[t, i]`` is the snapshot-base rate of ``codes[i]`` on day
+    ``t``; the result holds units of ``quote_currency`` per unit of each code.
+    """
+    quote = base_block[:, codes.index(quote_currency)]
+    return quote[:, np.newaxis] / base_block
+
+def rolling_betas(returns, benchmark, window):
+    """Rolling OLS betas of every column of ``returns`` against ``benchmark``
+
+    Windowed sums come from cumulative sums, so all columns and windows are
+    computed in O(days x currencies). Rows before the first full window are NaN.
+    """
+    days = len(benchmark)
+    betas = np.full(returns.shape, np.nan)
+    if days < window:
+        return betas
+
+    def window_sums(values):
+        totals = np.cumsum(values, axis=0)
+        sums = totals[window - 1:].copy()
+        sums[1:] -= totals[:-window]
+        return sums
+
+    sum_b = window_sums(benchmark)
+    sum_bb = window_sums(benchmark * benchmark)
+    sum_x = window_sums(returns)
+    sum_xb = window_sums(returns * benchmark[:, np.newaxis])
+    variance = window * sum_bb - sum_b * sum_b
+    covariance = window * sum_xb - sum_x * sum_b[:, np.newaxis]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        betas[window - 1:] = covariance / variance[:, np.newaxis]
+    return betas
+
+def compare_currencies(dates, base_block, codes, quote_currency, benchmark=None, beta_window=DEFAULT_BETA_WINDOW):
+    """Correlations, normalized performance and rolling betas of many currencies in one pass
+
+    Days missing any currency are dropped, and so are currencies never
+    quoted. Returns a dict with ``codes``, ``dates``, ``correlation``
+    (codes x codes of daily log returns), ``performance`` (rate rebased to
+    100 on the first day), ``betas`` (rolling, against ``benchmark``'s
+    returns, one day shorter than ``dates``) and ``benchmark``.
+    """
+    rates = quote_block(base_block, list(codes), quote_currency)
+    # The quote currency is flat against itself; unquoted currencies carry no information
+    keep = np.array([code != quote_currency for code in codes]) & ~np.isnan(rates).all(axis=0)
+    codes = [code for code, kept in zip(codes, keep) if kept]
+    rates = rates[:, keep]
+    complete = ~np.isnan(rates).any(axis=1)
+    dates, rates = dates[complete], rates[complete]
+
+    benchmark = benchmark if benchmark in codes else (codes[0] if codes else None)
+    result = {"codes": codes, "dates": dates, "benchmark": benchmark}
+    if len(rates) < 2 or not codes:
+        result.update(correlation=np.full((len(codes), len(codes)), np.nan),
+                      performance=np.full(rates.shape, np.nan), betas=np.full((0, len(codes)), np.nan))
+        return result
+
+    returns = np.diff(np.log(rates), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = np.corrcoef(returns, rowvar=False)
+    result["correlation"] = np.atleast_2d(correlation)
+    result["performance"] = rates / rates[0] * 100
+    result["betas"] = rolling_betas(returns, returns[:, codes.index(benchmark)], beta_window)
+    return result
@@ -0,0 +1,14 @@
+import pytest
+from rate_engine import build_rate_matrix
+
+# USD-based rates the tests' expected values are worked out against
+SAMPLE_RATES = {
+    "USD": 1.0, "EUR": 0.9213, "GBP": 0.7871, "JPY": 151.37, "INR": 83.412,
+    "AUD": 1.5123, "CAD": 1.3671, "CHF": 0.9012, "CNY": 7.2391, "SGD": 1.3462,
+    "AED": 3.6725, "SAR": 3.7502, "KRW": 1368.55, "BRL": 5.0123, "RUB": 92.315
+}
+
+@pytest.fixture
+def rate_matrix():
+    """Rate matrix over the sample rates"""
+    return build_rate_matrix(SAMPLE_RATES, list(SAMPLE_RATES))
@@ -0,0 +1,194 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+import numpy as np
+
+DEFAULT_DB_PATH = os.environ.get(
+    "CONVERSIONS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "conversions.db")
+)
+HISTORY_CAPACITY = 10_000
+INITIAL_ALLOCATION = 64
+FLUSH_BATCH = 32
+FLUSH_INTERVAL = 5.0
+
+# 36 bytes per conversion; currencies are indices into the registry's codes
+ENTRY_DTYPE = np.dtype([
+    ("timestamp", np.float64),
+    ("amount", np.float64),
+    ("converted", np.float64),
+    ("rate", np.float64),
+    ("from", np.int16),
+    ("to", np.int16),
+])
+
+class ConversionHistory:
+    """Fixed-capacity ring buffer of conversions in one structured array
+
+    Appending overwrites the oldest entry once full, so a session's history
+    never grows past ``capacity`` and never shifts. The array starts small
+    and doubles until it reaches ``capacity``, so sessions that convert
+    little hold little. Views are newest first and filtered with vectorized
+    masks. Pass the registry's ``index`` to share it instead of building one
+    per history.
+    """
+
+    __slots__ = ("codes", "index", "capacity", "_entries", "_head", "_size")
+
+    def __init__(self, codes, capacity=HISTORY_CAPACITY, index=None):
+        self.codes = codes
+        self.index = {code: i for i, code in enumerate(codes)} if index is None else index
+        self.capacity = capacity
+        self._entries = np.zeros(min(INITIAL_ALLOCATION, capacity), dtype=ENTRY_DTYPE)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        """Bytes allocated for entries"""
+        return self._entries.nbytes
+
+    def append(self, from_currency, to_currency, amount, converted_amount, rate, timestamp=None):
+        if self._size == len(self._entries) < self.capacity:
+            # Never wrapped while growing, so the entries are already oldest first
+            grown = np.zeros(min(len(self._entries) * 2, self.capacity), dtype=ENTRY_DTYPE)
+            grown[:self._size] = self._entries
+            self._entries = grown
+            self._head = self._size
+        entry = self._entries[self._head]
+        entry["timestamp"] = time.time() if timestamp is None else timestamp
+        entry["amount"], entry["converted"], entry["rate"] = amount, converted_amount, rate
+        entry["from"], entry["to"] = self.index[from_currency], self.index[to_currency]
+        self._head = (self._head + 1) % len(self._entries)
+        self._size = min(self._size + 1, self.capacity)
+
+    def clear(self):
+        self._entries = np.zeros(min(INITIAL_ALLOCATION, self.capacity), dtype=ENTRY_DTYPE)
+        self._head = 0
+        self._size = 0
+
+    def _newest_first(self):
+        return (self._head - 1 - np.arange(self._size)) % len(self._entries)
+
+    def pairs(self):
+        """Distinct ``(from, to)`` pairs present in the history"""
+        entries = self._entries[self._newest_first()]
+        return sorted({(self.codes[f], self.codes[t]) for f, t in zip(entries["from"].tolist(), entries["to"].tolist())})
+
+    def _matching(self, from_currency, to_currency):
+        entries = self._entries[self._newest_first()]
+        mask = np.ones(len(entries), dtype=bool)
+        if from_currency is not None:
+            mask &= entries["from"] == self.index.get(from_currency, -1)
+        if to_currency is not None:
+            mask &= entries["to"] == self.index.get(to_currency, -1)
+        return entries[mask]
+
+    def count(self, from_currency=None, to_currency=None):
+        """Number of conversions matching the filters"""
+        return len(self._matching(from_currency, to_currency))
+
+    def page(self, page=0, page_size=10, from_currency=None, to_currency=None):
+        """One page of conversions, newest first, and the number of matching entries
+
+        Entries are dicts with ``timestamp`` (epoch seconds), ``from_currency``,
+        ``to_currency``, ``amount``, ``converted_amount`` and ``rate``.
+        """
+        matching = self._matching(from_currency, to_currency)
+        selected = matching[page * page_size:(page + 1) * page_size]
+        return [
+            {
+                "timestamp": entry["timestamp"].item(),
+                "from_currency": self.codes[entry["from"]],
+                "to_currency": self.codes[entry["to"]],
+                "amount": entry["amount"].item(),
+                "converted_amount": entry["converted"].item(),
+                "rate": entry["rate"].item(),
+            }
+            for entry in selected
+        ], len(matching)
+
+class ConversionLog:
+    """SQLite log of every user's conversions with batched writes
+
+    ``record`` only queues a row; queued rows are written in one
+    transaction once ``FLUSH_BATCH`` accumulate, a user's history is read
+    back, the process exits, or at the latest ``FLUSH_INTERVAL`` seconds after
+    the first of them was queued, by a timer thread armed with that row.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._timer = None
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversions ("
+                "user_id TEXT NOT NULL, timestamp REAL NOT NULL, from_currency TEXT NOT NULL, "
+                "to_currency TEXT NOT NULL, amount REAL NOT NULL, converted_amount REAL NOT NULL, rate REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS conversions_user ON conversions (user_id, timestamp)")
+        atexit.register(self.flush)
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, user_id, from_currency, to_currency, amount, converted_amount, rate, timestamp):
+        with self._lock:
+            self._pending.append((user_id, timestamp, from_currency, to_currency,
+                                  float(amount), float(converted_amount), float(rate)))
+            due = len(self._pending) >= FLUSH_BATCH or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            if not due and self._timer is None:
+                # Bound the write latency of a burst's tail that no later record will flush
+                self._timer = threading.Timer(FLUSH_INTERVAL, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write every queued row in one transaction"""
+        with self._lock:
+            rows, self._pending = self._pending, []
+            self._last_flush = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if rows:
+            with self._connect() as conn:
+                conn.executemany("INSERT INTO conversions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def load(self, user_id, history):
+        """Fill ``history`` with the user's most recent conversions, oldest first"""
+        self.flush()
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT timestamp, from_currency, to_currency, amount, converted_amount, rate FROM conversions "
+                "WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
+                (user_id, history.capacity)
+            ).fetchall()
+        for timestamp, from_currency, to_currency, amount, converted_amount, rate in reversed(rows):
+            if from_currency in history.index and to_currency in history.index:
+                history.append(from_currency, to_currency, amount, converted_amount, rate, timestamp)
+        return history
+
+    def clear(self, user_id):
+        with self._lock:
+            self._pending = [row for row in self._pending if row[0] != user_id]
+        with self._connect() as conn:
+            conn.execute("DELETE FROM conversions WHERE user_id = ?", (user_id,))
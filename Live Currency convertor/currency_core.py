@@ -0,0 +1,229 @@
+import functools
+import os
+import threading
+import numpy as np
+import requests
+from rate_engine import REFRESH_INTERVAL, HttpRateClient, RateFeed, RateStore
+from rate_providers import ProviderError, configured_fetcher
+from snapshot_store import SnapshotStore
+from history_store import HistoryStore, ordinals_to_datetime64
+from exact_conversion import convert_exact, minor_units
+from ohlc import OHLCBook
+from analytics import AnalyticsBook
+from forecasting import ForecastBook
+from cache_regions import CacheRegions
+from currency_registry import CurrencyRegistry
+from conversion_history import ConversionLog
+from arbitrage import quote_matrix
+from rate_alerts import AlertEngine
+from comparison import DEFAULT_BETA_WINDOW, compare_currencies
+from memory_usage import SessionFootprints
+from metrics import REGISTRY, serve_metrics
+from datetime import datetime, timedelta
+
+# Names, symbols and flags of every supported currency, from the bundled currencies.csv
+CURRENCY_DATA = CurrencyRegistry()
+
+# Errors meaning no rates could be fetched and none are stored
+RATES_UNAVAILABLE = (requests.exceptions.RequestException, ProviderError)
+
+def get_currency_display_name(currency_code):
+    """Get formatted currency display name"""
+    return CURRENCY_DATA.display_name(currency_code)
+
+def format_currency(amount, currency_code):
+    """Format currency amount with proper symbol"""
+    symbol = CURRENCY_DATA.symbol(currency_code)
+
+    return f"{symbol}{amount:,.{minor_units(currency_code)}f}"
+
+def process_singleton(factory):
+    """Create the wrapped resource once per process, on first use"""
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get():
+        if get.instance is None:
+            with lock:
+                if get.instance is None:
+                    get.instance = factory()
+        return get.instance
+
+    get.instance = None
+    return get
+
+@process_singleton
+def get_snapshot_store():
+    """Process-wide on-disk snapshot store"""
+    return SnapshotStore()
+
+@process_singleton
+def get_history_store():
+    """Process-wide daily history store, backfilled from persisted snapshots"""
+    history = HistoryStore()
+    if len(history) == 0:
+        history.backfill(get_snapshot_store().between())
+    return history
+
+@process_singleton
+def get_ohlc_book():
+    """Process-wide OHLC bars built from the persisted snapshots"""
+    return OHLCBook(get_snapshot_store().pair_series)
+
+def _recorded_window(from_currency, to_currency, days):
+    """Recorded daily rates of a pair as ``(ordinal days, rates)``"""
+    dates, rates = get_history_store().pair_window(from_currency, to_currency, days)
+    valid = ~np.isnan(rates)
+    return dates[valid], rates[valid]
+
+@process_singleton
+def get_analytics_book():
+    """Process-wide rolling pair statistics seeded from the daily history"""
+    return AnalyticsBook(_recorded_window, lambda: get_history_store().generation)
+
+@process_singleton
+def get_forecast_book():
+    """Process-wide fitted forecast models seeded from the daily history"""
+    return ForecastBook(_recorded_window, lambda: get_history_store().generation)
+
+@process_singleton
+def get_cache_regions():
+    """Process-wide live/history/figure caches shared by all sessions"""
+    return CacheRegions()
+
+@process_singleton
+def get_conversion_log():
+    """Process-wide SQLite log of every user's conversions"""
+    return ConversionLog()
+
+@process_singleton
+def get_alert_engine():
+    """Process-wide rate alerts of every user"""
+    return AlertEngine()
+
+@process_singleton
+def get_session_footprints():
+    """Process-wide table of the state each live session holds"""
+    return SessionFootprints()
+
+@process_singleton
+def get_metrics():
+    """Process-wide metrics registry with the cache, fetch and session collectors attached
+
+    Set ``METRICS_PORT`` to also serve ``/metrics`` from this process.
+    """
+    def collect():
+        for region in get_cache_regions():
+            labels = {"region": region.name}
+            yield "currency_cache_hits_total", "counter", "Cache region lookups served from cache", labels, region.hits
+            yield "currency_cache_misses_total", "counter", "Cache region lookups that built the value", labels, region.misses
+            yield "currency_cache_entries", "gauge", "Entries held by a cache region", labels, len(region)
+        stats = get_rate_fetcher().stats
+        yield "currency_upstream_requests_total", "counter", "Upstream rate fetches", {}, stats.requests
+        yield "currency_upstream_not_modified_total", "counter", "Upstream fetches answered 304", {}, stats.not_modified
+        yield "currency_upstream_errors_total", "counter", "Failed upstream fetches", {}, stats.errors
+        yield "currency_upstream_bytes_total", "counter", "Bytes received from upstream", {}, stats.bytes_transferred
+        sessions = get_session_footprints().summary()
+        yield "currency_sessions", "gauge", "Sessions that reported recently", {}, sessions["sessions"]
+        yield "currency_session_state_bytes", "gauge", "Session state held by all sessions", {}, sessions["total"]
+
+    REGISTRY.add_collector(collect)
+    port = os.environ.get("METRICS_PORT")
+    if port:
+        serve_metrics(int(port))
+    return REGISTRY
+
+@process_singleton
+def get_rate_fetcher():
+    """Process-wide upstream fetcher with pooled connections"""
+    return configured_fetcher() or HttpRateClient()
+
+@process_singleton
+def get_rate_feed():
+    """Process-wide change feed of the shared rate store"""
+    return RateFeed(CURRENCY_DATA.codes)
+
+@process_singleton
+def get_rate_store():
+    """Process-wide rate store, warm-started from the on-disk snapshot store"""
+    store = RateStore(CURRENCY_DATA.codes, fetch_rates=get_rate_fetcher(), ttl=REFRESH_INTERVAL,
+                      snapshot_store=get_snapshot_store())
+    store.add_listener(get_history_store().record)
+    store.add_listener(get_ohlc_book().on_snapshot)
+    store.add_listener(get_analytics_book().on_snapshot)
+    store.add_listener(get_forecast_book().on_snapshot)
+    store.add_listener(get_alert_engine().on_snapshot)
+    feed = get_rate_feed()
+    feed.seed(store.snapshot)
+    store.add_listener(feed.on_snapshot)
+    return store.start()
+
+def get_rate_matrix():
+    """Current shared cross-rate matrix"""
+    return get_rate_store().get()
+
+def convert(amount, from_currency, to_currency, rounding=None, rate_matrix=None):
+    """Convert one amount, exactly in minor units when ``rounding`` is given
+
+    Returns ``(converted_amount, rate)``; raises KeyError for unknown currencies.
+    """
+    if rate_matrix is None:
+        rate_matrix = get_rate_matrix()
+    if from_currency not in rate_matrix or to_currency not in rate_matrix:
+        raise KeyError(f"No rate for {from_currency}/{to_currency}")
+    rate = rate_matrix.rate(from_currency, to_currency)
+    if rounding is not None:
+        return convert_exact(rate_matrix, amount, from_currency, to_currency, rounding), rate
+    return rate * amount, rate
+
+def pair_history(from_currency, to_currency, days=30):
+    """Recorded daily rates of a pair as ``(datetime64 dates, rates)``"""
+    dates, rates = _recorded_window(from_currency, to_currency, days)
+    return ordinals_to_datetime64(dates), rates
+
+def compare_pairs(codes, quote_currency, days=30, benchmark=None, beta_window=DEFAULT_BETA_WINDOW):
+    """Correlations, normalized performance and rolling betas of ``codes`` quoted in ``quote_currency``
+
+    The whole block of series is sliced from the history store at once.
+    """
+    codes = list(dict.fromkeys([quote_currency, *codes]))
+    dates, block = get_history_store().block(codes, days)
+    return compare_currencies(ordinals_to_datetime64(dates), block, codes, quote_currency, benchmark, beta_window)
+
+def pair_ohlc(from_currency, to_currency, interval="1d", days=30):
+    """OHLC bars of a pair over the last ``days`` days as a dict of arrays
+
+    ``date`` holds the bar starts as ``datetime64[s]``.
+    """
+    start = (datetime.now() - timedelta(days=days)).timestamp()
+    bars = get_ohlc_book().bars(from_currency, to_currency, interval, start)
+    bars["date"] = bars.pop("starts").astype("datetime64[s]")
+    return bars
+
+def pair_stats(from_currency, to_currency, days=30):
+    """Rolling statistics of a pair over the last ``days`` days, or None without history"""
+    return get_analytics_book().stats(from_currency, to_currency, days)
+
+def pair_forecast(from_currency, to_currency, model, horizon=14):
+    """``horizon``-day forecast of a pair as a dict of ``date``, ``mean``, ``lower`` and ``upper`` arrays
+
+    Returns None for unknown models or pairs without enough history.
+    """
+    result = get_forecast_book().forecast(from_currency, to_currency, model, horizon)
+    if result is None:
+        return None
+    last_day, mean, lower, upper = result
+    dates = ordinals_to_datetime64(np.arange(last_day + 1, last_day + horizon + 1))
+    return {"date": dates, "mean": mean, "lower": lower, "upper": upper}
+
+def arbitrage_quotes():
+    """Best cross quotes over the latest snapshot of every provider, and the provider names
+
+    With a single source (one provider, or the plain HTTP client) the quotes
+    come from the shared snapshot and are consistent by construction.
+    """
+    snapshots = dict(getattr(get_rate_fetcher(), "last_results", {}))
+    if len(snapshots) < 2:
+        rate_matrix = get_rate_matrix()
+        snapshots = {"rate store": dict(zip(rate_matrix.codes, rate_matrix.base_rates.tolist()))}
+    return quote_matrix(snapshots.values(), CURRENCY_DATA.codes), sorted(snapshots)
@@ -0,0 +1,71 @@
+import csv
+import os
+import threading
+from collections.abc import Mapping
+
+CURRENCY_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "currencies.csv")
+
+class CurrencyRegistry(Mapping):
+    """Metadata of every supported currency, read from the bundled table on first use
+
+    Codes are kept sorted in a tuple with a code -> index dict, so a
+    ``RateMatrix`` built from ``codes`` shares the registry's indices.
+    Names, symbols and flags are parallel tuples, and display names are
+    formatted once at load time so ``format_func`` lookups are dict reads.
+    As a mapping, ``registry[code]`` gives ``{"name", "symbol", "flag"}``.
+    """
+
+    def __init__(self, path=CURRENCY_TABLE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, newline="", encoding="utf-8") as f:
+                rows = sorted(csv.DictReader(f), key=lambda row: row["code"])
+            self._codes = tuple(row["code"] for row in rows)
+            self._index = {code: i for i, code in enumerate(self._codes)}
+            self._names = tuple(row["name"] for row in rows)
+            # Currencies without a symbol of their own are written with their code
+            self._symbols = tuple(row["symbol"] or row["code"] + " " for row in rows)
+            self._flags = tuple(row["flag"] for row in rows)
+            self._display_names = {code: f"{flag} {code} - {name}"
+                                   for code, name, flag in zip(self._codes, self._names, self._flags)}
+            self._loaded = True
+
+    @property
+    def codes(self):
+        if not self._loaded:
+            self._load()
+        return self._codes
+
+    @property
+    def index(self):
+        if not self._loaded:
+            self._load()
+        return self._index
+
+    def __getitem__(self, code):
+        i = self.index[code]
+        return {"name": self._names[i], "symbol": self._symbols[i], "flag": self._flags[i]}
+
+    def __contains__(self, code):
+        return code in self.index
+
+    def __iter__(self):
+        return iter(self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def display_name(self, code):
+        if not self._loaded:
+            self._load()
+        return self._display_names.get(code) or f" {code} - {code}"
+
+    def symbol(self, code):
+        i = self.index.get(code)
+        return code if i is None else self._symbols[i]
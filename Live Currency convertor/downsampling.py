@@ -0,0 +1,87 @@
+import numpy as np
+
+def minmax_indices(y, n_buckets):
+    """Indices of the minimum and maximum of ``y`` in each of ``n_buckets`` equal buckets
+
+    First and last points are always kept. Fully vectorized: the series is
+    reshaped into buckets and reduced with argmin/argmax.
+    """
+    n = len(y)
+    if n <= 2 * n_buckets:
+        return np.arange(n)
+    size = n // n_buckets
+    body = y[:size * n_buckets].reshape(n_buckets, size)
+    offsets = np.arange(n_buckets) * size
+    picks = [offsets + body.argmin(axis=1), offsets + body.argmax(axis=1), [0, n - 1]]
+    if size * n_buckets < n:
+        tail = y[size * n_buckets:]
+        picks.append([size * n_buckets + tail.argmin(), size * n_buckets + tail.argmax()])
+    return np.unique(np.concatenate(picks))
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets selection of ``threshold`` points
+
+    Keeps the first and last point and, per bucket, the point forming the
+    largest triangle with the previous pick and the next bucket's mean.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        mean_x = x[next_start:next_end].mean()
+        mean_y = y[next_start:next_end].mean()
+        areas = np.abs(
+            (x[previous] - mean_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (mean_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[i + 1] = previous
+    return selected
+
+def downsample_indices(x, y, max_points, method="lttb"):
+    """Indices of at most about ``max_points`` points that keep the shape of a series
+
+    ``minmax`` keeps every bucket's extremes. ``lttb`` first pre-selects
+    min/max candidates on long series (MinMaxLTTB), so LTTB only scans a few
+    points per output point; LTTB may still pass over an extreme, so the
+    global minimum and maximum are added back afterwards.
+    """
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    if method == "minmax":
+        return minmax_indices(y, max_points // 2)
+    if method != "lttb":
+        raise ValueError(f"Unknown downsampling method: {method}")
+    candidates = minmax_indices(y, 2 * max_points) if n > 4 * max_points else np.arange(n)
+    keep = lttb_indices(x[candidates], y[candidates], max_points)
+    return np.union1d(candidates[keep], [y.argmin(), y.argmax()])
+
+def aggregate_bars(open_, high, low, close, max_bars):
+    """Merge consecutive OHLC bars into at most ``max_bars`` bars
+
+    Returns the index of each merged bar's first source bar and the merged
+    open/high/low/close arrays; highs and lows keep the bucket extremes.
+    """
+    n = len(close)
+    if n <= max_bars:
+        return np.arange(n), open_, high, low, close
+    size = -(-n // max_bars)
+    starts = np.arange(0, n, size)
+    ends = np.append(starts[1:], n) - 1
+    return (
+        starts,
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+    )
@@ -0,0 +1,197 @@
+import functools
+import numpy as np
+from decimal import Decimal, localcontext, ROUND_DOWN, ROUND_HALF_DOWN, ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_UP
+
+# ISO 4217 minor units for currencies that do not use two decimal places
+MINOR_UNITS = {
+    "BHD": 3, "IQD": 3, "JOD": 3, "KWD": 3, "LYD": 3, "OMR": 3, "TND": 3,
+    "BIF": 0, "CLP": 0, "DJF": 0, "GNF": 0, "ISK": 0, "JPY": 0, "KMF": 0,
+    "KRW": 0, "PYG": 0, "RWF": 0, "UGX": 0, "UYI": 0, "VND": 0, "VUV": 0,
+    "XAF": 0, "XOF": 0, "XPF": 0,
+    "CLF": 4, "UYW": 4
+}
+DEFAULT_MINOR_UNITS = 2
+
+# Rates are carried as integers: target minor units per source minor unit, times 10**RATE_DECIMALS
+RATE_DECIMALS = 9
+RATE_SCALE = 10 ** RATE_DECIMALS
+INT64_SAFE = 2.0 ** 62
+# Minor-unit amounts must fit in int64 on both exact paths
+MINOR_UNITS_LIMIT = 2 ** 63
+# Wide enough that every in-range amount scales and quantizes exactly
+DECIMAL_PRECISION = 60
+# Float amounts are scaled this many digits past their minor unit before rounding
+AMOUNT_GUARD_DECIMALS = 6
+AMOUNT_GUARD_SCALE = 10 ** AMOUNT_GUARD_DECIMALS
+# Integers below this are exact in float64 and one ulp apart at most
+FLOAT_EXACT = 2.0 ** 52
+
+ROUNDING_MODES = [ROUND_HALF_EVEN, ROUND_HALF_UP, ROUND_HALF_DOWN, ROUND_DOWN, ROUND_UP]
+
+def minor_units(currency_code):
+    """Number of decimal places in the currency's minor unit"""
+    return MINOR_UNITS.get(currency_code, DEFAULT_MINOR_UNITS)
+
+@functools.lru_cache(maxsize=4)
+def scaled_rate_matrix(rate_matrix):
+    """Integer rates between minor units, -1 where the rate is unknown
+
+    An extra trailing row and column of -1 let index -1 (unknown currency)
+    gather without masking.
+    """
+    exponents = np.array([minor_units(code) for code in rate_matrix.codes], dtype=np.int64)
+    shift = 10.0 ** (exponents[np.newaxis, :] - exponents[:, np.newaxis])
+    scaled = np.full((len(exponents) + 1, len(exponents) + 1), -1, dtype=np.int64)
+    rates = np.rint(rate_matrix.matrix * shift * RATE_SCALE)
+    scaled[:-1, :-1] = np.where(np.isnan(rates), -1, rates)
+    return scaled
+
+def scaled_rate(rate_matrix, from_currency, to_currency):
+    """Integer rate used by both exact conversion paths for one pair"""
+    scaled = scaled_rate_matrix(rate_matrix)
+    return int(scaled[rate_matrix.index[from_currency], rate_matrix.index[to_currency]])
+
+def _decimal_minor_units(amount, exponent, rounding):
+    """``amount`` rounded to ``10 ** -exponent`` as an int, None when not finite or past int64"""
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        scaled = Decimal(str(amount)).scaleb(exponent)
+        if not scaled.is_finite() or abs(scaled) >= MINOR_UNITS_LIMIT:
+            return None
+        minor_amount = int(scaled.quantize(Decimal(1), rounding=rounding))
+    return minor_amount if abs(minor_amount) < MINOR_UNITS_LIMIT else None
+
+def to_minor_units(amount, currency_code, rounding=ROUND_HALF_EVEN):
+    """Decimal amount as an integer count of minor units
+
+    Raises ValueError for amounts that are not finite or whose minor units do
+    not fit in int64, the rows the batch path leaves blank.
+    """
+    minor_amount = _decimal_minor_units(amount, minor_units(currency_code), rounding)
+    if minor_amount is None:
+        raise ValueError(f"Amount {amount} is out of range for exact conversion in {currency_code}")
+    return minor_amount
+
+def from_minor_units(minor_amount, currency_code):
+    """Integer minor units as a Decimal amount"""
+    return Decimal(int(minor_amount)).scaleb(-minor_units(currency_code))
+
+def _decimal_scaled_multiply(minor_amount, rate, rounding):
+    """``round(minor_amount * rate / RATE_SCALE)`` as an int with Decimal arithmetic"""
+    with localcontext() as ctx:
+        ctx.prec = DECIMAL_PRECISION
+        return int((Decimal(minor_amount) * rate / RATE_SCALE).quantize(Decimal(1), rounding=rounding))
+
+def convert_exact(rate_matrix, amount, from_currency, to_currency, rounding=ROUND_HALF_EVEN):
+    """Convert one amount with Decimal arithmetic, rounded to the target minor unit
+
+    Raises ValueError when the amount or the result does not fit in int64
+    minor units.
+    """
+    rate = scaled_rate(rate_matrix, from_currency, to_currency)
+    if rate < 0:
+        raise KeyError(f"No rate for {from_currency}/{to_currency}")
+    minor_amount = to_minor_units(amount, from_currency, rounding)
+    converted = _decimal_scaled_multiply(minor_amount, rate, rounding)
+    if abs(converted) >= MINOR_UNITS_LIMIT:
+        raise ValueError(f"Converting {amount} {from_currency} to {to_currency} is out of range for exact conversion")
+    return from_minor_units(converted, to_currency)
+
+def _scaled_multiply(amounts, rates, rounding):
+    """``round(amounts * rates / RATE_SCALE)`` on int64 without overflow
+
+    Both operands are split around RATE_SCALE so every partial product fits
+    in int64 whenever the final result does.
+    """
+    negative = len(amounts) > 0 and amounts.min() < 0
+    if negative:
+        sign = np.sign(amounts)
+        amounts = np.abs(amounts)
+    if len(amounts) and float(amounts.max()) * float(rates.max()) < INT64_SAFE:
+        # Every product fits in int64: one multiply and one divmod
+        quotient, remainder = np.divmod(amounts * rates, RATE_SCALE)
+    else:
+        amount_hi, amount_lo = np.divmod(amounts, RATE_SCALE)
+        rate_hi, rate_lo = np.divmod(rates, RATE_SCALE)
+        low_quotient, remainder = np.divmod(amount_lo * rate_lo, RATE_SCALE)
+        quotient = amount_hi * rate_hi * RATE_SCALE + amount_hi * rate_lo + amount_lo * rate_hi + low_quotient
+
+    quotient = _round_quotient(quotient, remainder, RATE_SCALE, rounding)
+    return sign * quotient if negative else quotient
+
+def _round_quotient(quotient, remainder, divisor, rounding):
+    """Round non-negative ``quotient + remainder / divisor`` to an integer with a Decimal rounding mode"""
+    half = divisor // 2
+    if rounding == ROUND_HALF_EVEN:
+        quotient += (remainder > half) | ((remainder == half) & (quotient & 1 == 1))
+    elif rounding == ROUND_HALF_UP:
+        quotient += remainder >= half
+    elif rounding == ROUND_HALF_DOWN:
+        quotient += remainder > half
+    elif rounding == ROUND_UP:
+        quotient += remainder > 0
+    elif rounding != ROUND_DOWN:
+        raise ValueError(f"Unsupported rounding mode: {rounding}")
+    return quotient
+
+def amounts_to_minor_units(amounts, exponents, rounding=ROUND_HALF_EVEN):
+    """Vectorized ``to_minor_units`` of float amounts with per-row minor-unit ``exponents``
+
+    Each amount is rounded exactly as ``Decimal(str(amount))`` would be. An
+    amount whose shortest decimal form has at most AMOUNT_GUARD_DECIMALS
+    digits past its minor unit scales to an exact integer, which is rounded in
+    int64; the rest go through Decimal one by one.
+
+    Returns ``(minor_amounts, valid)``; rows that are not finite or do not fit
+    in int64 are 0 and masked out of ``valid``.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    power = 10.0 ** (np.asarray(exponents, dtype=np.int64) + AMOUNT_GUARD_DECIMALS)
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = np.rint(np.abs(amounts) * power)
+        # The scaled integer is the amount's decimal digits exactly when dividing back reproduces it
+        exact = (scaled < FLOAT_EXACT) & (scaled / power == np.abs(amounts))
+    guarded = np.where(exact, scaled, 0).astype(np.int64)
+    quotient, remainder = np.divmod(guarded, AMOUNT_GUARD_SCALE)
+    minor_amounts = _round_quotient(quotient, remainder, AMOUNT_GUARD_SCALE, rounding)
+    minor_amounts = np.where(amounts < 0, -minor_amounts, minor_amounts)
+    valid = np.isfinite(amounts)
+    for i in np.flatnonzero(~exact & valid):
+        minor_amount = _decimal_minor_units(float(amounts[i]), int(exponents[i]), rounding)
+        if minor_amount is None:
+            valid[i] = False
+        else:
+            minor_amounts[i] = minor_amount
+    return minor_amounts, valid
+
+def convert_batch_minor(rate_matrix, minor_amounts, from_idx, to_idx, rounding=ROUND_HALF_EVEN):
+    """Convert int64 minor-unit amounts between matrix indices exactly
+
+    Returns ``(converted, valid)``: converted minor units of the target
+    currency and a mask of rows whose pair has a rate and whose result fits
+    in int64. Results match ``convert_exact`` row for row.
+    """
+    minor_amounts = np.asarray(minor_amounts, dtype=np.int64)
+    rates = scaled_rate_matrix(rate_matrix)[from_idx, to_idx]
+    valid = rates >= 0
+    if not valid.all():
+        rates = np.where(valid, rates, 0)
+    # Rows that may overflow int64 are settled exactly one by one
+    large = np.abs(minor_amounts.astype(np.float64)) * rates / RATE_SCALE >= INT64_SAFE
+    converted = _scaled_multiply(np.where(large, 0, minor_amounts), rates, rounding)
+    for i in np.flatnonzero(large):
+        result = _decimal_scaled_multiply(int(minor_amounts[i]), int(rates[i]), rounding)
+        if abs(result) < MINOR_UNITS_LIMIT:
+            converted[i] = result
+        else:
+            valid[i] = False
+    return converted, valid
+
+def minor_unit_exponents(rate_matrix, idx):
+    """Minor-unit exponents for an array of matrix indices (0 when unknown)"""
+    exponents = np.array([minor_units(code) for code in rate_matrix.codes] + [0], dtype=np.int64)
+    return exponents[np.asarray(idx, dtype=np.intp)]
+
+def format_minor_units(minor_amounts, exponents):
+    """Render minor-unit integers as exact decimal strings"""
+    return [str(Decimal(int(amount)).scaleb(-int(exponent))) for amount, exponent in zip(minor_amounts, exponents)]
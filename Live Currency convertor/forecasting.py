@@ -0,0 +1,234 @@
+import copy
+import math
+import threading
+from collections import OrderedDict
+import numpy as np
+
+FORECAST_HISTORY_DAYS = 365
+# Fitted pairs kept up to date; the least recently viewed go first
+MAX_FORECASTERS = 32
+CONFIDENCE_Z = 1.96  # 95% bands
+SMOOTHING_GRID = np.linspace(0.05, 0.95, 19)
+TREND_GRID = np.linspace(0.01, 0.5, 10)
+AR_ORDER = 3
+
+def normal_band(mean, sd):
+    """``(mean, lower, upper)`` of a normal forecast"""
+    return mean, mean - CONFIDENCE_Z * sd, mean + CONFIDENCE_Z * sd
+
+class EWMAModel:
+    """Simple exponential smoothing; alpha picked by a vectorized grid search on the first fit"""
+
+    name = "EWMA"
+
+    def fit(self, values):
+        # Run every candidate alpha at once, one time step per iteration
+        alphas = SMOOTHING_GRID
+        levels = np.full(len(alphas), values[0])
+        sse = np.zeros(len(alphas))
+        for x in values[1:]:
+            errors = x - levels
+            sse += errors * errors
+            levels += alphas * errors
+        best = int(sse.argmin())
+        self.alpha = float(alphas[best])
+        self.level = float(levels[best])
+        self.sse = float(sse[best])
+        self.n = len(values) - 1
+        return self
+
+    def update(self, x):
+        error = x - self.level
+        self.sse += error * error
+        self.n += 1
+        self.level += self.alpha * error
+
+    def forecast(self, horizon):
+        steps = np.arange(horizon)
+        sigma = math.sqrt(self.sse / max(self.n, 1))
+        return normal_band(np.full(horizon, self.level), sigma * np.sqrt(1 + steps * self.alpha ** 2))
+
+class HoltModel:
+    """Holt-Winters with additive trend and no seasonal term (daily FX closes have none)
+
+    Alpha and beta are picked by a vectorized grid search on the first fit;
+    later observations update level and trend in O(1).
+    """
+
+    name = "Holt-Winters"
+
+    def fit(self, values):
+        alphas, betas = (grid.ravel() for grid in np.meshgrid(SMOOTHING_GRID, TREND_GRID))
+        levels = np.full(len(alphas), values[1])
+        trends = np.full(len(alphas), values[1] - values[0])
+        sse = np.zeros(len(alphas))
+        for x in values[2:]:
+            predicted = levels + trends
+            errors = x - predicted
+            sse += errors * errors
+            new_levels = predicted + alphas * errors
+            trends += betas * (new_levels - levels - trends)
+            levels = new_levels
+        best = int(sse.argmin())
+        self.alpha, self.beta = float(alphas[best]), float(betas[best])
+        self.level, self.trend = float(levels[best]), float(trends[best])
+        self.sse = float(sse[best])
+        self.n = max(len(values) - 2, 0)
+        return self
+
+    def update(self, x):
+        predicted = self.level + self.trend
+        error = x - predicted
+        self.sse += error * error
+        self.n += 1
+        level = predicted + self.alpha * error
+        self.trend += self.beta * (level - self.level - self.trend)
+        self.level = level
+
+    def forecast(self, horizon):
+        steps = np.arange(1, horizon + 1)
+        sigma = math.sqrt(self.sse / max(self.n, 1))
+        spread = np.concatenate([[0.0], np.cumsum((self.alpha * (1 + steps[:-1] * self.beta)) ** 2)])
+        return normal_band(self.level + steps * self.trend, sigma * np.sqrt(1 + spread))
+
+class ARModel:
+    """AR(p) on daily log returns, refit incrementally from running normal equations
+
+    Each observation adds one row to ``X'X`` and ``X'y`` in O(p^2); the
+    coefficients are re-solved from those sums, never from the raw history.
+    """
+
+    name = f"AR({AR_ORDER})"
+
+    def __init__(self, order=AR_ORDER):
+        self.order = order
+
+    def fit(self, values):
+        size = self.order + 1
+        self.xtx = np.zeros((size, size))
+        self.xty = np.zeros(size)
+        self.yty = 0.0
+        self.n = 0
+        self.last_log = math.log(values[0])
+        self.lags = []
+        for x in values[1:]:
+            self.update(x)
+        return self
+
+    def update(self, x):
+        log_level = math.log(x)
+        r = log_level - self.last_log
+        self.last_log = log_level
+        if len(self.lags) == self.order:
+            row = np.array([1.0, *self.lags])
+            self.xtx += np.outer(row, row)
+            self.xty += row * r
+            self.yty += r * r
+            self.n += 1
+        self.lags = [r, *self.lags][:self.order]
+
+    def _coefficients(self):
+        size = self.order + 1
+        if self.n <= size:
+            return np.zeros(size), 0.0
+        # A tiny ridge keeps flat or very short histories solvable
+        coefficients = np.linalg.solve(self.xtx + 1e-12 * np.eye(size), self.xty)
+        rss = max(self.yty - coefficients @ self.xty, 0.0)
+        return coefficients, rss / (self.n - size)
+
+    def forecast(self, horizon):
+        coefficients, variance = self._coefficients()
+        intercept, phi = coefficients[0], coefficients[1:]
+        lags = list(self.lags) + [0.0] * (self.order - len(self.lags))
+        returns = np.empty(horizon)
+        for step in range(horizon):
+            returns[step] = intercept + phi @ np.array(lags)
+            lags = [returns[step], *lags][:self.order]
+        # Impulse responses of the returns, summed into responses of the log level
+        psi = np.zeros(horizon)
+        psi[0] = 1.0
+        for j in range(1, horizon):
+            psi[j] = sum(phi[i] * psi[j - 1 - i] for i in range(min(self.order, j)))
+        level_psi = np.cumsum(psi)
+        log_sd = np.sqrt(variance * np.cumsum(level_psi ** 2))
+        log_mean = self.last_log + np.cumsum(returns)
+        return np.exp(log_mean), np.exp(log_mean - CONFIDENCE_Z * log_sd), np.exp(log_mean + CONFIDENCE_Z * log_sd)
+
+MODELS = {model.name: model for model in (EWMAModel, HoltModel, ARModel)}
+
+class PairForecaster:
+    """Fitted models of one pair's daily closes
+
+    Days before the newest are folded into the models; the newest close stays
+    provisional (applied to a copy at forecast time) because later snapshots
+    on the same day replace it.
+    """
+
+    def __init__(self, days, values):
+        self.last_day = int(days[-1])
+        self.pending = float(values[-1])
+        committed = [float(value) for value in values[:-1]]
+        self.models = {name: model().fit(committed) for name, model in MODELS.items()} if len(committed) >= 3 else {}
+
+    def add(self, day, value):
+        if day < self.last_day:
+            return
+        if day > self.last_day and self.models:
+            for model in self.models.values():
+                model.update(self.pending)
+        self.last_day, self.pending = day, value
+
+    def forecast(self, name, horizon):
+        """``(mean, lower, upper)`` arrays for the next ``horizon`` days, or None"""
+        model = self.models.get(name)
+        if model is None:
+            return None
+        model = copy.deepcopy(model)
+        model.update(self.pending)
+        return model.forecast(horizon)
+
+class ForecastBook:
+    """Fitted forecasters per pair, fit once and then fed new closes as a ``RateStore`` listener
+
+    At most ``maxsize`` pairs are kept, evicting the least recently viewed.
+    """
+
+    def __init__(self, load_history, history_generation=lambda: 0, maxsize=MAX_FORECASTERS):
+        self._load_history = load_history
+        self._history_generation = history_generation
+        self._generation = None
+        self.maxsize = maxsize
+        self._forecasters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _reseed_if_rewritten(self):
+        """Drop every seeded entry once the history was merged into, e.g. by an import in another process"""
+        generation = self._history_generation()
+        if generation != self._generation:
+            self._forecasters.clear()
+            self._generation = generation
+
+    def forecast(self, from_currency, to_currency, model, horizon):
+        """Forecast of the ``to``-per-``from`` rate as ``(last_day, mean, lower, upper)``, or None"""
+        key = (from_currency, to_currency)
+        with self._lock:
+            self._reseed_if_rewritten()
+            forecaster = self._forecasters.get(key)
+            if forecaster is None:
+                days, values = self._load_history(from_currency, to_currency, FORECAST_HISTORY_DAYS)
+                if len(values) == 0:
+                    return None
+                forecaster = PairForecaster(days, values)
+                self._forecasters[key] = forecaster
+                if len(self._forecasters) > self.maxsize:
+                    self._forecasters.popitem(last=False)
+            self._forecasters.move_to_end(key)
+            result = forecaster.forecast(model, horizon)
+            return None if result is None else (forecaster.last_day, *result)
+
+    def on_snapshot(self, rates, timestamp):
+        day = timestamp.date().toordinal()
+        with self._lock:
+            for (from_currency, to_currency), forecaster in self._forecasters.items():
+                if from_currency in rates and to_currency in rates:
+                    forecaster.add(day, rates[to_currency] / rates[from_currency])
@@ -0,0 +1,253 @@
+import os
+import threading
+import numpy as np
+from contextlib import contextmanager
+from datetime import date, datetime
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DEFAULT_HISTORY_DIR = os.environ.get(
+    "RATES_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_history")
+)
+
+DATES_FILE = "dates.i8"
+COLUMN_SUFFIX = ".f8"
+LOCK_FILE = "history.lock"
+STAMP_FILE = "stamp"
+
+class HistoryStore:
+    """Columnar daily rate history backed by memory-mapped NumPy files
+
+    One row per calendar day: ``dates.i8`` holds the day ordinals as int64 and
+    each ``<CODE>.f8`` file holds that currency's closing rate against the
+    snapshot base as float64. Columns are plain binary files, appended to by
+    live snapshots and merged into by bulk imports, so readers memory-map
+    them and slice windows without loading the history.
+
+    The app, the API server and the importer may share a directory. Writers
+    hold an exclusive ``flock`` on ``history.lock`` and write ``dates.i8``
+    last, so it commits a row; rates past its length are a torn write, cut
+    off by the next writer and never read, since readers take a shared lock
+    and slice every column to ``len(dates)``.
+
+    ``version`` counts every write and ``generation`` the merges that may
+    rewrite stored days. Both are persisted, so caches and incremental
+    statistics in one process see imports made by another.
+    """
+
+    def __init__(self, directory=DEFAULT_HISTORY_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _locked(self, exclusive):
+        """Cross-process lock on the directory; shared for readers, exclusive for writers"""
+        with open(self._path(LOCK_FILE), "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            # Closing the file releases the lock
+            yield
+
+    def _discard_torn_rows(self, rows):
+        """Cut every column back to ``rows`` values, dropping rates of an append that never committed"""
+        for code in self.codes:
+            path = self._path(code + COLUMN_SUFFIX)
+            if os.path.getsize(path) > rows * 8:
+                os.truncate(path, rows * 8)
+
+    def _stamp(self):
+        """Persisted ``(version, generation)``"""
+        try:
+            with open(self._path(STAMP_FILE)) as f:
+                version, generation = map(int, f.read().split())
+        except (OSError, ValueError):
+            return 0, 0
+        return version, generation
+
+    def _bump(self, merged):
+        """Advance the persisted stamp; called by writers under the exclusive lock"""
+        version, generation = self._stamp()
+        with open(self._path(STAMP_FILE) + ".tmp", "w") as f:
+            f.write(f"{version + 1} {generation + merged}")
+        os.replace(self._path(STAMP_FILE) + ".tmp", self._path(STAMP_FILE))
+
+    @property
+    def version(self):
+        """Changes with every write by any process"""
+        return self._stamp()[0]
+
+    @property
+    def generation(self):
+        """Changes with every merge by any process, i.e. whenever past days may have been rewritten"""
+        return self._stamp()[1]
+
+    @property
+    def codes(self):
+        return sorted(name[:-len(COLUMN_SUFFIX)] for name in os.listdir(self.directory)
+                      if name.endswith(COLUMN_SUFFIX))
+
+    def __len__(self):
+        path = self._path(DATES_FILE)
+        return os.path.getsize(path) // 8 if os.path.exists(path) else 0
+
+    def _map(self, name, dtype):
+        """Read-only memory map of a column, remapped when the file grows"""
+        path = self._path(name)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        size = os.path.getsize(path)
+        cached = self._maps.get(name)
+        if cached is None or cached[0] != size:
+            cached = (size, np.memmap(path, dtype=dtype, mode="r"))
+            self._maps[name] = cached
+        return cached[1]
+
+    def dates(self):
+        """Day ordinals of every stored row"""
+        return self._map(DATES_FILE, np.int64)
+
+    def column(self, currency_code):
+        """Rates of ``currency_code`` against the snapshot base, NaN when missing"""
+        column = self._map(currency_code + COLUMN_SUFFIX, np.float64)
+        if len(column) == 0:
+            return np.full(len(self), np.nan)
+        return column
+
+    def record(self, rates, timestamp=None):
+        """Store a snapshot as the closing rates of its day
+
+        A later snapshot on the same day overwrites that day's row.
+        """
+        day = (timestamp or datetime.now()).date().toordinal()
+        with self._lock, self._locked(exclusive=True):
+            rows = len(self)
+            self._discard_torn_rows(rows)
+            dates = self.dates()
+            if rows and day < dates[-1]:
+                return
+            same_day = bool(rows) and day == dates[-1]
+            existing = set(self.codes)
+            for code in set(rates) - existing:
+                # Backfill new currencies with NaN so every column stays aligned
+                np.full(rows, np.nan).tofile(self._path(code + COLUMN_SUFFIX))
+            for code in existing | set(rates):
+                value = np.float64(rates.get(code, np.nan))
+                self._write(code + COLUMN_SUFFIX, value, same_day)
+            self._write(DATES_FILE, np.int64(day), same_day)
+            self._bump(merged=False)
+
+    def _write(self, name, value, overwrite_last):
+        path = self._path(name)
+        if overwrite_last:
+            with open(path, "r+b") as f:
+                f.seek(-8, os.SEEK_END)
+                f.write(value.tobytes())
+        else:
+            with open(path, "ab") as f:
+                f.write(value.tobytes())
+
+    def merge(self, dates, codes, block):
+        """Write a ``(len(dates), len(codes))`` block of base-relative rates for days in any order
+
+        NaN cells leave the stored value untouched. Cells of stored days are
+        written in place through writable memory maps; new days after the last
+        stored one are appended, and new days in between rewrite every column
+        once. Returns the number of cells written.
+        """
+        dates = np.asarray(dates, dtype=np.int64)
+        block = np.asarray(block, dtype=np.float64).reshape(len(dates), len(codes))
+        with self._lock, self._locked(exclusive=True):
+            stored = np.array(self.dates())
+            rows = len(stored)
+            self._discard_torn_rows(rows)
+            existing = set(self.codes)
+            for code in set(codes) - existing:
+                np.full(rows, np.nan).tofile(self._path(code + COLUMN_SUFFIX))
+            names = [code + COLUMN_SUFFIX for code in existing | set(codes)]
+
+            new_days = np.setdiff1d(dates, stored)
+            if len(new_days) and (rows == 0 or new_days[0] > stored[-1]):
+                for name in names:
+                    with open(self._path(name), "ab") as f:
+                        np.full(len(new_days), np.nan).tofile(f)
+                with open(self._path(DATES_FILE), "ab") as f:
+                    new_days.tofile(f)
+                stored = np.concatenate([stored, new_days])
+            elif len(new_days):
+                merged = np.union1d(stored, new_days)
+                positions = np.searchsorted(merged, stored)
+                for name in names:
+                    column = np.full(len(merged), np.nan)
+                    column[positions] = np.fromfile(self._path(name), dtype=np.float64)
+                    column.tofile(self._path(name) + ".tmp")
+                merged.tofile(self._path(DATES_FILE) + ".tmp")
+                # Every file is written before any is swapped in, dates last
+                for name in [*names, DATES_FILE]:
+                    os.replace(self._path(name) + ".tmp", self._path(name))
+                stored = merged
+
+            written = 0
+            rows = len(stored)
+            if rows:
+                positions = np.searchsorted(stored, dates)
+                for code, values in zip(codes, block.T):
+                    valid = ~np.isnan(values)
+                    if valid.any():
+                        column = np.memmap(self._path(code + COLUMN_SUFFIX), dtype=np.float64, mode="r+", shape=(rows,))
+                        column[positions[valid]] = values[valid]
+                        written += int(valid.sum())
+            self._bump(merged=True)
+        return written
+
+    def backfill(self, snapshots):
+        """Record ``(timestamp, base, rates)`` snapshots in time order"""
+        for timestamp, _, rates in snapshots:
+            self.record(rates, timestamp)
+
+    def pair_window(self, from_currency, to_currency, days):
+        """Dates and ``to``-per-``from`` rates covering the last ``days`` days
+
+        The date and column slices are views into the memory maps; only the
+        cross-division allocates.
+        """
+        with self._locked(exclusive=False):
+            dates = self.dates()
+            if len(dates) == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            rows = len(dates)
+            start = np.searchsorted(dates, dates[-1] - days)
+            from_rates = self.column(from_currency)[start:rows]
+            to_rates = self.column(to_currency)[start:rows]
+            return dates[start:], np.asarray(to_rates / from_rates)
+
+    def block(self, codes, days):
+        """Dates and a ``(days, len(codes))`` block of base-relative rates for the last ``days`` days
+
+        Columns are stacked from the memory maps in a single copy.
+        """
+        with self._locked(exclusive=False):
+            dates = self.dates()
+            if len(dates) == 0:
+                return np.empty(0, dtype=np.int64), np.empty((0, len(codes)))
+            rows = len(dates)
+            start = np.searchsorted(dates, dates[-1] - days)
+            return np.array(dates[start:]), np.column_stack([self.column(code)[start:rows] for code in codes])
+
+def ordinals_to_datetime64(ordinals):
+    """Convert day ordinals to ``datetime64[D]``"""
+    epoch = date(1970, 1, 1).toordinal()
+    return (np.asarray(ordinals, dtype=np.int64) - epoch).astype("datetime64[D]")
+
+def datetime64_to_ordinals(dates):
+    """Convert ``datetime64`` values to day ordinals"""
+    epoch = date(1970, 1, 1).toordinal()
+    return np.asarray(dates).astype("datetime64[D]").astype(np.int64) + epoch
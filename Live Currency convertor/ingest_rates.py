@@ -0,0 +1,244 @@
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from rate_engine import SNAPSHOT_BASE
+from history_store import DEFAULT_HISTORY_DIR, HistoryStore, datetime64_to_ordinals
+
+CHUNK_SIZE = 100_000
+JSON_READ_SIZE = 1 << 20
+FORMATS = ("csv", "json")
+COLUMNS = ["date", "currency", "rate", "base"]
+
+def detect_format(path):
+    """``json`` for .json/.jsonl/.ndjson files, ``csv`` otherwise"""
+    return "json" if str(path).lower().endswith((".json", ".jsonl", ".ndjson")) else "csv"
+
+def iter_json_values(stream, read_size=JSON_READ_SIZE):
+    """Yield the elements of a top-level JSON array, or the lines of JSON Lines, one at a time
+
+    The stream is decoded ``read_size`` characters at a time, so memory stays
+    bounded by the largest single value rather than the file.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    while True:
+        data = stream.read(read_size)
+        buffer += data
+        position = 0
+        while True:
+            # Array brackets and separators sit between values
+            while position < len(buffer) and buffer[position] in "[],\r\n\t ":
+                position += 1
+            try:
+                value, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                break
+            yield value
+        buffer = buffer[position:]
+        if not data:
+            break
+    if buffer.strip():
+        raise ValueError(f"Malformed JSON near: {buffer[:80]!r}")
+
+def json_rows(record, default_base=SNAPSHOT_BASE):
+    """Long ``(date, currency, rate, base)`` rows of one JSON record
+
+    Records are either one quote (``date``, ``currency``, ``rate``), one day
+    (``date`` and a ``rates`` object) or a time series (``rates`` keyed by
+    date); each may carry a ``base``.
+    """
+    if not isinstance(record, dict):
+        return
+    base = record.get("base", default_base)
+    rates = record.get("rates")
+    if not isinstance(rates, dict):
+        yield record.get("date"), record.get("currency", record.get("code")), record.get("rate"), base
+    elif "date" in record:
+        for code, rate in rates.items():
+            yield record["date"], code, rate, base
+    else:
+        for day, day_rates in rates.items():
+            for code, rate in day_rates.items():
+                yield day, code, rate, base
+
+def read_chunks(source, fmt="csv", chunksize=CHUNK_SIZE, default_base=SNAPSHOT_BASE):
+    """Yield ``(quotes, rows, skipped)``: raw ``date``, ``currency``, ``rate`` and ``base`` quotes with counts
+
+    CSV files are long (``date``, ``currency``, ``rate`` and optional ``base``
+    columns) or wide (``date`` and one column per currency); a wide row or a
+    JSON record holding a ``rates`` object gives one quote per currency, so
+    the input row count is reported alongside. Empty cells of a wide row are
+    not quotes and are counted as ``skipped``. CSV chunks hold ``chunksize``
+    input rows and JSON chunks about ``chunksize`` quotes.
+    """
+    import pandas as pd
+
+    if fmt == "json":
+        stream = open(source, encoding="utf-8") if isinstance(source, str) else source
+        try:
+            rows, records = [], 0
+            for record in iter_json_values(stream):
+                rows.extend(json_rows(record, default_base))
+                records += 1
+                if len(rows) >= chunksize:
+                    yield pd.DataFrame(rows, columns=COLUMNS), records, 0
+                    rows, records = [], 0
+            if records:
+                yield pd.DataFrame(rows, columns=COLUMNS), records, 0
+        finally:
+            if stream is not source:
+                stream.close()
+        return
+
+    # Rates parse as floats in the C reader; only the text columns are pinned
+    for chunk in pd.read_csv(source, chunksize=chunksize, dtype={"date": str, "currency": str, "base": str}):
+        rows, skipped = len(chunk), 0
+        chunk.columns = chunk.columns.str.strip().str.lower()
+        if "base" not in chunk:
+            chunk["base"] = default_base
+        if "currency" not in chunk:
+            chunk = chunk.melt(id_vars=["date", "base"], var_name="currency", value_name="rate")
+            # A wide file leaves a currency blank on days it has no rate
+            filled = chunk["rate"].notna().to_numpy()
+            skipped = len(chunk) - int(filled.sum())
+            chunk = chunk[filled]
+        yield chunk[COLUMNS], rows, skipped
+
+def normalize_chunk(chunk, codes):
+    """Validate raw rows against the supported ``codes``
+
+    Codes are stripped and upper-cased and dates become day ordinals. Rows
+    with an unknown currency or base, an unparseable date or a non-positive
+    rate are dropped. Returns the valid rows and the number dropped.
+    """
+    import pandas as pd
+
+    currency = chunk["currency"].astype(str).str.strip().str.upper()
+    base = chunk["base"].astype(str).str.strip().str.upper()
+    rate = pd.to_numeric(chunk["rate"], errors="coerce").to_numpy(dtype=np.float64)
+    dates = pd.to_datetime(chunk["date"], errors="coerce", format="ISO8601").to_numpy()
+    with np.errstate(invalid="ignore"):
+        valid = currency.isin(codes).to_numpy() & base.isin(codes).to_numpy() & (rate > 0) & np.isfinite(rate)
+    valid &= ~np.isnat(dates)
+    frame = pd.DataFrame({
+        "date": datetime64_to_ordinals(dates[valid]),
+        "currency": currency.to_numpy()[valid],
+        "rate": rate[valid],
+        "base": base.to_numpy()[valid],
+    })
+    return frame, len(chunk) - len(frame)
+
+def rebase(frame, base=SNAPSHOT_BASE):
+    """Re-quote rows against ``base``, the history store's base
+
+    A row quoted against another base is divided by that day's ``base`` rate
+    in the same base, and the quote base itself gains a row. Returns the
+    re-quoted rows and the number dropped for lack of a ``base`` rate.
+    """
+    import pandas as pd
+
+    # Rows later in the file win, so the implied base rows go first
+    quoted = frame[["date", "base"]].drop_duplicates()
+    present = pd.MultiIndex.from_frame(frame.loc[frame["currency"] == frame["base"], ["date", "base"]])
+    quoted = quoted[~pd.MultiIndex.from_frame(quoted).isin(present)]
+    frame = pd.concat([quoted.assign(currency=quoted["base"], rate=1.0), frame], ignore_index=True)
+    anchors = frame[frame["currency"] == base].drop_duplicates(["date", "base"], keep="last")
+    anchors = anchors.set_index(["date", "base"])["rate"]
+    keys = pd.MultiIndex.from_frame(frame[["date", "base"]])
+    base_rates = anchors.reindex(keys).to_numpy()
+    anchored = ~np.isnan(base_rates)
+    frame = frame[anchored].assign(rate=frame["rate"].to_numpy()[anchored] / base_rates[anchored])
+    implied = len(quoted)
+    return frame[["date", "currency", "rate"]], int((~anchored[implied:]).sum())
+
+def ingest(source, store, codes, fmt=None, chunksize=CHUNK_SIZE, default_base=SNAPSHOT_BASE, progress=None):
+    """Stream a rate file into ``store`` chunk by chunk
+
+    Rows are validated against ``codes``, re-quoted against the store's base
+    and deduplicated by ``(date, currency)`` with later rows winning, then
+    merged into the store one block per chunk. Memory stays bounded by
+    ``chunksize`` regardless of file size, and by the distinct quotes of one
+    day for a day spanning many chunks. ``progress`` is called with the
+    running report after every chunk.
+
+    Returns a dict with input ``rows`` read, the ``quotes`` they held (one
+    per filled currency of a wide row), empty wide cells ``skipped``,
+    ``rejected`` and ``duplicates`` quotes, cells ``written``, ``seconds``
+    and ``rows_per_second``.
+    """
+    import pandas as pd
+
+    codes = set(codes)
+    fmt = fmt or detect_format(source)
+    started = time.perf_counter()
+    report = {"rows": 0, "quotes": 0, "skipped": 0, "rejected": 0, "duplicates": 0, "written": 0, "seconds": 0.0, "rows_per_second": 0.0}
+
+    def write(frame):
+        frame, unanchored = rebase(frame)
+        unique = frame.drop_duplicates(["date", "currency"], keep="last")
+        report["rejected"] += unanchored
+        report["duplicates"] += len(frame) - len(unique)
+        if len(unique):
+            block = unique.pivot(index="date", columns="currency", values="rate")
+            report["written"] += store.merge(block.index.to_numpy(), list(block.columns), block.to_numpy())
+
+    held = None
+    for chunk, rows, skipped in read_chunks(source, fmt, chunksize, default_base):
+        report["rows"] += rows
+        report["quotes"] += len(chunk)
+        report["skipped"] += skipped
+        frame, rejected = normalize_chunk(chunk, codes)
+        report["rejected"] += rejected
+        if held is not None:
+            frame = pd.concat([held, frame], ignore_index=True)
+        if len(frame):
+            # The last day may continue in the next chunk; hold it back so it is re-quoted whole
+            tail = frame["date"].to_numpy() == frame["date"].iat[-1]
+            held, frame = frame[tail], frame[~tail]
+            if len(held) > chunksize:
+                # A day spanning many chunks keeps only its latest quote per currency and base
+                unique = held.drop_duplicates(["currency", "base"], keep="last")
+                report["duplicates"] += len(held) - len(unique)
+                held = unique
+            if len(frame):
+                write(frame)
+        report["seconds"] = time.perf_counter() - started
+        report["rows_per_second"] = report["rows"] / max(report["seconds"], 1e-9)
+        if progress is not None:
+            progress(report)
+    if held is not None and len(held):
+        write(held)
+    report["seconds"] = time.perf_counter() - started
+    report["rows_per_second"] = report["rows"] / max(report["seconds"], 1e-9)
+    return report
+
+def main(argv=None):
+    """Headless import of end-of-day rate files into the daily history"""
+    from currency_core import CURRENCY_DATA
+
+    parser = argparse.ArgumentParser(description="Import end-of-day rate files into the daily rate history")
+    parser.add_argument("source", help="CSV (long: date,currency,rate[,base]; wide: date,<CODE>,...) or JSON/JSON Lines file")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from the file extension)")
+    parser.add_argument("--base", default=SNAPSHOT_BASE, help=f"base of rows without a 'base' field (default {SNAPSHOT_BASE})")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE, help="rows per processing chunk")
+    parser.add_argument("--history-dir", default=DEFAULT_HISTORY_DIR, help="history store directory")
+    args = parser.parse_args(argv)
+
+    def progress(report):
+        print(f"\r{report['rows']:,} rows  {report['rows_per_second']:,.0f} rows/s", end="", file=sys.stderr)
+
+    report = ingest(args.source, HistoryStore(args.history_dir), CURRENCY_DATA.codes, args.format,
+                    args.chunksize, args.base.strip().upper(), progress)
+    print(file=sys.stderr)
+    print(
+        f"Imported {report['rows']:,} rows ({report['quotes']:,} quotes) in {report['seconds']:.2f}s "
+        f"({report['rows_per_second']:,.0f} rows/s): "
+        f"{report['written']:,} rates written, {report['duplicates']:,} duplicates, {report['rejected']:,} rejected, "
+        f"{report['skipped']:,} empty cells skipped",
+        file=sys.stderr
+    )
+
+if __name__ == "__main__":
+    main()
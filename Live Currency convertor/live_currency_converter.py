@@ -1,9 +1,45 @@
 import streamlit as st
-import requests
-import pandas as pd
 import numpy as np
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import io
+import time
+import uuid
+from datetime import datetime
+from rate_engine import build_rate_matrix
+from charts import (
+    create_area_chart, create_beta_chart, create_candlestick_chart, create_correlation_heatmap, create_line_chart,
+    create_ohlc_chart, create_performance_chart, prepare_chart_data
+)
+from batch_convert import AMOUNT_COLUMN, FROM_COLUMN, TO_COLUMN, convert_csv
+from exact_conversion import ROUNDING_MODES
+from decimal import Decimal
+from currency_core import (
+    CURRENCY_DATA, RATES_UNAVAILABLE, arbitrage_quotes, convert, format_currency, get_currency_display_name,
+    get_alert_engine, get_cache_regions, get_conversion_log, get_history_store, get_rate_feed, get_rate_fetcher,
+    get_rate_matrix, get_rate_store, get_analytics_book, get_forecast_book, get_metrics, get_session_footprints, compare_pairs,
+    pair_forecast, pair_history, pair_ohlc, pair_stats
+)
+from ohlc import INTERVALS
+from analytics import EMA_SPAN, trend_values
+from history_store import datetime64_to_ordinals
+from conversion_history import ENTRY_DTYPE, HISTORY_CAPACITY, ConversionHistory
+from memory_usage import deep_sizeof, peak_rss
+from metrics import METRICS_ENABLED, Profiler, timed, timer
+from arbitrage import find_arbitrage_cycle, scan_triangles
+from rate_alerts import ALERT_KINDS
+from comparison import DEFAULT_BETA_WINDOW
+from forecasting import MODELS
+
+# Seconds between re-renders of the live fragments; the shared store refreshes on its own schedule
+LIVE_UPDATE_INTERVAL = 15
+CHANGE_MARKERS = {1: "▲", -1: "▼", 0: ""}
+HISTORY_PAGE_SIZE = 10
+ARBITRAGE_ROWS = 20
+ALERT_ROWS = 10
+# Seconds between a session's reports to the memory usage table
+MEMORY_REPORT_INTERVAL = 30
+ALERT_LABELS = {"above": "rises to", "below": "falls to", "move": "moves by %"}
+MAX_FORECAST_HORIZON = 90
+LIVE_TABLE_CURRENCIES = ["EUR", "GBP", "JPY", "INR", "AUD", "CAD", "CHF", "CNY", "SGD"]
 
 # Page configuration
 st.set_page_config(
@@ -14,14 +50,15 @@ st.set_page_config(
 )
 
 def initialize_session_state():
-    """Initialize session state variables"""
+    """Initialize session state variables
+
+    Only what differs between sessions lives here; rates, currency metadata
+    and display names are process-wide and shared by every session.
+    """
     session_defaults = {
         "from_currency": "USD",
         "to_currency": "INR",
-        "conversion_history": [],
-        "favorite_pairs": [],
-        "last_update": None,
-        "cached_rates": {},
+        "conversion_history": None,
         "show_chart": False
     }
     
@@ -228,258 +265,141 @@ def load_custom_css():
 
 load_custom_css()
 
-# Currency data with symbols and flags
-CURRENCY_DATA = {
-    "USD": {"name": "US Dollar", "symbol": "$", "flag": "🇺🇸"},
-    "EUR": {"name": "Euro", "symbol": "€", "flag": "🇪🇺"},
-    "GBP": {"name": "British Pound", "symbol": "£", "flag": "🇬🇧"},
-    "JPY": {"name": "Japanese Yen", "symbol": "¥", "flag": "🇯🇵"},
-    "INR": {"name": "Indian Rupee", "symbol": "₹", "flag": "🇮🇳"},
-    "AUD": {"name": "Australian Dollar", "symbol": "A$", "flag": "🇦🇺"},
-    "CAD": {"name": "Canadian Dollar", "symbol": "C$", "flag": "🇨🇦"},
-    "CHF": {"name": "Swiss Franc", "symbol": "Fr", "flag": "🇨🇭"},
-    "CNY": {"name": "Chinese Yuan", "symbol": "¥", "flag": "🇨🇳"},
-    "SGD": {"name": "Singapore Dollar", "symbol": "S$", "flag": "🇸🇬"},
-    "AED": {"name": "UAE Dirham", "symbol": "د.إ", "flag": "🇦🇪"},
-    "SAR": {"name": "Saudi Riyal", "symbol": "﷼", "flag": "🇸🇦"},
-    "KRW": {"name": "South Korean Won", "symbol": "₩", "flag": "🇰🇷"},
-    "BRL": {"name": "Brazilian Real", "symbol": "R$", "flag": "🇧🇷"},
-    "RUB": {"name": "Russian Ruble", "symbol": "₽", "flag": "🇷🇺"}
-}
-
-def get_currency_display_name(currency_code):
-    """Get formatted currency display name"""
-    currency_info = CURRENCY_DATA.get(currency_code, {"name": currency_code, "flag": ""})
-    return f"{currency_info['flag']} {currency_code} - {currency_info['name']}"
-
-def format_currency(amount, currency_code):
-    """Format currency amount with proper symbol"""
-    currency_info = CURRENCY_DATA.get(currency_code, {"symbol": currency_code})
-    symbol = currency_info["symbol"]
-    
-    if currency_code in ["JPY", "KRW"]:
-        return f"{symbol}{amount:,.0f}"
-    else:
-        return f"{symbol}{amount:,.2f}"
+def get_history_user_id():
+    """Stable id of this browser's history, kept in the URL so reloads find it again"""
+    user_id = st.query_params.get("history_id")
+    if not user_id:
+        user_id = uuid.uuid4().hex
+        st.query_params["history_id"] = user_id
+    return user_id
+
+def get_conversion_history():
+    """This session's conversion ring buffer, restored from the conversion log on first use"""
+    if st.session_state.conversion_history is None:
+        history = ConversionHistory(CURRENCY_DATA.codes, index=CURRENCY_DATA.index)
+        try:
+            get_conversion_log().load(get_history_user_id(), history)
+        except Exception as e:
+            st.warning(f"Could not restore conversion history: {e}")
+        st.session_state.conversion_history = history
+    return st.session_state.conversion_history
 
 def add_to_history(from_currency, to_currency, amount, converted_amount, rate):
     """Add conversion to history"""
-    conversion = {
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "from_currency": from_currency,
-        "to_currency": to_currency,
-        "amount": amount,
-        "converted_amount": converted_amount,
-        "rate": rate
-    }
+    timestamp = time.time()
+    get_conversion_history().append(from_currency, to_currency, amount, converted_amount, rate, timestamp)
+    try:
+        get_conversion_log().record(get_history_user_id(), from_currency, to_currency, amount,
+                                    converted_amount, rate, timestamp)
+    except Exception as e:
+        st.warning(f"Could not save conversion: {e}")
+
+def render_conversion_history():
+    """Paginated, filterable view of this session's conversions"""
+    history = get_conversion_history()
+    if not len(history):
+        return
+    
+    st.markdown("### 📜 Conversion History")
+    
+    pairs = history.pairs()
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
     
-    st.session_state.conversion_history.insert(0, conversion)
+    with col1:
+        from_options = [None] + sorted({pair[0] for pair in pairs})
+        from_filter = st.selectbox("From", from_options, format_func=lambda code: code or "All", key="history_from")
+    
+    with col2:
+        to_options = [None] + sorted({pair[1] for pair in pairs})
+        to_filter = st.selectbox("To", to_options, format_func=lambda code: code or "All", key="history_to")
+    
+    page_count = max(-(-history.count(from_filter, to_filter) // HISTORY_PAGE_SIZE), 1)
+    
+    with col3:
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1, key="history_page")
+    
+    with col4:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("🗑️ Clear History"):
+            history.clear()
+            get_conversion_log().clear(get_history_user_id())
+            st.success("History cleared!")
+            st.rerun()
     
-    if len(st.session_state.conversion_history) > 50:
-        st.session_state.conversion_history = st.session_state.conversion_history[:50]
+    entries, matching = history.page(min(page, page_count) - 1, HISTORY_PAGE_SIZE, from_filter, to_filter)
+    if not entries:
+        st.info("No conversions match these filters.")
+        return
+    
+    table = "| Time | Pair | Amount | Converted | Rate |\n|---|---|---|---|---|\n"
+    table += "".join(
+        f"| {datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')} "
+        f"| {entry['from_currency']} → {entry['to_currency']} "
+        f"| {format_currency(entry['amount'], entry['from_currency'])} "
+        f"| {format_currency(entry['converted_amount'], entry['to_currency'])} "
+        f"| {entry['rate']:.4f} |\n"
+        for entry in entries
+    )
+    st.markdown(table)
+    st.caption(f"{matching:,} conversions · page {min(page, page_count)} of {page_count}")
 
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_exchange_rates(base_currency):
-    """Fetch exchange rates with fallback"""
+@timed("fetch_exchange_rates")
+def fetch_exchange_rates():
+    """Get the shared cross-rate matrix"""
     try:
-        url = f"https://api.exchangerate-api.com/v4/latest/{base_currency}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
-        st.session_state.last_update = datetime.now()
-        return data
-    except requests.exceptions.RequestException as e:
-        st.warning(f"API request failed. Using fallback data.")
-        
-        # Fallback mock rates
-        mock_rates = {
-            "USD": 1.0, "EUR": 0.85, "GBP": 0.73, "JPY": 110.0,
-            "INR": 83.5, "AUD": 1.35, "CAD": 1.25, "CHF": 0.92,
-            "CNY": 6.45, "SGD": 1.35, "AED": 3.67, "SAR": 3.75,
-            "KRW": 1200.0, "BRL": 5.2, "RUB": 75.0
-        }
-        
-        if base_currency != "USD":
-            base_rate = mock_rates.get(base_currency, 1.0)
-            adjusted_rates = {k: v / base_rate for k, v in mock_rates.items()}
-            return {"rates": adjusted_rates}
-        
-        return {"rates": mock_rates}
+        return get_rate_matrix()
+    except RATES_UNAVAILABLE as e:
+        st.error("🚫 No exchange rates available yet. Please check your internet connection or try again later.")
     except Exception as e:
         st.error(f"Unexpected error: {e}")
-        return {"rates": {}}
+    return build_rate_matrix({}, CURRENCY_DATA.codes)
 
-@st.cache_data(ttl=3600, show_spinner=False)
 def get_historical_data(from_currency, to_currency, days=30):
-    """Generate historical data for visualization"""
-    try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        
-        np.random.seed(42)
-        
-        # Base rates for common currency pairs
-        base_rates = {
-            ("USD", "INR"): 83.5,
-            ("EUR", "USD"): 1.18,
-            ("GBP", "USD"): 1.37,
-            ("USD", "JPY"): 110.0,
-            ("USD", "EUR"): 0.85,
-            ("USD", "GBP"): 0.73
-        }
-        
-        base_rate = base_rates.get((from_currency, to_currency), 1.0)
-        
-        # Generate realistic rate fluctuations
-        daily_changes = np.random.normal(0, 0.015, size=len(dates))
-        cumulative_changes = np.cumsum(daily_changes)
-        rates = base_rate * (1 + cumulative_changes * 0.08)
-        
-        # Add trend and seasonal components
-        trend = np.linspace(-0.02, 0.03, len(dates))
-        seasonal = 0.008 * np.sin(np.arange(len(dates)) * 2 * np.pi / 7)
-        rates = rates + base_rate * (trend + seasonal)
-        
+    """Slice the recorded daily history of a currency pair for visualization"""
+    import pandas as pd
+    
+    @timed("historical_data_build")
+    def build():
+        dates, rates = pair_history(from_currency, to_currency, days)
         return pd.DataFrame({
             'date': dates,
             'rate': rates,
-            'volume': np.random.randint(800000, 4000000, size=len(dates)),
-            'high': rates * (1 + np.random.uniform(0.002, 0.012, size=len(dates))),
-            'low': rates * (1 - np.random.uniform(0.002, 0.012, size=len(dates))),
-            'change_pct': np.concatenate([[0], np.diff(rates) / rates[:-1] * 100])
+            'change_pct': np.concatenate([[0], np.diff(rates) / rates[:-1] * 100]) if len(rates) else rates
         })
+    
+    try:
+        return get_cache_regions()["history"].get_or_build(
+            ("daily", from_currency, to_currency, days), get_history_store().version, build
+        )
     except Exception as e:
-        st.error(f"Error generating historical data: {e}")
+        st.error(f"Error loading historical data: {e}")
         return pd.DataFrame()
 
-def create_line_chart(data, from_currency, to_currency):
-    """Create line chart for exchange rates"""
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=data['date'],
-        y=data['rate'],
-        mode='lines+markers',
-        name=f'{from_currency}/{to_currency}',
-        line=dict(color='#667eea', width=3, shape='spline'),
-        marker=dict(size=6, color='#667eea', symbol='circle', line=dict(width=2, color='white')),
-        hovertemplate=(
-            '<b>%{fullData.name}</b><br>'
-            'Date: %{x|%B %d, %Y}<br>'
-            'Rate: %{y:.4f}<br>'
-            'Change: %{customdata:.2f}%<br>'
-            '<extra></extra>'
-        ),
-        customdata=data['change_pct']
-    ))
-    
-    # Add trend line
-    z = np.polyfit(range(len(data)), data['rate'], 1)
-    trend_line = np.poly1d(z)(range(len(data)))
-    
-    fig.add_trace(go.Scatter(
-        x=data['date'],
-        y=trend_line,
-        mode='lines',
-        name='Trend',
-        line=dict(color='rgba(255, 99, 132, 0.6)', width=2, dash='dash'),
-        hovertemplate='Trend: %{y:.4f}<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title=dict(text=f'{from_currency} to {to_currency} Exchange Rate Trend', x=0.5, font=dict(size=20, color='#2c3e50')),
-        xaxis=dict(title='Date', showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)', showline=True, linecolor='#2c3e50', tickformat='%b %d'),
-        yaxis=dict(title=f'Exchange Rate ({from_currency} to {to_currency})', showgrid=True, gridcolor='rgba(128, 128, 128, 0.2)', showline=True, linecolor='#2c3e50', tickformat='.4f'),
-        template='plotly_white',
-        height=500,
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        margin=dict(l=50, r=50, t=80, b=50)
-    )
-    
-    return fig
-
-def create_area_chart(data, from_currency, to_currency):
-    """Create area chart for exchange rates"""
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=data['date'],
-        y=data['rate'],
-        mode='lines',
-        name=f'{from_currency}/{to_currency}',
-        line=dict(color='#667eea', width=2),
-        fill='tonexty',
-        fillcolor='rgba(102, 126, 234, 0.3)',
-        hovertemplate='<b>Rate:</b> %{y:.4f}<br><b>Date:</b> %{x}<extra></extra>'
-    ))
-    
-    fig.update_layout(
-        title=f'{from_currency} to {to_currency} Exchange Rate Area Chart',
-        xaxis_title='Date',
-        yaxis_title='Exchange Rate',
-        template='plotly_white',
-        height=500,
-        hovermode='x unified'
-    )
+def get_ohlc_data(from_currency, to_currency, interval, days=30):
+    """Real OHLC bars of a currency pair resampled from rate snapshots"""
+    import pandas as pd
     
-    return fig
-
-def create_candlestick_chart(data, from_currency, to_currency):
-    """Create candlestick chart for exchange rates"""
-    fig = go.Figure(data=go.Candlestick(
-        x=data['date'],
-        open=data['rate'],
-        high=data['high'],
-        low=data['low'],
-        close=data['rate'],
-        name=f'{from_currency}/{to_currency}',
-        increasing_line_color='#00ff88',
-        decreasing_line_color='#ff4444'
-    ))
-    
-    fig.update_layout(
-        title=f'{from_currency} to {to_currency} Candlestick Chart',
-        xaxis_title='Date',
-        yaxis_title='Exchange Rate',
-        template='plotly_white',
-        height=500,
-        xaxis_rangeslider_visible=False
-    )
+    @timed("ohlc_data_build")
+    def build():
+        bars = pair_ohlc(from_currency, to_currency, interval, days)
+        return pd.DataFrame({
+            'date': bars['date'],
+            'open': bars['open'],
+            'high': bars['high'],
+            'low': bars['low'],
+            'rate': bars['close']
+        })
     
-    return fig
-
-def create_ohlc_chart(data, from_currency, to_currency):
-    """Create OHLC chart for exchange rates"""
-    fig = go.Figure(data=go.Ohlc(
-        x=data['date'],
-        open=data['rate'],
-        high=data['high'],
-        low=data['low'],
-        close=data['rate'],
-        name=f'{from_currency}/{to_currency}',
-        increasing_line_color='#00ff88',
-        decreasing_line_color='#ff4444'
-    ))
-    
-    fig.update_layout(
-        title=f'{from_currency} to {to_currency} OHLC Chart',
-        xaxis_title='Date',
-        yaxis_title='Exchange Rate',
-        template='plotly_white',
-        height=500,
-        xaxis_rangeslider_visible=False
+    # OHLC bars are fed by the same snapshots that bump the history version
+    return get_cache_regions()["history"].get_or_build(
+        ("ohlc", from_currency, to_currency, interval, days), get_history_store().version, build
     )
-    
-    return fig
 
 def render_enhanced_charts(from_currency, to_currency):
     """Render enhanced charts with multiple types"""
     st.markdown("### 📈 Advanced Exchange Rate Analytics")
     
-    col1, col2, col3 = st.columns([2, 2, 2])
+    col1, col2, col3, col4 = st.columns([2, 2, 1, 2])
     
     with col1:
         period = st.selectbox("📅 Select Time Period", ["7 days", "30 days", "90 days", "180 days"], index=1, key="chart_period")
@@ -488,25 +408,51 @@ def render_enhanced_charts(from_currency, to_currency):
         chart_type = st.selectbox("📊 Chart Type", ["Line Chart", "Area Chart", "Candlestick", "OHLC"], key="chart_type")
     
     with col3:
+        bar_interval = st.selectbox(
+            "🕯️ Bar",
+            list(INTERVALS),
+            index=list(INTERVALS).index("1d"),
+            key="bar_interval",
+            disabled=chart_type not in ("Candlestick", "OHLC")
+        )
+    
+    with col4:
         show_volume = st.checkbox("📊 Show Volume", value=False, key="show_volume")
     
+    col1, col2, _ = st.columns([2, 2, 3])
+    
+    with col1:
+        forecast_model = st.selectbox(
+            "🔮 Forecast",
+            ["None", *MODELS],
+            key="forecast_model",
+            disabled=chart_type != "Line Chart",
+            help="Overlay a fitted model's forecast with its 95% confidence band"
+        )
+    
+    with col2:
+        forecast_horizon = st.number_input(
+            "Horizon (days)", min_value=1, max_value=MAX_FORECAST_HORIZON, value=14,
+            key="forecast_horizon", disabled=chart_type != "Line Chart" or forecast_model == "None"
+        )
+    
     days_map = {"7 days": 7, "30 days": 30, "90 days": 90, "180 days": 180}
     days = days_map[period]
     
-    historical_data = get_historical_data(from_currency, to_currency, days)
-    
-    if not historical_data.empty:
-        # Create chart based on selected type
-        if chart_type == "Line Chart":
-            fig = create_line_chart(historical_data, from_currency, to_currency)
-        elif chart_type == "Area Chart":
-            fig = create_area_chart(historical_data, from_currency, to_currency)
-        elif chart_type == "Candlestick":
-            fig = create_candlestick_chart(historical_data, from_currency, to_currency)
-        elif chart_type == "OHLC":
-            fig = create_ohlc_chart(historical_data, from_currency, to_currency)
-        else:
-            fig = create_line_chart(historical_data, from_currency, to_currency)
+    stats = pair_stats(from_currency, to_currency, days)
+    
+    if stats is None:
+        st.error("No rate history recorded for this pair yet. Please try again later.")
+    elif stats['count'] == 1:
+        st.info("📅 Only one day of rate history has been recorded so far. Trends appear as snapshots accumulate.")
+    else:
+        candles = chart_type in ("Candlestick", "OHLC")
+        forecast = (forecast_model, int(forecast_horizon)) if chart_type == "Line Chart" and forecast_model != "None" else None
+        key = (from_currency, to_currency, days, chart_type, bar_interval if candles else None, forecast)
+        fig = get_cache_regions()["figures"].get_or_build(
+            key, get_history_store().version,
+            lambda: build_chart_figure(from_currency, to_currency, days, chart_type, bar_interval, stats, forecast)
+        )
         
         st.plotly_chart(fig, use_container_width=True, config={
             'displayModeBar': True,
@@ -514,23 +460,95 @@ def render_enhanced_charts(from_currency, to_currency):
             'modeBarButtonsToRemove': ['pan2d', 'lasso2d']
         })
         
-        render_chart_analytics(historical_data, from_currency, to_currency)
+        render_chart_analytics(stats, from_currency, to_currency)
+        render_pair_comparison(from_currency, days)
+
+def render_pair_comparison(quote_currency, days):
+    """Correlation heatmap, normalized performance and rolling betas across many currencies"""
+    with st.expander(f"🔀 Compare Currencies (quoted in {quote_currency})"):
+        col1, col2, col3 = st.columns([3, 1, 1])
+        
+        with col1:
+            selected = st.multiselect(
+                "Currencies",
+                CURRENCY_DATA.codes,
+                default=[code for code in LIVE_TABLE_CURRENCIES if code != quote_currency],
+                format_func=get_currency_display_name,
+                key="compare_codes"
+            )
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            compare_all = st.checkbox("All currencies", value=False, key="compare_all",
+                                      help="Correlation heatmap over every recorded currency")
+        
+        with col3:
+            beta_window = st.number_input("Beta window (days)", min_value=5, max_value=90, value=DEFAULT_BETA_WINDOW,
+                                          key="compare_beta_window")
+        
+        codes = tuple(CURRENCY_DATA.codes if compare_all else selected)
+        if not codes:
+            st.info("Select currencies to compare.")
+            return
+        
+        # One cached pass per window and history version serves all three charts
+        comparison = get_cache_regions()["history"].get_or_build(
+            ("compare", quote_currency, codes, days, beta_window), get_history_store().version,
+            timed("pair_comparison_build")(lambda: compare_pairs(codes, quote_currency, days, beta_window=beta_window))
+        )
+        if len(comparison['dates']) < 2:
+            st.info("📅 Not enough shared history for these currencies yet.")
+            return
+        
+        st.plotly_chart(create_correlation_heatmap(comparison, quote_currency), use_container_width=True)
+        if compare_all:
+            return
+        st.plotly_chart(create_performance_chart(comparison, quote_currency), use_container_width=True)
+        if len(comparison['codes']) > 1:
+            st.plotly_chart(create_beta_chart(comparison, quote_currency, beta_window), use_container_width=True)
+
+@timed("chart_figure_build")
+def build_chart_figure(from_currency, to_currency, days, chart_type, bar_interval, stats, forecast=None):
+    """Load, downsample and plot a pair's history for the selected chart type
+
+    ``forecast`` is an optional ``(model, horizon)`` overlaid on the line chart.
+    """
+    if chart_type in ("Candlestick", "OHLC"):
+        chart_data = prepare_chart_data(get_ohlc_data(from_currency, to_currency, bar_interval, days), chart_type)
     else:
-        st.error("Unable to load chart data. Please try again later.")
+        chart_data = prepare_chart_data(get_historical_data(from_currency, to_currency, days), chart_type)
+    
+    # Create chart based on selected type
+    if chart_type == "Line Chart":
+        trend = trend_values(stats, datetime64_to_ordinals(chart_data['date'].to_numpy()))
+        overlay = None
+        if forecast is not None:
+            model, horizon = forecast
+            overlay = pair_forecast(from_currency, to_currency, model, horizon)
+            if overlay is not None:
+                overlay['model'] = model
+        return create_line_chart(chart_data, from_currency, to_currency, trend, overlay)
+    elif chart_type == "Area Chart":
+        return create_area_chart(chart_data, from_currency, to_currency)
+    elif chart_type == "Candlestick":
+        return create_candlestick_chart(chart_data, from_currency, to_currency)
+    elif chart_type == "OHLC":
+        return create_ohlc_chart(chart_data, from_currency, to_currency)
+    return create_line_chart(chart_data, from_currency, to_currency)
 
-def render_chart_analytics(data, from_currency, to_currency):
-    """Render chart analytics and insights"""
+def render_chart_analytics(stats, from_currency, to_currency):
+    """Render chart analytics and insights from the rolling pair statistics"""
     st.markdown("### 📊 Chart Analytics")
     
-    current_rate = data['rate'].iloc[-1]
-    previous_rate = data['rate'].iloc[-2] if len(data) > 1 else current_rate
+    current_rate = stats['current']
+    previous_rate = stats['previous']
     change = current_rate - previous_rate
     change_pct = (change / previous_rate) * 100 if previous_rate != 0 else 0
     
-    volatility = data['rate'].std()
-    avg_rate = data['rate'].mean()
-    min_rate = data['rate'].min()
-    max_rate = data['rate'].max()
+    volatility = stats['std']
+    avg_rate = stats['mean']
+    min_rate = stats['min']
+    max_rate = stats['max']
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -566,6 +584,175 @@ def render_chart_analytics(data, from_currency, to_currency):
                 st.warning("🔸 Moderate volatility - Normal fluctuations")
             else:
                 st.error("🔺 High volatility - Significant price swings")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            st.metric(label="Annualized Volatility", value=f"{stats['annualized_volatility'] * 100:.2f}%",
+                      help="Standard deviation of daily log returns, annualized")
+        
+        with col2:
+            st.metric(label="Mean Daily Log Return", value=f"{stats['log_return_mean'] * 100:+.3f}%")
+        
+        with col3:
+            st.metric(label=f"EMA ({EMA_SPAN} days)", value=f"{stats['ema']:.4f}",
+                      delta=f"{((current_rate - stats['ema']) / stats['ema'] * 100):+.2f}%")
+
+def render_bulk_conversion(from_currency, to_currency):
+    """Render CSV upload/download bulk conversion"""
+    with st.expander("📂 Bulk CSV Conversion"):
+        st.markdown(
+            f"Upload a CSV with an `{AMOUNT_COLUMN}` column and optional `{FROM_COLUMN}` / `{TO_COLUMN}` columns. "
+            f"Rows without currency columns are converted from {from_currency} to {to_currency}."
+        )
+        uploaded_file = st.file_uploader("Ledger CSV", type=["csv"], key="bulk_upload")
+        
+        if uploaded_file is not None:
+            output = io.StringIO()
+            try:
+                rows = convert_csv(fetch_exchange_rates(), uploaded_file, output,
+                                   default_from=from_currency, default_to=to_currency,
+                                   rounding=st.session_state.rounding_mode if st.session_state.exact_mode else None)
+            except (KeyError, ValueError) as e:
+                st.error(f"❌ Could not convert file: {e}")
+                return
+            
+            st.success(f"✅ Converted {rows:,} rows")
+            st.download_button(
+                "⬇️ Download converted CSV",
+                output.getvalue(),
+                file_name=f"converted_{uploaded_file.name}",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+def session_footprint():
+    """Approximate bytes held by each of this session's state entries
+
+    Process-wide objects a session only points at are not counted.
+    """
+    shared = {id(CURRENCY_DATA), id(CURRENCY_DATA.codes), id(CURRENCY_DATA.index)}
+    return {key: deep_sizeof(value, shared) for key, value in st.session_state.items()}
+
+def report_session_footprint():
+    """Publish this session's footprint to the process-wide table, at most once per interval"""
+    now = time.time()
+    if now - st.session_state.get('footprint_reported_at', 0.0) < MEMORY_REPORT_INTERVAL:
+        return
+    st.session_state.footprint_reported_at = now
+    session_key = st.session_state.setdefault('session_key', uuid.uuid4().hex)
+    get_session_footprints().report(session_key, session_footprint())
+
+def render_memory_usage():
+    """Per-session and process-wide memory figures for sizing deployments"""
+    with st.expander("🧠 Memory Usage"):
+        summary = get_session_footprints().summary()
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Sessions", f"{summary['sessions']:,}")
+        col2.metric("Session state (total)", format_bytes(summary['total']))
+        col3.metric("Per session (mean)", format_bytes(summary['mean']))
+        col4.metric("Per session (max)", format_bytes(summary['max']))
+        
+        sizes = session_footprint()
+        table = "| This session's state | Bytes |\n|---|---|\n"
+        table += "".join(f"| {key} | {size:,} |\n" for key, size in sorted(sizes.items(), key=lambda item: -item[1]))
+        st.markdown(table)
+        history = get_conversion_history()
+        st.caption(f"Conversion history: {len(history):,} entries in {format_bytes(history.nbytes)}, growing to at most "
+                   f"{format_bytes(HISTORY_CAPACITY * ENTRY_DTYPE.itemsize)}")
+        
+        # Walking the shared caches costs time, so it only runs on request
+        if st.button("📏 Measure shared state"):
+            shared = {
+                **{f"cache: {region.name}": deep_sizeof(region) for region in get_cache_regions()},
+                "analytics": deep_sizeof(get_analytics_book()),
+                "forecasts": deep_sizeof(get_forecast_book()),
+                "currency registry": deep_sizeof(CURRENCY_DATA),
+            }
+            table = "| Shared state | Bytes |\n|---|---|\n"
+            table += "".join(f"| {name} | {size:,} |\n" for name, size in shared.items())
+            st.markdown(table)
+            rss = peak_rss()
+            st.caption(f"Shared total {format_bytes(sum(shared.values()))}"
+                       + (f" · peak process RSS {format_bytes(rss)}" if rss else ""))
+
+def render_performance_metrics():
+    """Stage timings with percentiles, and the Prometheus export of every metric"""
+    with st.expander("⏱️ Performance"):
+        registry = get_metrics()
+        rows = [row for row in registry.summary() if row[2]]
+        if not rows:
+            st.info("No timings recorded yet." if METRICS_ENABLED else "Metrics are disabled (METRICS_ENABLED=0).")
+            return
+        
+        def ms(seconds):
+            return f"{seconds * 1000:,.2f}"
+        
+        table = "| Stage | Calls | Mean (ms) | p50 (ms) | p90 (ms) | p99 (ms) |\n|---|---|---|---|---|---|\n"
+        table += "".join(
+            f"| {labels.get('stage', name)} | {calls:,} | {ms(mean)} | {ms(p50)} | {ms(p90)} | {ms(p99)} |\n"
+            for name, labels, calls, mean, p50, p90, p99 in rows
+        )
+        st.markdown(table)
+        st.download_button("📥 Prometheus metrics", registry.export(), file_name="metrics.txt", mime="text/plain")
+
+def format_bytes(size):
+    """Human-readable byte count"""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+    return f"{size:,.1f} GB"
+
+def render_arbitrage_scanner():
+    """Render the cross-rate inconsistency scanner"""
+    with st.expander("🔺 Arbitrage Scanner"):
+        col1, col2, col3 = st.columns([2, 2, 1])
+        
+        with col1:
+            threshold_bp = st.number_input("Minimum spread (basis points)", min_value=0.0, value=1.0, step=0.5,
+                                           key="arbitrage_threshold")
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            longer_cycles = st.checkbox("Search longer cycles (Bellman-Ford)", value=False, key="arbitrage_cycles")
+        
+        with col3:
+            st.markdown("<br>", unsafe_allow_html=True)
+            scan_button = st.button("🔍 Scan", use_container_width=True)
+        
+        if not scan_button:
+            return
+        
+        try:
+            quotes, sources = arbitrage_quotes()
+        except RATES_UNAVAILABLE:
+            st.error("🚫 No exchange rates available yet.")
+            return
+        
+        threshold = threshold_bp / 10_000
+        started = time.perf_counter()
+        total, triangles = scan_triangles(quotes, CURRENCY_DATA.codes, threshold, limit=ARBITRAGE_ROWS)
+        cycle = find_arbitrage_cycle(quotes, CURRENCY_DATA.codes, threshold) if longer_cycles else None
+        elapsed = time.perf_counter() - started
+        
+        st.caption(f"Quotes from {', '.join(sources)} · scanned in {elapsed * 1000:,.0f} ms")
+        if len(sources) < 2:
+            st.info("Only one rate source is configured, so cross rates are consistent by construction. "
+                    "Set `RATE_PROVIDERS` to compare several providers.")
+        
+        if cycle:
+            spread, path = cycle
+            st.warning(f"♻️ Cycle {' → '.join(path)}: {spread * 10_000:,.1f} bp")
+        
+        if triangles:
+            table = "| Triangle | Spread (bp) |\n|---|---|\n"
+            table += "".join(f"| {' → '.join(path + path[:1])} | {spread * 10_000:,.2f} |\n"
+                             for spread, path in triangles)
+            st.markdown(table)
+            st.caption(f"{total:,} triangles above {threshold_bp:g} bp; showing the widest {len(triangles)}")
+        elif not cycle:
+            st.success("✅ No cross-rate inconsistencies above the threshold")
 
 def render_header():
     """Render main header"""
@@ -576,6 +763,52 @@ def render_header():
     </div>
     """, unsafe_allow_html=True)
 
+def describe_alert(alert):
+    """One-line description of a rate alert"""
+    pair = f"{alert['from_currency']}/{alert['to_currency']}"
+    if alert['kind'] == "move":
+        return f"{pair} moves {alert['value']:g}% from {alert['reference']:.4f}"
+    return f"{pair} {alert['kind']} {alert['value']:.4f}"
+
+def render_rate_alerts():
+    """Sidebar form and list of this browser's rate alerts"""
+    st.markdown("#### 🔔 Rate Alerts")
+    from_currency, to_currency = st.session_state.from_currency, st.session_state.to_currency
+    engine = get_alert_engine()
+    user_id = get_history_user_id()
+    
+    kind = st.selectbox("Alert when rate", ALERT_KINDS, format_func=ALERT_LABELS.get, key="alert_kind")
+    value = st.number_input("Move (%)" if kind == "move" else f"Rate ({to_currency} per {from_currency})",
+                            min_value=0.0, value=1.0, format="%.4f", key="alert_value")
+    if st.button(f"➕ Alert on {from_currency}/{to_currency}", use_container_width=True):
+        try:
+            reference = get_rate_matrix().rate(from_currency, to_currency) if kind == "move" else None
+            engine.add(user_id, from_currency, to_currency, kind, value, reference)
+        except (ValueError, *RATES_UNAVAILABLE) as e:
+            st.error(f"Could not add alert: {e}")
+    
+    for alert in engine.alerts_for(user_id)[:ALERT_ROWS]:
+        col1, col2 = st.columns([5, 1])
+        with col1:
+            if alert['triggered_at']:
+                st.caption(f"✅ {describe_alert(alert)} · hit {alert['triggered_rate']:.4f}")
+            else:
+                st.caption(f"⏳ {describe_alert(alert)}")
+        with col2:
+            if st.button("✖", key=f"alert_remove_{alert['id']}"):
+                engine.remove(user_id, alert['id'])
+                st.rerun()
+
+def announce_triggered_alerts():
+    """Toast alerts that fired since this session last looked"""
+    seen = st.session_state.get('alerts_seen_at')
+    latest = seen or 0.0
+    for alert in get_alert_engine().alerts_for(get_history_user_id()):
+        if seen is not None and alert['triggered_at'] and alert['triggered_at'] > seen:
+            st.toast(f"🔔 {describe_alert(alert)} · now {alert['triggered_rate']:.4f}")
+        latest = max(latest, alert['triggered_at'] or 0.0)
+    st.session_state.alerts_seen_at = latest
+
 def render_sidebar():
     """Render sidebar with quick tools"""
     with st.sidebar:
@@ -592,12 +825,34 @@ def render_sidebar():
         
         st.markdown("---")
         
+        render_rate_alerts()
+        
+        st.markdown("---")
+        
         st.markdown("#### 📊 Market Status")
-        if st.session_state.last_update:
-            st.success(f"✅ Last updated: {st.session_state.last_update.strftime('%H:%M:%S')}")
+        last_update = get_rate_feed().timestamp
+        if last_update:
+            st.success(f"✅ Last updated: {last_update.strftime('%H:%M:%S')}")
         else:
             st.info("🔄 Ready to fetch rates")
         
+        fetch_stats = get_rate_fetcher().stats
+        if fetch_stats.requests:
+            st.caption(
+                f"🌐 {fetch_stats.requests} upstream fetches · {fetch_stats.not_modified} unchanged (304) · "
+                f"{fetch_stats.bytes_transferred / 1024:,.1f} KB · avg {fetch_stats.average_latency * 1000:,.0f} ms"
+            )
+        
+        cache_lines = [
+            f"{region.name}: {region.hits} hits · {region.misses} builds · {region.hit_rate:.0%}"
+            for region in get_cache_regions() if region.hits + region.misses
+        ]
+        if cache_lines:
+            st.caption("🗄️ Cache " + " | ".join(cache_lines))
+        
+        st.checkbox("🔬 Profile reruns", value=False, key="profile_session",
+                    help="Profile each full rerun of this session and show the report at the bottom of the page")
+        
         st.markdown("#### 📈 Today's Highlights")
         st.info("💹 USD/INR: Trending up")
         st.info("💹 EUR/USD: Stable range")
@@ -636,6 +891,138 @@ def render_footer():
     </div>
     """, unsafe_allow_html=True)
 
+@st.fragment(run_every=LIVE_UPDATE_INTERVAL)
+@timed("result_card_fragment")
+def render_result_card(amount, from_currency, to_currency, rounding):
+    """Result card of the last conversion, re-rendered as pushed rates arrive"""
+    try:
+        rate_matrix = fetch_exchange_rates()
+        converted_amount, rate = convert(amount, from_currency, to_currency, rounding, rate_matrix)
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        return
+    except Exception as e:
+        st.error("🚫 Failed to fetch exchange rate. Please check your internet connection or try again later.")
+        return
+    
+    trend = CHANGE_MARKERS[get_rate_feed().pair_change(from_currency, to_currency)]
+    st.markdown(f"""
+    <div class="result-card">
+        <div class="result-amount">{format_currency(converted_amount, to_currency)}</div>
+        <div class="result-rate">1 {from_currency} = {rate:.4f} {to_currency} {trend}</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{rate:.4f}</div>
+            <div class="metric-label">Exchange Rate</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        reverse_rate = rate_matrix.rate(to_currency, from_currency)
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{reverse_rate:.4f}</div>
+            <div class="metric-label">Reverse Rate</div>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        fee_estimate = converted_amount * (Decimal("0.02") if rounding else 0.02)
+        st.markdown(f"""
+        <div class="metric-card">
+            <div class="metric-value">{format_currency(fee_estimate, to_currency)}</div>
+            <div class="metric-label">Est. Transfer Fee (2%)</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+def build_live_rates_table(rate_matrix, feed, base_currency, comparison_currencies):
+    """Markdown table of live rates against ``base_currency``, with ▲/▼ on pairs that moved"""
+    comparison_data = []
+    
+    for currency in comparison_currencies:
+        if currency != base_currency and currency in rate_matrix:
+            rate = rate_matrix.rate(base_currency, currency)
+            reverse_rate = rate_matrix.rate(currency, base_currency)
+            change = CHANGE_MARKERS[feed.pair_change(base_currency, currency)]
+            currency_info = CURRENCY_DATA.get(currency, {"flag": "", "name": currency})
+            comparison_data.append({
+                "Currency": f"{currency_info['flag']} {currency}",
+                "Name": currency_info['name'],
+                f"Rate (1 {base_currency} =)": f"{rate:.4f} {change}",
+                f"Reverse (in {base_currency})": f"{reverse_rate:.4f} {base_currency}"
+            })
+    
+    if not comparison_data:
+        return ""
+    # A markdown table keeps pandas/pyarrow off the first render
+    columns = list(comparison_data[0].keys())
+    table = "| " + " | ".join(columns) + " |\n|" + "---|" * len(columns) + "\n"
+    table += "".join("| " + " | ".join(row.values()) + " |\n" for row in comparison_data)
+    return table
+
+@st.fragment(run_every=LIVE_UPDATE_INTERVAL)
+@timed("live_rates_fragment")
+def render_live_rates():
+    """Live rates table, re-rendered on its own as the background feed publishes snapshots"""
+    st.markdown("### 🌍 Live Currency Rates")
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    
+    with col1:
+        currency_options = CURRENCY_DATA.codes
+        base_currency = st.selectbox(
+            "Base Currency",
+            currency_options,
+            index=CURRENCY_DATA.index["USD"],
+            format_func=get_currency_display_name,
+            key="live_base"
+        )
+    
+    with col2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        show_all = st.checkbox("Show all currencies", value=False, key="live_show_all")
+    
+    with col3:
+        st.markdown("<br>", unsafe_allow_html=True)
+        refresh_button = st.button("🔄 Refresh All Rates")
+    
+    if refresh_button:
+        # Only the live snapshot is dropped; history and figures follow their own versions
+        get_cache_regions().invalidate("live")
+        try:
+            get_rate_store().refresh(force=True)
+            st.success("Rates refreshed!")
+        except RATES_UNAVAILABLE:
+            st.warning("API request failed. Showing the last available rates.")
+    
+    try:
+        # Every base is served from the one shared snapshot
+        rate_matrix = fetch_exchange_rates()
+        feed = get_rate_feed()
+        comparison_currencies = CURRENCY_DATA.codes if show_all else ["USD"] + LIVE_TABLE_CURRENCIES
+        table = get_cache_regions()["live"].get_or_build(
+            ("table", base_currency, show_all), (feed.sequence, rate_matrix.timestamp),
+            lambda: build_live_rates_table(rate_matrix, feed, base_currency, comparison_currencies)
+        )
+        if table:
+            st.markdown(table)
+        
+        # Announce each new snapshot once per session
+        seen = st.session_state.get('feed_sequence', 0)
+        if seen and feed.sequence > seen:
+            st.toast(f"💱 Rates updated at {feed.timestamp.strftime('%H:%M:%S')}")
+        st.session_state.feed_sequence = feed.sequence
+        announce_triggered_alerts()
+    
+    except Exception as e:
+        st.error("Unable to load currency comparison table")
+
 # Main Application
 def main():
     """Main application function"""
@@ -649,11 +1036,11 @@ def main():
     col1, col2, col3 = st.columns([2, 1, 2])
     
     with col1:
-        currency_options = list(CURRENCY_DATA.keys())
+        currency_options = CURRENCY_DATA.codes
         from_currency = st.selectbox(
             "From Currency", 
             currency_options, 
-            index=currency_options.index(st.session_state.from_currency), 
+            index=CURRENCY_DATA.index[st.session_state.from_currency], 
             format_func=get_currency_display_name, 
             key="from_select"
         )
@@ -668,7 +1055,7 @@ def main():
         to_currency = st.selectbox(
             "To Currency", 
             currency_options, 
-            index=currency_options.index(st.session_state.to_currency), 
+            index=CURRENCY_DATA.index[st.session_state.to_currency], 
             format_func=get_currency_display_name, 
             key="to_select"
         )
@@ -686,6 +1073,19 @@ def main():
     
     col1, col2 = st.columns([3, 2])
     
+    with col1:
+        exact_mode = st.checkbox(
+            "🎯 Exact decimal mode",
+            value=False,
+            key="exact_mode",
+            help="Convert with decimal arithmetic, rounded to the target currency's minor unit"
+        )
+    
+    with col2:
+        rounding = st.selectbox("Rounding", ROUNDING_MODES, key="rounding_mode", disabled=not exact_mode)
+    
+    col1, col2 = st.columns([3, 2])
+    
     with col1:
         convert_button = st.button("✅ Convert Now", use_container_width=True, type="primary")
     
@@ -695,61 +1095,32 @@ def main():
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Handle conversion
+    conversion = (amount, from_currency, to_currency, rounding if exact_mode else None)
     if convert_button:
         if from_currency == to_currency:
             st.warning("⚠️ Please select different currencies for conversion.")
+            st.session_state.live_conversion = None
         else:
             with st.spinner("🔄 Fetching live exchange rates..."):
                 try:
-                    data = fetch_exchange_rates(from_currency)
+                    rate_matrix = fetch_exchange_rates()
                     
-                    if to_currency in data["rates"]:
-                        rate = data["rates"][to_currency]
-                        converted_amount = rate * amount
-                        
-                        st.markdown(f"""
-                        <div class="result-card">
-                            <div class="result-amount">{format_currency(converted_amount, to_currency)}</div>
-                            <div class="result-rate">1 {from_currency} = {rate:.4f} {to_currency}</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
+                    if from_currency in rate_matrix and to_currency in rate_matrix:
+                        converted_amount, rate = convert(amount, from_currency, to_currency, conversion[3], rate_matrix)
                         add_to_history(from_currency, to_currency, amount, converted_amount, rate)
-                        
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <div class="metric-value">{rate:.4f}</div>
-                                <div class="metric-label">Exchange Rate</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col2:
-                            reverse_rate = 1 / rate
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <div class="metric-value">{reverse_rate:.4f}</div>
-                                <div class="metric-label">Reverse Rate</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
-                        with col3:
-                            fee_estimate = converted_amount * 0.02
-                            st.markdown(f"""
-                            <div class="metric-card">
-                                <div class="metric-value">{format_currency(fee_estimate, to_currency)}</div>
-                                <div class="metric-label">Est. Transfer Fee (2%)</div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                        
+                        st.session_state.live_conversion = conversion
                     else:
                         st.error(f"❌ Conversion rate for {to_currency} not found.")
                         
+                except ValueError as e:
+                    st.error(f"❌ {e}")
                 except Exception as e:
                     st.error("🚫 Failed to fetch exchange rate. Please check your internet connection or try again later.")
     
+    # The result card follows live rates until the inputs change
+    if st.session_state.get('live_conversion') == conversion:
+        render_result_card(*conversion)
+    
     # Handle chart display
     if chart_button:
         st.session_state.show_chart = True
@@ -758,59 +1129,30 @@ def main():
         render_enhanced_charts(from_currency, to_currency)
     
     # Conversion history
-    if st.session_state.conversion_history:
-        st.markdown("### 📜 Conversion History")
-        
-        if st.button("🗑️ Clear History"):
-            st.session_state.conversion_history = []
-            st.success("History cleared!")
-            st.rerun()
-        
-        for i, conversion in enumerate(st.session_state.conversion_history[:5]):
-            with st.expander(f"{conversion['from_currency']} → {conversion['to_currency']} | {conversion['timestamp']}"):
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.write(f"**Amount:** {format_currency(conversion['amount'], conversion['from_currency'])}")
-                    st.write(f"**Converted:** {format_currency(conversion['converted_amount'], conversion['to_currency'])}")
-                
-                with col2:
-                    st.write(f"**Rate:** {conversion['rate']:.4f}")
-                    st.write(f"**Time:** {conversion['timestamp']}")
-    
-    # Live currency rates table
-    st.markdown("### 🌍 Live Currency Rates (Base: USD)")
+    render_conversion_history()
     
-    if st.button("🔄 Refresh All Rates"):
-        st.cache_data.clear()
-        st.success("Rates refreshed!")
+    render_bulk_conversion(from_currency, to_currency)
+    render_arbitrage_scanner()
     
-    try:
-        base_currency = "USD"
-        data = fetch_exchange_rates(base_currency)
-        
-        comparison_currencies = ["EUR", "GBP", "JPY", "INR", "AUD", "CAD", "CHF", "CNY", "SGD"]
-        comparison_data = []
-        
-        for currency in comparison_currencies:
-            if currency in data["rates"]:
-                rate = data["rates"][currency]
-                currency_info = CURRENCY_DATA.get(currency, {"flag": "", "name": currency})
-                comparison_data.append({
-                    "Currency": f"{currency_info['flag']} {currency}",
-                    "Name": currency_info['name'],
-                    "Rate (1 USD =)": f"{rate:.4f}",
-                    "Reverse (1 {currency} =)": f"{1/rate:.4f} USD"
-                })
-        
-        if comparison_data:
-            df = pd.DataFrame(comparison_data)
-            st.dataframe(df, use_container_width=True, hide_index=True)
+    # Live currency rates table
+    render_live_rates()
     
-    except Exception as e:
-        st.error("Unable to load currency comparison table")
+    report_session_footprint()
+    render_memory_usage()
+    render_performance_metrics()
     
     render_footer()
 
+def run_app():
+    """One timed rerun of the app, profiled when this session asked for it"""
+    if not st.session_state.get('profile_session'):
+        with timer("rerun"):
+            main()
+        return
+    with Profiler() as profiler, timer("rerun"):
+        main()
+    with st.expander("🔬 Profile of this rerun", expanded=True):
+        st.code(profiler.report(), language=None)
+
 if __name__ == "__main__":
-    main()
+    run_app()
@@ -0,0 +1,84 @@
+import sys
+import threading
+import time
+import numpy as np
+
+# Sessions that have not reported for this long are assumed gone
+SESSION_TTL = 3600
+
+def deep_sizeof(obj, exclude=frozenset(), _seen=None):
+    """Approximate bytes held by ``obj`` and everything it references
+
+    Objects whose id is in ``exclude`` (process-wide state a session merely
+    points at) and objects already counted are skipped. NumPy arrays count
+    their buffer; memory maps count nothing, since the page cache backs them.
+    """
+    seen = set(exclude) if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.memmap):
+        return 0
+    size = sys.getsizeof(obj)
+    if isinstance(obj, np.ndarray):
+        # Views report only their header; count the buffer they keep alive once
+        if obj.base is not None:
+            size += deep_sizeof(obj.base, exclude, seen)
+        return size
+    if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(key, exclude, seen) + deep_sizeof(value, exclude, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, exclude, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), exclude, seen)
+    for slot in getattr(type(obj), "__slots__", ()):
+        if hasattr(obj, slot):
+            size += deep_sizeof(getattr(obj, slot), exclude, seen)
+    return size
+
+class SessionFootprints:
+    """Latest per-key byte counts reported by every live session
+
+    Sessions report their own state (throttled by the caller); entries not
+    refreshed within ``ttl`` seconds are dropped, so the table tracks the
+    sessions the process is actually holding.
+    """
+
+    def __init__(self, ttl=SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def report(self, session_key, sizes):
+        with self._lock:
+            self._sessions[session_key] = (time.time(), dict(sizes))
+
+    def snapshot(self):
+        """``{session_key: {state key: bytes}}`` of the sessions seen within ``ttl``"""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for key in [key for key, (seen_at, _) in self._sessions.items() if seen_at < cutoff]:
+                del self._sessions[key]
+            return {key: sizes for key, (_, sizes) in self._sessions.items()}
+
+    def summary(self):
+        """Session count and total, mean and largest bytes per session"""
+        totals = [sum(sizes.values()) for sizes in self.snapshot().values()]
+        return {
+            "sessions": len(totals),
+            "total": sum(totals),
+            "mean": sum(totals) / len(totals) if totals else 0,
+            "max": max(totals, default=0),
+        }
+
+def peak_rss():
+    """Peak resident set size of the process in bytes, or None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,148 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Bar widths in seconds; weekly bars start on Monday 00:00 UTC
+INTERVALS = {"1m": 60, "1h": 3600, "1d": 86400, "1w": 7 * 86400}
+WEEK_OFFSET = 4 * 86400  # 1970-01-01 was a Thursday
+# Series of (pair, interval) combinations kept up to date; the least recently viewed go first
+MAX_SERIES = 64
+
+def bucket_starts(timestamps, interval):
+    """Start of the bar containing each epoch-second timestamp"""
+    width = INTERVALS[interval]
+    offset = WEEK_OFFSET if interval == "1w" else 0
+    return np.floor((np.asarray(timestamps, dtype=np.float64) - offset) / width) * width + offset
+
+def resample_ohlc(timestamps, values, interval):
+    """Aggregate time-ordered samples into OHLC bars in one vectorized pass
+
+    Returns ``(starts, open, high, low, close, count)`` arrays, one entry per
+    non-empty bar. NaN samples are ignored.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    timestamps, values = timestamps[valid], values[valid]
+    if len(values) == 0:
+        empty = np.empty(0)
+        return empty, empty, empty, empty, empty, np.empty(0, dtype=np.int64)
+    buckets = bucket_starts(timestamps, interval)
+    firsts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    lasts = np.append(firsts[1:], len(values)) - 1
+    return (
+        buckets[firsts],
+        values[firsts],
+        np.maximum.reduceat(values, firsts),
+        np.minimum.reduceat(values, firsts),
+        values[lasts],
+        lasts - firsts + 1,
+    )
+
+FIELDS = ("starts", "open", "high", "low", "close", "count")
+
+class OHLCSeries:
+    """Growable OHLC bars for one pair and interval
+
+    ``update`` folds a new sample into the last (open) bar or starts a new
+    one, so appending snapshots never recomputes completed bars. Samples at
+    or before the last one added are ignored, so a snapshot seen both in the
+    loaded history and by the listener counts once.
+    """
+
+    def __init__(self, interval, capacity=64):
+        self.interval = interval
+        self.last_timestamp = -np.inf
+        self._size = 0
+        self._columns = {field: np.empty(capacity, dtype=np.int64 if field == "count" else np.float64)
+                         for field in FIELDS}
+
+    def __len__(self):
+        return self._size
+
+    def _grow(self, needed):
+        capacity = len(self._columns["close"])
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2)
+        for field, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[field] = grown
+
+    def extend(self, timestamps, values):
+        """Append samples newer than the last one added, merging into the open bar"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        newer = timestamps > self.last_timestamp
+        if not newer.all():
+            timestamps, values = timestamps[newer], values[newer]
+        if len(timestamps):
+            self.last_timestamp = timestamps[-1]
+        bars = resample_ohlc(timestamps, values, self.interval)
+        if len(bars[0]) == 0:
+            return
+        starts = bars[0]
+        if self._size:
+            last_start = self._columns["starts"][self._size - 1]
+            keep = starts >= last_start
+            bars = tuple(column[keep] for column in bars)
+            if len(bars[0]) and bars[0][0] == last_start:
+                # First new bar continues the open bar
+                last = self._size - 1
+                self._columns["high"][last] = max(self._columns["high"][last], bars[2][0])
+                self._columns["low"][last] = min(self._columns["low"][last], bars[3][0])
+                self._columns["close"][last] = bars[4][0]
+                self._columns["count"][last] += bars[5][0]
+                bars = tuple(column[1:] for column in bars)
+        added = len(bars[0])
+        if added:
+            self._grow(self._size + added)
+            for field, column in zip(FIELDS, bars):
+                self._columns[field][self._size:self._size + added] = column
+            self._size += added
+
+    def update(self, timestamp, value):
+        """Fold one sample into the series in O(1)"""
+        self.extend([timestamp], [value])
+
+    def since(self, start_timestamp):
+        """Views of the bars starting at or after ``start_timestamp``"""
+        starts = self._columns["starts"][:self._size]
+        first = np.searchsorted(starts, bucket_starts([start_timestamp], self.interval)[0])
+        return {field: column[first:self._size] for field, column in self._columns.items()}
+
+class OHLCBook:
+    """OHLC series per (pair, interval), built from snapshots on first use
+
+    ``on_snapshot`` is a ``RateStore`` listener that only touches the open
+    bar of each series already built. At most ``maxsize`` series are kept,
+    evicting the least recently viewed.
+    """
+
+    def __init__(self, load_pair_series, maxsize=MAX_SERIES):
+        self._load_pair_series = load_pair_series
+        self.maxsize = maxsize
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def bars(self, from_currency, to_currency, interval, start_timestamp):
+        """Copies of the bars of a pair from ``start_timestamp`` on"""
+        key = (from_currency, to_currency, interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = OHLCSeries(interval)
+                series.extend(*self._load_pair_series(from_currency, to_currency))
+                self._series[key] = series
+                if len(self._series) > self.maxsize:
+                    self._series.popitem(last=False)
+            self._series.move_to_end(key)
+            return {field: column.copy() for field, column in series.since(start_timestamp).items()}
+
+    def on_snapshot(self, rates, timestamp):
+        epoch = timestamp.timestamp()
+        with self._lock:
+            for (from_currency, to_currency, _), series in self._series.items():
+                if from_currency in rates and to_currency in rates:
+                    series.update(epoch, rates[to_currency] / rates[from_currency])
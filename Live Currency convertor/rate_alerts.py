@@ -0,0 +1,180 @@
+import math
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+
+DEFAULT_DB_PATH = os.environ.get(
+    "ALERTS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "alerts.db")
+)
+ALERT_KINDS = ("above", "below", "move")
+
+def valid_threshold(value):
+    """Whether ``value`` is a finite positive number usable as a threshold"""
+    try:
+        return math.isfinite(value) and value > 0
+    except TypeError:
+        return False
+
+class PairIndex:
+    """Sorted thresholds of the untriggered alerts on one pair
+
+    ``above`` alerts fire once the rate reaches their threshold, so the
+    triggered ones are a prefix of the ascending list; ``below`` alerts are a
+    suffix. A snapshot costs two bisections plus the alerts that fire.
+    """
+
+    __slots__ = ("above_thresholds", "above_ids", "below_thresholds", "below_ids")
+
+    def __init__(self):
+        self.above_thresholds, self.above_ids = [], []
+        self.below_thresholds, self.below_ids = [], []
+
+    def __len__(self):
+        return len(self.above_ids) + len(self.below_ids)
+
+    def add(self, side, threshold, alert_id):
+        thresholds, ids = self._side(side)
+        position = bisect_right(thresholds, threshold)
+        thresholds.insert(position, threshold)
+        ids.insert(position, alert_id)
+
+    def remove(self, side, threshold, alert_id):
+        thresholds, ids = self._side(side)
+        position = bisect_left(thresholds, threshold)
+        while position < len(ids) and thresholds[position] == threshold:
+            if ids[position] == alert_id:
+                del thresholds[position], ids[position]
+                return
+            position += 1
+
+    def pop_triggered(self, rate):
+        """Remove and return the ids of every alert crossed by ``rate``"""
+        above = bisect_right(self.above_thresholds, rate)
+        below = bisect_left(self.below_thresholds, rate)
+        triggered = self.above_ids[:above] + self.below_ids[below:]
+        del self.above_thresholds[:above], self.above_ids[:above]
+        del self.below_thresholds[below:], self.below_ids[below:]
+        return triggered
+
+    def _side(self, side):
+        if side == "above":
+            return self.above_thresholds, self.above_ids
+        return self.below_thresholds, self.below_ids
+
+class AlertEngine:
+    """Rate alerts of every user, indexed per pair and persisted to SQLite
+
+    ``above``/``below`` alerts fire when the rate crosses ``value``; ``move``
+    alerts fire when the rate moves ``value`` percent either way from the
+    reference rate at creation. Alerts fire once. ``on_snapshot`` is a
+    ``RateStore`` listener.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pairs = {}
+        self._active = {}
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS alerts ("
+                "id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, from_currency TEXT NOT NULL, "
+                "to_currency TEXT NOT NULL, kind TEXT NOT NULL, value REAL NOT NULL, reference REAL, "
+                "created_at REAL NOT NULL, triggered_at REAL, triggered_rate REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS alerts_user ON alerts (user_id)")
+            rows = conn.execute(
+                "SELECT id, from_currency, to_currency, kind, value, reference FROM alerts WHERE triggered_at IS NULL"
+            ).fetchall()
+        for alert_id, from_currency, to_currency, kind, value, reference in rows:
+            self._index(alert_id, from_currency, to_currency, kind, value, reference)
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self._active)
+
+    @staticmethod
+    def _thresholds(kind, value, reference):
+        if kind == "move":
+            return [("above", reference * (1 + value / 100)), ("below", reference * (1 - value / 100))]
+        return [(kind, value)]
+
+    def _index(self, alert_id, from_currency, to_currency, kind, value, reference):
+        pair = (from_currency, to_currency)
+        index = self._pairs.setdefault(pair, PairIndex())
+        thresholds = self._thresholds(kind, value, reference)
+        for side, threshold in thresholds:
+            index.add(side, threshold, alert_id)
+        self._active[alert_id] = (pair, thresholds)
+
+    def _unindex(self, alert_id):
+        pair, thresholds = self._active.pop(alert_id)
+        for side, threshold in thresholds:
+            self._pairs[pair].remove(side, threshold, alert_id)
+
+    def add(self, user_id, from_currency, to_currency, kind, value, reference=None):
+        """Register an alert and return its id; ``move`` alerts need a reference rate"""
+        if kind not in ALERT_KINDS:
+            raise ValueError(f"kind must be one of {', '.join(ALERT_KINDS)}")
+        if not valid_threshold(value):
+            raise ValueError("alert value must be a positive number")
+        if kind == "move" and not valid_threshold(reference):
+            raise ValueError("move alerts need a positive reference rate")
+        with self._lock:
+            with self._connect() as conn:
+                alert_id = conn.execute(
+                    "INSERT INTO alerts (user_id, from_currency, to_currency, kind, value, reference, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (user_id, from_currency, to_currency, kind, value, reference, time.time())
+                ).lastrowid
+            self._index(alert_id, from_currency, to_currency, kind, value, reference)
+        return alert_id
+
+    def remove(self, user_id, alert_id):
+        with self._lock:
+            with self._connect() as conn:
+                deleted = conn.execute("DELETE FROM alerts WHERE id = ? AND user_id = ?", (alert_id, user_id)).rowcount
+            if deleted and alert_id in self._active:
+                self._unindex(alert_id)
+
+    def alerts_for(self, user_id):
+        """A user's alerts, newest first, as dicts"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM alerts WHERE user_id = ? ORDER BY id DESC", (user_id,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def check(self, rates, timestamp=None):
+        """Fire every alert crossed by a ``{code: rate}`` snapshot; returns the fired ids"""
+        triggered_at = time.time() if timestamp is None else timestamp
+        fired = []
+        with self._lock:
+            for (from_currency, to_currency), index in self._pairs.items():
+                if not index or from_currency not in rates or to_currency not in rates:
+                    continue
+                rate = rates[to_currency] / rates[from_currency]
+                for alert_id in index.pop_triggered(rate):
+                    # Move alerts sit on both sides; drop the side that did not fire
+                    if alert_id in self._active:
+                        self._unindex(alert_id)
+                        fired.append((triggered_at, rate, alert_id))
+            if fired:
+                with self._connect() as conn:
+                    conn.executemany("UPDATE alerts SET triggered_at = ?, triggered_rate = ? WHERE id = ?", fired)
+        return [alert_id for _, _, alert_id in fired]
+
+    def on_snapshot(self, rates, timestamp):
+        self.check(rates, timestamp.timestamp())
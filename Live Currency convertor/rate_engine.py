@@ -0,0 +1,324 @@
+import threading
+import time
+import requests
+import numpy as np
+from datetime import datetime
+from metrics import observe
+
+RATES_API_URL = "https://api.exchangerate-api.com/v4/latest/{base}"
+SNAPSHOT_BASE = "USD"
+REFRESH_INTERVAL = 300
+RETRY_INTERVAL = 30
+# Forced refreshes closer together than this are served the current snapshot
+FORCED_REFRESH_INTERVAL = 10
+
+class RateMatrix:
+    """Cross-rate matrix derived from a single base snapshot
+
+    ``matrix[i, j]`` is the number of units of ``codes[j]`` bought by one
+    unit of ``codes[i]``; with a USD snapshot that is ``usd[j] / usd[i]``.
+    Currencies missing from the snapshot have NaN rows and columns.
+    """
+
+    def __init__(self, codes, base_rates, timestamp=None):
+        self.codes = tuple(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.base_rates = np.asarray(base_rates, dtype=np.float64)
+        self.timestamp = timestamp or datetime.now()
+        self.matrix = self.base_rates[np.newaxis, :] / self.base_rates[:, np.newaxis]
+        self.matrix.setflags(write=False)
+
+    def __contains__(self, currency_code):
+        return currency_code in self.index and not np.isnan(self.base_rates[self.index[currency_code]])
+
+    def rate(self, from_currency, to_currency):
+        """Units of ``to_currency`` per unit of ``from_currency``"""
+        return float(self.matrix[self.index[from_currency], self.index[to_currency]])
+
+    def convert(self, amount, from_currency, to_currency):
+        """Convert a single amount"""
+        return amount * self.rate(from_currency, to_currency)
+
+    def rates_for(self, base_currency, currencies=None):
+        """Rates from ``base_currency`` as a ``{code: rate}`` dict"""
+        row = self.matrix[self.index[base_currency]]
+        codes = self.codes if currencies is None else currencies
+        return {code: float(row[self.index[code]]) for code in codes
+                if code in self.index and not np.isnan(row[self.index[code]])}
+
+def build_rate_matrix(rates, codes, timestamp=None):
+    """Build a RateMatrix for ``codes`` from a ``{code: rate}`` snapshot"""
+    base_rates = [rates.get(code, np.nan) for code in codes]
+    return RateMatrix(codes, base_rates, timestamp)
+
+class FetchStats:
+    """Counters for upstream rate fetches; latencies also feed the ``stage`` timer"""
+
+    def __init__(self, stage="upstream_fetch"):
+        self.stage = stage
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self.bytes_transferred = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+
+    def record(self, latency, bytes_transferred=0, not_modified=False, error=False):
+        with self._lock:
+            self.requests += 1
+            self.not_modified += not_modified
+            self.errors += error
+            self.bytes_transferred += bytes_transferred
+            self.total_latency += latency
+            self.last_latency = latency
+        observe(self.stage, latency)
+
+    @property
+    def average_latency(self):
+        return self.total_latency / self.requests if self.requests else None
+
+class ConditionalCache:
+    """ETag / Last-Modified validators and the last payload per URL"""
+
+    def __init__(self):
+        self._entries = {}
+
+    def headers(self, url):
+        """Conditional request headers for ``url``"""
+        etag, last_modified, _ = self._entries.get(url, (None, None, None))
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def update(self, url, response_headers, rates):
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if etag or last_modified:
+            self._entries[url] = (etag, last_modified, rates)
+
+    def cached(self, url):
+        """Rates stored with the validators of ``url``"""
+        return dict(self._entries[url][2])
+
+class HttpRateClient:
+    """Rate fetcher on a pooled ``requests.Session`` with conditional GETs
+
+    Keep-alive connections are reused across refreshes, responses are
+    requested gzip-compressed, and an unchanged upstream answers 304 so a
+    steady-state refresh transfers no body.
+    """
+
+    def __init__(self, url=RATES_API_URL, timeout=10):
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self.validators = ConditionalCache()
+        self.stats = FetchStats()
+
+    def __call__(self, base_currency=SNAPSHOT_BASE):
+        url = self.url.format(base=base_currency)
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=self.validators.headers(url), timeout=self.timeout)
+            if response.status_code == 304:
+                rates = self.validators.cached(url)
+            else:
+                response.raise_for_status()
+                rates = response.json()["rates"]
+                self.validators.update(url, response.headers, rates)
+        except Exception:
+            self.stats.record(time.perf_counter() - started, error=True)
+            raise
+        # Bytes read off the wire, i.e. before gzip decoding
+        wire_bytes = response.raw.tell() if response.raw is not None else len(response.content)
+        self.stats.record(time.perf_counter() - started, wire_bytes, not_modified=response.status_code == 304)
+        return rates
+
+    def close(self):
+        self.session.close()
+
+_default_client = HttpRateClient()
+
+def fetch_base_rates(base_currency=SNAPSHOT_BASE):
+    """Fetch one snapshot of rates against ``base_currency``"""
+    return _default_client(base_currency)
+
+class RateStore:
+    """Process-wide rate snapshot shared by every session
+
+    Readers always get the current immutable ``RateMatrix`` without waiting on
+    the network once a first snapshot exists. Refreshes are single-flight:
+    concurrent callers coalesce onto one upstream fetch, and the new matrix is
+    swapped in with a single attribute assignment. A stale snapshot keeps being
+    served while a background refresh runs.
+    """
+
+    def __init__(self, codes, fetch_rates=fetch_base_rates, ttl=REFRESH_INTERVAL, snapshot_store=None):
+        self.codes = tuple(codes)
+        self.ttl = ttl
+        self._fetch_rates = fetch_rates
+        self._snapshot_store = snapshot_store
+        self._snapshot = None
+        self._fetched_at = float("-inf")
+        self._next_refresh = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+        self.last_error = None
+        if snapshot_store is not None:
+            self._warm_start()
+
+    def _warm_start(self):
+        """Serve the last persisted snapshot until the first refresh lands"""
+        persisted = self._snapshot_store.latest()
+        if persisted is None:
+            return
+        timestamp, base, rates = persisted
+        if base != SNAPSHOT_BASE:
+            return
+        self._snapshot = build_rate_matrix(rates, self.codes, timestamp)
+        age = (datetime.now() - timestamp).total_seconds()
+        self._next_refresh = time.monotonic() + max(self.ttl - age, 0.0)
+
+    def add_listener(self, callback):
+        """Call ``callback(rates, timestamp)`` after every successful refresh"""
+        self._listeners.append(callback)
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def is_stale(self):
+        return time.monotonic() >= self._next_refresh
+
+    def get(self):
+        """Return the current snapshot, fetching only if none exists yet"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self.refresh()
+        if self.is_stale():
+            self.refresh_async()
+        return snapshot
+
+    def refresh(self, force=False):
+        """Fetch a new snapshot, coalescing with any refresh already in flight
+
+        Forced refreshes are rate-limited to one per ``FORCED_REFRESH_INTERVAL``
+        so repeated clicks across sessions share a single upstream fetch.
+        """
+        started = time.monotonic()
+        with self._refresh_lock:
+            # Another caller refreshed while we waited for the lock
+            if self._snapshot is not None and self._fetched_at >= started:
+                return self._snapshot
+            if self._snapshot is not None and force and started - self._fetched_at < FORCED_REFRESH_INTERVAL:
+                return self._snapshot
+            if self._snapshot is not None and not force and not self.is_stale():
+                return self._snapshot
+            try:
+                rates = self._fetch_rates(SNAPSHOT_BASE)
+            except Exception as e:
+                self.last_error = e
+                # Back off instead of retrying on every read while upstream is down
+                self._next_refresh = time.monotonic() + min(self.ttl, RETRY_INTERVAL)
+                if self._snapshot is None:
+                    raise
+                return self._snapshot
+            snapshot = build_rate_matrix(rates, self.codes)
+            if self._snapshot_store is not None:
+                try:
+                    self._snapshot_store.append(rates, SNAPSHOT_BASE, snapshot.timestamp)
+                except Exception as e:
+                    self.last_error = e
+            self._snapshot = snapshot
+            self._fetched_at = time.monotonic()
+            self._next_refresh = self._fetched_at + self.ttl
+            self.last_error = None
+            for callback in self._listeners:
+                try:
+                    callback(rates, snapshot.timestamp)
+                except Exception as e:
+                    self.last_error = e
+            return self._snapshot
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running"""
+        if self._refresh_lock.locked():
+            return
+        threading.Thread(target=self._refresh_quietly, name="rate-refresh", daemon=True).start()
+
+    def start(self):
+        """Start the background refresher thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="rate-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        self._refresh_quietly()
+        while not self._stop.wait(max(self._next_refresh - time.monotonic(), 1.0)):
+            self._refresh_quietly()
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            self.last_error = e
+
+class RateFeed:
+    """Sequence-numbered stream of rate snapshots with per-currency change detection
+
+    Registered as a ``RateStore`` listener. Only snapshots that move at least
+    one rate bump ``sequence``, so open sessions polling the feed can tell
+    whether anything changed and which pairs moved.
+    """
+
+    def __init__(self, codes, rel_tol=1e-9):
+        self.codes = tuple(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.rel_tol = rel_tol
+        self.sequence = 0
+        self.timestamp = None
+        self._current = np.full(len(self.codes), np.nan)
+        self._previous = self._current
+        self.changed = np.zeros(len(self.codes), dtype=bool)
+        self._lock = threading.Lock()
+
+    def seed(self, rate_matrix):
+        """Start from an existing snapshot, e.g. a warm-started one"""
+        if rate_matrix is not None and self.sequence == 0:
+            self.on_snapshot(dict(zip(rate_matrix.codes, rate_matrix.base_rates.tolist())), rate_matrix.timestamp)
+
+    def on_snapshot(self, rates, timestamp):
+        current = np.array([rates.get(code, np.nan) for code in self.codes], dtype=np.float64)
+        with self._lock:
+            changed = ~np.isclose(current, self._current, rtol=self.rel_tol, atol=0.0, equal_nan=True)
+            self.timestamp = timestamp
+            if self.sequence and not changed.any():
+                return
+            self._previous, self._current, self.changed = self._current, current, changed
+            self.sequence += 1
+
+    def pair_change(self, from_currency, to_currency):
+        """Direction of the last move of the ``to``-per-``from`` rate: 1, -1 or 0"""
+        i, j = self.index.get(from_currency), self.index.get(to_currency)
+        if i is None or j is None:
+            return 0
+        with self._lock:
+            if not (self.changed[i] or self.changed[j]):
+                return 0
+            previous = self._previous[j] / self._previous[i]
+            current = self._current[j] / self._current[i]
+        if np.isnan(previous) or np.isnan(current):
+            return 0
+        return int(np.sign(current - previous))
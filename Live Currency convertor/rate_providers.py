@@ -0,0 +1,197 @@
+import asyncio
+import math
+import os
+import threading
+import time
+import numpy as np
+from rate_engine import ConditionalCache, FetchStats
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+PROVIDER_TIMEOUT = 5.0
+FAILURE_THRESHOLD = 3
+RESET_TIMEOUT = 60.0
+STRATEGIES = ("race", "median")
+
+class RateProvider:
+    """One upstream rate source: a URL template and a payload parser"""
+
+    def __init__(self, name, url, base_in_rates=True):
+        self.name = name
+        self.url = url
+        self.base_in_rates = base_in_rates
+
+    def parse(self, payload, base_currency):
+        """Validated ``{code: rate}`` from a JSON payload with a ``rates`` field"""
+        rates = dict(payload["rates"])
+        if not self.base_in_rates:
+            rates[base_currency] = 1.0
+        rates = {code: float(rate) for code, rate in rates.items()}
+        if rates.get(base_currency) != 1.0:
+            raise ValueError(f"{self.name}: snapshot is not based on {base_currency}")
+        if not all(math.isfinite(rate) and rate > 0 for rate in rates.values()):
+            raise ValueError(f"{self.name}: invalid rate values")
+        return rates
+
+DEFAULT_PROVIDERS = [
+    RateProvider("exchangerate-api", "https://api.exchangerate-api.com/v4/latest/{base}"),
+    RateProvider("open-er-api", "https://open.er-api.com/v6/latest/{base}"),
+    RateProvider("frankfurter", "https://api.frankfurter.app/latest?from={base}", base_in_rates=False),
+]
+
+class CircuitBreaker:
+    """Skip a provider after repeated failures, probing again after a cool-down"""
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.state == "half-open":
+            self.opened_at = time.monotonic()
+
+class ProviderError(Exception):
+    """Raised when no provider returned a valid snapshot"""
+
+class MultiProviderFetcher:
+    """Query several rate providers concurrently over pooled connections
+
+    ``race`` returns the first valid snapshot and cancels the rest; ``median``
+    waits for every provider and takes the per-currency median. Providers
+    whose circuit breaker is open are skipped. The fetcher owns a private
+    event loop thread so one ``httpx.AsyncClient`` and its keep-alive pool
+    are reused across synchronous calls.
+    """
+
+    def __init__(self, providers=None, strategy="race", timeout=PROVIDER_TIMEOUT):
+        if httpx is None:
+            raise ImportError("MultiProviderFetcher requires httpx (pip install httpx)")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        self.providers = list(providers or DEFAULT_PROVIDERS)
+        self.strategy = strategy
+        self.timeout = timeout
+        self.breakers = {provider.name: CircuitBreaker() for provider in self.providers}
+        self.validators = ConditionalCache()
+        self.stats = FetchStats()
+        self.provider_stats = {provider.name: FetchStats(f"upstream_fetch {provider.name}") for provider in self.providers}
+        self.last_results = {}
+        self._client = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="rate-providers", daemon=True)
+        self._thread.start()
+
+    def __call__(self, base_currency):
+        """Synchronous fetch, usable as a ``RateStore`` fetch function"""
+        future = asyncio.run_coroutine_threadsafe(self.fetch(base_currency), self._loop)
+        return future.result(self.timeout * 2)
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=len(self.providers), keepalive_expiry=300),
+                headers={"Accept-Encoding": "gzip, deflate"}
+            )
+        return self._client
+
+    async def _fetch_one(self, provider, base_currency):
+        breaker = self.breakers[provider.name]
+        url = provider.url.format(base=base_currency)
+        started = time.perf_counter()
+        try:
+            response = await self._get_client().get(url, headers=self.validators.headers(url))
+            if response.status_code == 304:
+                rates = self.validators.cached(url)
+            else:
+                response.raise_for_status()
+                rates = provider.parse(response.json(), base_currency)
+                self.validators.update(url, response.headers, rates)
+        except Exception:
+            breaker.record_failure()
+            self._record(provider, time.perf_counter() - started, error=True)
+            raise
+        breaker.record_success()
+        self._record(provider, time.perf_counter() - started, response.num_bytes_downloaded,
+                     not_modified=response.status_code == 304)
+        self.last_results[provider.name] = rates
+        return provider.name, rates
+
+    def _record(self, provider, latency, bytes_transferred=0, not_modified=False, error=False):
+        for stats in (self.stats, self.provider_stats[provider.name]):
+            stats.record(latency, bytes_transferred, not_modified, error)
+
+    async def fetch(self, base_currency):
+        """Fetch a ``{code: rate}`` snapshot according to the strategy"""
+        providers = [provider for provider in self.providers if self.breakers[provider.name].allow()]
+        if not providers:
+            raise ProviderError("All rate providers are unavailable")
+        tasks = [asyncio.ensure_future(self._fetch_one(provider, base_currency)) for provider in providers]
+        try:
+            if self.strategy == "race":
+                return await self._race(tasks)
+            return await self._median(tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _race(self, tasks):
+        errors = []
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                _, rates = await next_done
+                return rates
+            except Exception as e:
+                errors.append(e)
+        raise ProviderError(f"No provider returned valid rates: {errors}")
+
+    async def _median(self, tasks):
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        snapshots = [result[1] for result in results if not isinstance(result, BaseException)]
+        if not snapshots:
+            raise ProviderError(f"No provider returned valid rates: {results}")
+        return median_consensus(snapshots)
+
+    def close(self):
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result(self.timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+def median_consensus(snapshots):
+    """Per-currency median across snapshots, ignoring currencies a source lacks"""
+    codes = sorted(set().union(*snapshots))
+    values = np.array([[rates.get(code, np.nan) for code in codes] for rates in snapshots])
+    medians = np.nanmedian(values, axis=0)
+    return dict(zip(codes, medians.tolist()))
+
+def configured_fetcher():
+    """Fetcher selected by ``RATE_PROVIDERS`` / ``RATE_STRATEGY``, or None without httpx"""
+    if httpx is None:
+        return None
+    names = os.environ.get("RATE_PROVIDERS")
+    providers = DEFAULT_PROVIDERS
+    if names:
+        wanted = [name.strip() for name in names.split(",")]
+        providers = [provider for provider in DEFAULT_PROVIDERS if provider.name in wanted]
+    return MultiProviderFetcher(providers, strategy=os.environ.get("RATE_STRATEGY", "race"))
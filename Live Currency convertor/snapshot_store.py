@@ -0,0 +1,141 @@
+import os
+import sqlite3
+import threading
+import time
+import numpy as np
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+DEFAULT_DB_PATH = os.environ.get(
+    "RATES_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "rate_snapshots.db")
+)
+# Covers the longest chart period; the history store keeps the daily closes beyond it
+RETENTION_DAYS = float(os.environ.get("RATES_RETENTION_DAYS", "180"))
+PRUNE_INTERVAL = 3600
+
+class SnapshotStore:
+    """Append-only SQLite store of upstream rate snapshots
+
+    Each row holds one snapshot keyed by its fetch timestamp: the base
+    currency, a reference to its comma-separated code list (stored once in
+    ``code_lists``) and the rates as a packed float64 blob in that order.
+    Snapshots identical to the previous one are not written, and rows older
+    than ``retention_days`` are pruned as new ones arrive.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS code_lists (id INTEGER PRIMARY KEY, codes TEXT NOT NULL UNIQUE)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "fetched_at REAL PRIMARY KEY, base TEXT NOT NULL, "
+                "code_list INTEGER NOT NULL REFERENCES code_lists (id), rates BLOB NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        """Connection that commits on success and is always closed"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def append(self, rates, base, timestamp=None):
+        """Persist one ``{code: rate}`` snapshot unless it repeats the latest one
+
+        Returns whether a row was written. A refresh answered from the
+        provider's cache carries the same rates, so it adds nothing.
+        """
+        timestamp = timestamp or datetime.now()
+        codes = sorted(rates)
+        blob = np.array([rates[code] for code in codes], dtype=np.float64).tobytes()
+        with self._lock, self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO code_lists (codes) VALUES (?)", (",".join(codes),))
+            code_list, = conn.execute("SELECT id FROM code_lists WHERE codes = ?", (",".join(codes),)).fetchone()
+            latest = conn.execute(
+                "SELECT base, code_list, rates FROM snapshots ORDER BY fetched_at DESC LIMIT 1"
+            ).fetchone()
+            if latest == (base, code_list, blob):
+                return False
+            conn.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?)",
+                (timestamp.timestamp(), base, code_list, blob)
+            )
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + PRUNE_INTERVAL
+                self._prune(conn)
+        return True
+
+    def prune(self):
+        """Delete snapshots older than ``retention_days``; returns how many went"""
+        with self._lock, self._connect() as conn:
+            return self._prune(conn)
+
+    def _prune(self, conn):
+        cutoff = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
+        deleted = conn.execute("DELETE FROM snapshots WHERE fetched_at < ?", (cutoff,)).rowcount
+        if deleted:
+            conn.execute("DELETE FROM code_lists WHERE id NOT IN (SELECT DISTINCT code_list FROM snapshots)")
+        return deleted
+
+    def latest(self):
+        """Most recent snapshot as ``(timestamp, base, rates)`` or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at, base, codes, rates FROM snapshots "
+                "JOIN code_lists ON code_lists.id = snapshots.code_list "
+                "ORDER BY fetched_at DESC LIMIT 1"
+            ).fetchone()
+        return _decode_row(row) if row else None
+
+    def between(self, start=None, end=None):
+        """Yield snapshots in time order as ``(timestamp, base, rates)``"""
+        start = start.timestamp() if start else 0.0
+        end = end.timestamp() if end else float("inf")
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT fetched_at, base, codes, rates FROM snapshots "
+                "JOIN code_lists ON code_lists.id = snapshots.code_list "
+                "WHERE fetched_at >= ? AND fetched_at <= ? ORDER BY fetched_at",
+                (start, end)
+            )
+            for row in rows:
+                yield _decode_row(row)
+
+    def pair_series(self, from_currency, to_currency, start=None):
+        """Timestamps (epoch seconds) and ``to``-per-``from`` rates of every snapshot
+
+        Snapshots missing either currency are skipped.
+        """
+        start = start.timestamp() if start else 0.0
+        timestamps, values = [], []
+        with self._connect() as conn:
+            positions = {}
+            for code_list, codes in conn.execute("SELECT id, codes FROM code_lists"):
+                codes = codes.split(",")
+                if from_currency in codes and to_currency in codes:
+                    positions[code_list] = (codes.index(from_currency), codes.index(to_currency))
+            rows = conn.execute(
+                "SELECT fetched_at, code_list, rates FROM snapshots WHERE fetched_at >= ? ORDER BY fetched_at",
+                (start,)
+            )
+            for fetched_at, code_list, blob in rows:
+                if code_list not in positions:
+                    continue
+                from_pos, to_pos = positions[code_list]
+                rates = np.frombuffer(blob, dtype=np.float64)
+                timestamps.append(fetched_at)
+                values.append(rates[to_pos] / rates[from_pos])
+        return np.array(timestamps, dtype=np.float64), np.array(values, dtype=np.float64)
+
+def _decode_row(row):
+    fetched_at, base, codes, blob = row
+    values = np.frombuffer(blob, dtype=np.float64)
+    return datetime.fromtimestamp(fetched_at), base, dict(zip(codes.split(","), values.tolist()))
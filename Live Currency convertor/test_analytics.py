@@ -0,0 +1,73 @@
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytest
+from analytics import EMA_SPAN, TRADING_DAYS, AnalyticsBook, RollingPairStats
+
+def reference_summary(days, values, window):
+    """The statistics of ``RollingPairStats`` recomputed with pandas from the full series"""
+    series = pd.Series(values, index=days).groupby(level=0).last()
+    in_window = series[series.index >= series.index[-1] - window]
+    log_returns = np.log(in_window).diff().dropna()
+    t = (in_window.index - series.index[0]).to_numpy(dtype=np.float64)
+    slope, intercept = np.polyfit(t, in_window.to_numpy(), 1) if len(in_window) > 1 else (0.0, in_window.iloc[0])
+    return {
+        "current": series.iloc[-1],
+        "count": len(in_window),
+        "mean": in_window.mean(),
+        "std": in_window.std() if len(in_window) > 1 else 0.0,
+        "min": in_window.min(),
+        "max": in_window.max(),
+        "trend_slope": slope,
+        "trend_intercept": intercept,
+        "log_return_mean": log_returns.mean() if len(log_returns) else 0.0,
+        "log_return_std": log_returns.std() if len(log_returns) > 1 else 0.0,
+        "annualized_volatility": (log_returns.std() if len(log_returns) > 1 else 0.0) * np.sqrt(TRADING_DAYS),
+        "ema": series.ewm(span=EMA_SPAN, adjust=False).mean().iloc[-1],
+    }
+
+@pytest.mark.parametrize("window", [1, 7, 30, 90])
+def test_rolling_stats_match_pandas(window):
+    rng = np.random.default_rng(window)
+    # Gaps of up to three days and repeated snapshots of the same day
+    days = np.cumsum(rng.choice([0, 0, 1, 1, 1, 2, 3], 400)) + 738000
+    values = 1.1 * np.exp(np.cumsum(rng.normal(0, 0.01, len(days))))
+    stats = RollingPairStats(window)
+    for i, (day, value) in enumerate(zip(days.tolist(), values.tolist())):
+        stats.add(day, value)
+        if i % 37 == 0 or i == len(days) - 1:
+            summary = stats.summary()
+            expected = reference_summary(days[:i + 1], values[:i + 1], window)
+            assert {key: summary[key] for key in expected} == pytest.approx(expected, rel=1e-7, abs=1e-9)
+
+def test_stale_days_are_ignored():
+    stats = RollingPairStats(30)
+    stats.add(10, 1.0)
+    stats.add(12, 2.0)
+    stats.add(11, 5.0)
+    assert (stats.summary()["count"], stats.summary()["max"]) == (2, 2.0)
+
+def test_book_tracks_snapshots_and_reseeds_after_a_merge():
+    history = {"days": [738000, 738001], "rates": [1.0, 1.1]}
+    generation = [0]
+    book = AnalyticsBook(lambda f, t, days: (history["days"], history["rates"]), lambda: generation[0], maxsize=2)
+    assert book.stats("USD", "EUR", 30)["count"] == 2
+    book.on_snapshot({"USD": 1.0, "EUR": 1.2}, datetime.fromordinal(738002))
+    assert book.stats("USD", "EUR", 30)["current"] == 1.2
+    history["days"], history["rates"] = [737990, 738000, 738001], [0.9, 1.0, 1.1]
+    generation[0] += 1
+    assert book.stats("USD", "EUR", 30)["count"] == 3
+
+def test_book_evicts_the_least_recently_viewed():
+    loads = []
+
+    def load(from_currency, to_currency, days):
+        loads.append((from_currency, to_currency, days))
+        return [738000], [1.0]
+
+    book = AnalyticsBook(load, maxsize=2)
+    for key in [("USD", "EUR", 7), ("USD", "GBP", 7), ("USD", "EUR", 7), ("USD", "JPY", 7), ("USD", "EUR", 7)]:
+        book.stats(*key)
+    assert loads == [("USD", "EUR", 7), ("USD", "GBP", 7), ("USD", "JPY", 7)]
+    book.stats("USD", "GBP", 7)
+    assert loads[-1] == ("USD", "GBP", 7)
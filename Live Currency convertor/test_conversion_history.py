@@ -0,0 +1,76 @@
+import sqlite3
+import time
+import pytest
+import conversion_history
+from conversion_history import ConversionHistory, ConversionLog
+
+CODES = ["USD", "EUR", "GBP", "JPY"]
+
+def fill(history, count):
+    """Append ``count`` conversions and return them as the dicts ``page`` yields, oldest first"""
+    entries = []
+    for i in range(count):
+        from_currency, to_currency = CODES[i % 4], CODES[(i // 4) % 4]
+        entry = {"timestamp": float(i), "from_currency": from_currency, "to_currency": to_currency,
+                 "amount": float(i), "converted_amount": i * 0.5, "rate": 0.5}
+        history.append(from_currency, to_currency, entry["amount"], entry["converted_amount"], entry["rate"], entry["timestamp"])
+        entries.append(entry)
+    return entries
+
+@pytest.mark.parametrize("count", [0, 1, 63, 64, 65, 100, 101, 250])
+def test_ring_buffer_keeps_the_newest_entries(count):
+    history = ConversionHistory(CODES, capacity=100)
+    expected = fill(history, count)[::-1][:100]
+    assert len(history) == len(expected)
+    assert history.page(page_size=1000) == (expected, len(expected))
+    assert history.nbytes <= 100 * conversion_history.ENTRY_DTYPE.itemsize
+
+def test_pages_and_filters_match_a_list_model():
+    history = ConversionHistory(CODES, capacity=50)
+    newest_first = fill(history, 130)[::-1][:50]
+    for from_currency, to_currency in [(None, None), ("EUR", None), (None, "JPY"), ("GBP", "USD"), ("XYZ", None)]:
+        matching = [entry for entry in newest_first
+                    if from_currency in (None, entry["from_currency"]) and to_currency in (None, entry["to_currency"])]
+        assert history.count(from_currency, to_currency) == len(matching)
+        for page in range(3):
+            assert history.page(page, 7, from_currency, to_currency) == (matching[page * 7:(page + 1) * 7], len(matching))
+    assert history.pairs() == sorted({(entry["from_currency"], entry["to_currency"]) for entry in newest_first})
+
+def test_clear_releases_the_grown_buffer():
+    history = ConversionHistory(CODES, capacity=1000)
+    fill(history, 500)
+    history.clear()
+    assert len(history) == 0 and history.nbytes == 64 * conversion_history.ENTRY_DTYPE.itemsize
+    assert history.page() == ([], 0)
+
+@pytest.fixture
+def log(tmp_path):
+    log = ConversionLog(str(tmp_path / "conversions.db"))
+    yield log
+    log.flush()
+
+def stored_rows(log):
+    with sqlite3.connect(log.path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM conversions").fetchone()[0]
+
+def test_log_batches_writes_and_loads_per_user(log):
+    for i in range(conversion_history.FLUSH_BATCH - 1):
+        log.record("u1", "USD", "EUR", i, i * 0.9, 0.9, float(i))
+    log.record("u2", "EUR", "XYZ", 1, 1, 1, 0.0)
+    assert stored_rows(log) == conversion_history.FLUSH_BATCH
+    log.record("u1", "GBP", "JPY", 2, 380, 190, 100.0)
+    history = log.load("u1", ConversionHistory(CODES, capacity=10))
+    entries, total = history.page(page_size=10)
+    assert total == 10
+    assert entries[0]["from_currency"] == "GBP" and entries[-1]["timestamp"] == 22.0
+    assert len(log.load("u2", ConversionHistory(CODES))) == 0
+    log.clear("u1")
+    assert len(log.load("u1", ConversionHistory(CODES))) == 0
+
+def test_timer_flushes_the_tail_of_a_burst(log, monkeypatch):
+    monkeypatch.setattr(conversion_history, "FLUSH_INTERVAL", 0.05)
+    log.flush()
+    log.record("u1", "USD", "EUR", 1, 0.9, 0.9, 0.0)
+    assert stored_rows(log) == 0
+    time.sleep(0.2)
+    assert stored_rows(log) == 1
@@ -0,0 +1,29 @@
+import pytest
+from batch_convert import convert_batch_exact
+from exact_conversion import ROUNDING_MODES, convert_exact
+
+# Half-way amounts in two- and zero-decimal currencies, including ones whose binary value sits just below the half
+HALF_WAY_AMOUNTS = [0.005, 0.015, 0.025, 0.125, 0.285, 1.005, 2.675, 1234.565, 0.5, 1.5, 2.5, -0.005, -2.675]
+
+@pytest.mark.parametrize("rounding", ROUNDING_MODES)
+@pytest.mark.parametrize("from_currency,to_currency", [("USD", "EUR"), ("USD", "JPY"), ("JPY", "USD"), ("EUR", "KRW")])
+def test_batch_matches_convert_exact_on_half_way_amounts(rate_matrix, rounding, from_currency, to_currency):
+    rows = len(HALF_WAY_AMOUNTS)
+    _, converted = convert_batch_exact(rate_matrix, HALF_WAY_AMOUNTS, [from_currency] * rows, [to_currency] * rows, rounding)
+    expected = [str(convert_exact(rate_matrix, amount, from_currency, to_currency, rounding)) for amount in HALF_WAY_AMOUNTS]
+    assert list(converted) == expected
+
+def test_batch_leaves_missing_amounts_blank(rate_matrix):
+    amounts = [1.0, float("nan"), None, float("inf"), 1e20]
+    rates, converted = convert_batch_exact(rate_matrix, amounts, ["USD"] * 5, ["EUR"] * 5, ROUNDING_MODES[0])
+    assert list(converted) == ["0.92", "", "", "", ""]
+    assert rates.tolist() == [rate_matrix.rate("USD", "EUR")] * 5
+
+@pytest.mark.parametrize("amount", [6.0e16, 6.1e16, 1e20, 1e26, 1e30, float("inf")])
+def test_paths_agree_past_int64(rate_matrix, amount):
+    _, converted = convert_batch_exact(rate_matrix, [amount], ["USD"], ["JPY"], ROUNDING_MODES[0])
+    try:
+        expected = str(convert_exact(rate_matrix, amount, "USD", "JPY", ROUNDING_MODES[0]))
+    except ValueError:
+        expected = ""
+    assert list(converted) == [expected]
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+import numpy as np
+import pytest
+from history_store import COLUMN_SUFFIX, HistoryStore
+
+def day(text):
+    return date.fromisoformat(text).toordinal()
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history"))
+
+def test_record_keeps_one_closing_row_per_day(store):
+    store.record({"USD": 1.0, "EUR": 0.90}, datetime(2024, 1, 1, 9))
+    store.record({"USD": 1.0, "EUR": 0.91}, datetime(2024, 1, 1, 17))
+    store.record({"USD": 1.0, "EUR": 0.92, "GBP": 0.8}, datetime(2024, 1, 2))
+    store.record({"USD": 1.0, "EUR": 0.5}, datetime(2023, 12, 31))
+    assert store.dates().tolist() == [day("2024-01-01"), day("2024-01-02")]
+    assert store.column("EUR").tolist() == [0.91, 0.92]
+    np.testing.assert_array_equal(store.column("GBP"), [np.nan, 0.8])
+    assert store.version == 3 and store.generation == 0
+
+def test_merge_appends_inserts_and_overwrites(store):
+    store.record({"USD": 1.0, "EUR": 0.90}, datetime(2024, 1, 3))
+    written = store.merge([day("2024-01-05"), day("2024-01-04")], ["EUR"], [[0.95], [0.94]])
+    assert written == 2
+    written = store.merge([day("2024-01-01"), day("2024-01-03")], ["EUR", "JPY"], [[0.88, 140.0], [np.nan, 141.0]])
+    assert written == 3
+    assert store.dates().tolist() == [day(f"2024-01-0{d}") for d in (1, 3, 4, 5)]
+    assert store.column("EUR").tolist() == [0.88, 0.90, 0.94, 0.95]
+    np.testing.assert_array_equal(store.column("JPY"), [140.0, 141.0, np.nan, np.nan])
+    np.testing.assert_array_equal(store.column("USD"), [np.nan, 1.0, np.nan, np.nan])
+    assert store.generation == 2
+
+def test_merge_matches_records_in_order(tmp_path):
+    rng = np.random.default_rng(0)
+    days = np.arange(day("2024-01-01"), day("2024-03-01"))
+    rates = rng.uniform(0.5, 1.5, (len(days), 2))
+    recorded, merged = HistoryStore(str(tmp_path / "recorded")), HistoryStore(str(tmp_path / "merged"))
+    for ordinal, (eur, gbp) in zip(days, rates):
+        recorded.record({"EUR": eur, "GBP": gbp}, datetime.fromordinal(int(ordinal)))
+    order = rng.permutation(len(days))
+    for part in np.array_split(order, 5):
+        merged.merge(days[part], ["EUR", "GBP"], rates[part])
+    for got, expected in zip(merged.block(["EUR", "GBP"], 30), recorded.block(["EUR", "GBP"], 30)):
+        np.testing.assert_array_equal(got, expected)
+
+def test_stamp_is_shared_between_instances(store):
+    other = HistoryStore(store.directory)
+    store.record({"EUR": 0.9}, datetime(2024, 1, 1))
+    assert other.version == 1
+    other.merge([day("2024-01-01")], ["EUR"], [[0.91]])
+    assert (store.version, store.generation) == (2, 1)
+    assert store.column("EUR").tolist() == [0.91]
+
+def test_torn_append_is_never_read_and_cut_by_the_next_writer(store):
+    store.record({"USD": 1.0, "EUR": 0.9}, datetime(2024, 1, 1))
+    # A writer that died after extending a column but before committing its date
+    with open(f"{store.directory}/EUR{COLUMN_SUFFIX}", "ab") as f:
+        np.float64(0.5).tofile(f)
+    dates, rates = store.pair_window("USD", "EUR", 30)
+    assert len(dates) == len(rates) == 1
+    store.record({"USD": 1.0, "EUR": 0.92}, datetime(2024, 1, 2))
+    assert store.column("EUR").tolist() == [0.9, 0.92]
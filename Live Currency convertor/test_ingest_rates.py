@@ -0,0 +1,77 @@
+import io
+import json
+from datetime import date
+import numpy as np
+import pytest
+from history_store import HistoryStore
+from ingest_rates import ingest
+
+CODES = ["USD", "EUR", "GBP", "JPY"]
+
+def day(text):
+    return date.fromisoformat(text).toordinal()
+
+@pytest.fixture
+def store(tmp_path):
+    return HistoryStore(str(tmp_path / "history"))
+
+def test_long_csv_is_rebased_deduplicated_and_validated(store):
+    source = io.StringIO(
+        "date,currency,rate,base\n"
+        "2024-01-01,EUR,0.90,USD\n"
+        "2024-01-01,EUR,0.91,USD\n"
+        "2024-01-01,GBP,0.80,usd\n"
+        "2024-01-01,XYZ,1.00,USD\n"
+        "2024-01-02,USD,1.25,GBP\n"
+        "2024-01-02,JPY,180.0,GBP\n"
+        "2024-01-02,EUR,-1,USD\n"
+        "not a date,EUR,0.90,USD\n"
+        "2024-01-03,EUR,0.95,JPY\n"
+    )
+    report = ingest(source, store, CODES, fmt="csv")
+    assert {key: report[key] for key in ("rows", "quotes", "skipped", "rejected", "duplicates")} == \
+        {"rows": 9, "quotes": 9, "skipped": 0, "rejected": 4, "duplicates": 1}
+    assert store.dates().tolist() == [day("2024-01-01"), day("2024-01-02")]
+    np.testing.assert_allclose(store.column("EUR"), [0.91, np.nan])
+    np.testing.assert_allclose(store.column("GBP"), [0.80, 0.8])
+    np.testing.assert_allclose(store.column("JPY"), [np.nan, 144.0])
+    np.testing.assert_allclose(store.column("USD"), [1.0, 1.0])
+    assert report["written"] == 6
+
+def test_wide_csv_counts_empty_cells_as_skipped(store):
+    source = io.StringIO("Date,EUR,GBP\n2024-01-01,0.9,\n2024-01-02,0.91,0.79\n")
+    report = ingest(source, store, CODES, fmt="csv")
+    assert (report["rows"], report["quotes"], report["skipped"], report["rejected"]) == (2, 3, 1, 0)
+    np.testing.assert_allclose(store.column("GBP"), [np.nan, 0.79])
+
+def test_json_records_and_json_lines_give_the_same_history(tmp_path):
+    series = {"base": "USD", "rates": {"2024-01-01": {"EUR": 0.9}, "2024-01-02": {"EUR": 0.91, "GBP": 0.8}}}
+    days = [{"date": "2024-01-01", "rates": {"EUR": 0.9}},
+            {"date": "2024-01-02", "currency": "EUR", "rate": 0.91},
+            {"date": "2024-01-02", "base": "GBP", "rates": {"USD": 1.25}}]
+    stores = []
+    for name, text in [("series", json.dumps(series)), ("array", json.dumps(days)),
+                       ("lines", "\n".join(map(json.dumps, days)))]:
+        store = HistoryStore(str(tmp_path / name))
+        ingest(io.StringIO(text), store, CODES, fmt="json", chunksize=1)
+        stores.append(store.block(["EUR", "GBP"], 10))
+    for dates, block in stores[1:]:
+        np.testing.assert_array_equal(dates, stores[0][0])
+        np.testing.assert_allclose(block, stores[0][1])
+
+@pytest.mark.parametrize("chunksize", [1, 2, 3, 7])
+def test_chunking_does_not_change_the_result(tmp_path, chunksize):
+    rng = np.random.default_rng(chunksize)
+    lines = ["date,currency,rate,base"]
+    for d in range(1, 6):
+        for code in rng.permutation(["USD", "EUR", "GBP", "EUR", "JPY"]):
+            base = "GBP" if d == 3 else "USD"
+            rate = 1.0 if code == base else rng.uniform(0.5, 2.0)
+            lines.append(f"2024-01-0{d},{code},{rate},{base}")
+    text = "\n".join(lines)
+    whole, chunked = HistoryStore(str(tmp_path / "whole")), HistoryStore(str(tmp_path / "chunked"))
+    expected = ingest(io.StringIO(text), whole, CODES, fmt="csv")
+    report = ingest(io.StringIO(text), chunked, CODES, fmt="csv", chunksize=chunksize)
+    assert report["written"] == expected["written"]
+    for code in CODES:
+        np.testing.assert_allclose(chunked.column(code), whole.column(code))
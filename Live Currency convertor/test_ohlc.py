@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+from ohlc import FIELDS, INTERVALS, OHLCBook, OHLCSeries, bucket_starts, resample_ohlc
+
+def samples(count, seed=0):
+    rng = np.random.default_rng(seed)
+    timestamps = 1_700_000_000 + np.cumsum(rng.integers(1, 4 * 3600, count)).astype(np.float64)
+    values = 1.1 + np.cumsum(rng.normal(0, 0.001, count))
+    values[rng.random(count) < 0.02] = np.nan
+    return timestamps, values
+
+@pytest.mark.parametrize("interval", list(INTERVALS))
+@pytest.mark.parametrize("batch", [1, 5, 64])
+def test_incremental_bars_match_batch_resampling(interval, batch):
+    timestamps, values = samples(500)
+    series = OHLCSeries(interval, capacity=4)
+    for start in range(0, len(timestamps), batch):
+        series.extend(timestamps[start:start + batch], values[start:start + batch])
+    expected = resample_ohlc(timestamps, values, interval)
+    got = series.since(timestamps[0])
+    for field, column in zip(FIELDS, expected):
+        np.testing.assert_array_equal(got[field], column)
+
+def test_repeated_samples_count_once():
+    timestamps, values = samples(100)
+    series = OHLCSeries("1d")
+    series.extend(timestamps[:60], values[:60])
+    # The loaded history and the listener overlap on the same snapshots
+    series.extend(timestamps[40:], values[40:])
+    series.update(timestamps[-1], 99.0)
+    expected = resample_ohlc(timestamps, values, "1d")
+    np.testing.assert_array_equal(series.since(timestamps[0])["count"], expected[5])
+    np.testing.assert_array_equal(series.since(timestamps[0])["high"], expected[2])
+
+def test_weekly_bars_start_on_monday():
+    monday = datetime(2024, 1, 8, tzinfo=timezone.utc).timestamp()
+    starts = bucket_starts([monday - 1, monday, monday + 6 * 86400], "1w")
+    assert starts.tolist() == [monday - 7 * 86400, monday, monday]
+
+def test_book_updates_built_series_and_evicts_the_least_recently_viewed():
+    loads = []
+    timestamps, values = samples(50)
+
+    def load(from_currency, to_currency):
+        loads.append((from_currency, to_currency))
+        return timestamps, values
+
+    book = OHLCBook(load, maxsize=2)
+    before = book.bars("USD", "EUR", "1d", 0)
+    book.on_snapshot({"USD": 1.0, "EUR": 2.0}, datetime.fromtimestamp(timestamps[-1] + 86400))
+    after = book.bars("USD", "EUR", "1d", 0)
+    assert len(after["close"]) == len(before["close"]) + 1 and after["close"][-1] == 2.0
+    book.bars("USD", "GBP", "1d", 0)
+    book.bars("USD", "EUR", "1d", 0)
+    book.bars("USD", "JPY", "1d", 0)
+    book.bars("USD", "GBP", "1d", 0)
+    assert loads == [("USD", "EUR"), ("USD", "GBP"), ("USD", "JPY"), ("USD", "GBP")]
@@ -0,0 +1,72 @@
+import pytest
+from rate_alerts import AlertEngine, PairIndex
+
+RATES = {"USD": 1.0, "EUR": 0.9, "GBP": 0.8}
+
+@pytest.fixture
+def engine(tmp_path):
+    return AlertEngine(str(tmp_path / "alerts.db"))
+
+def test_pair_index_pops_crossed_thresholds_only():
+    index = PairIndex()
+    for alert_id, (side, threshold) in enumerate([("above", 1.1), ("above", 1.2), ("above", 1.1),
+                                                  ("below", 0.9), ("below", 0.8)]):
+        index.add(side, threshold, alert_id)
+    assert index.pop_triggered(1.0) == []
+    assert sorted(index.pop_triggered(1.1)) == [0, 2]
+    assert index.pop_triggered(0.85) == [3]
+    index.remove("above", 1.2, 1)
+    assert len(index) == 1
+    assert index.pop_triggered(0.1) == [4]
+    assert len(index) == 0
+
+def test_pair_index_remove_keeps_equal_thresholds_of_other_alerts():
+    index = PairIndex()
+    for alert_id in range(3):
+        index.add("above", 1.5, alert_id)
+    index.remove("above", 1.5, 1)
+    assert index.pop_triggered(2.0) == [0, 2]
+
+def test_alerts_fire_once_on_crossing(engine):
+    above = engine.add("u1", "USD", "EUR", "above", 0.95)
+    below = engine.add("u1", "USD", "EUR", "below", 0.85)
+    assert engine.check(RATES) == []
+    assert engine.check({**RATES, "EUR": 0.96}, timestamp=10.0) == [above]
+    assert engine.check({**RATES, "EUR": 0.97}) == []
+    assert engine.check({**RATES, "EUR": 0.80}) == [below]
+    fired = {alert["id"]: alert for alert in engine.alerts_for("u1")}
+    assert fired[above]["triggered_at"] == 10.0
+    assert fired[above]["triggered_rate"] == pytest.approx(0.96)
+    assert len(engine) == 0
+
+def test_move_alert_fires_on_either_side_once(engine):
+    up = engine.add("u1", "USD", "EUR", "move", 5, reference=0.85)
+    down = engine.add("u1", "USD", "GBP", "move", 5, reference=0.85)
+    assert engine.check(RATES) == [up, down]
+    assert engine.check({**RATES, "EUR": 0.5, "GBP": 0.5}) == []
+    assert len(engine) == 0
+
+def test_alerts_are_scoped_per_user_and_survive_a_restart(engine, tmp_path):
+    kept = engine.add("u1", "USD", "EUR", "above", 1.0)
+    removed = engine.add("u1", "USD", "GBP", "below", 0.5)
+    engine.remove("u2", kept)
+    engine.remove("u1", removed)
+    assert [alert["id"] for alert in engine.alerts_for("u1")] == [kept]
+    assert engine.alerts_for("u2") == []
+    restarted = AlertEngine(engine.path)
+    assert len(restarted) == 1
+    assert restarted.check({**RATES, "EUR": 1.0}) == [kept]
+
+def test_missing_currencies_are_skipped(engine):
+    engine.add("u1", "USD", "XYZ", "above", 1.0)
+    assert engine.check(RATES) == []
+    assert len(engine) == 1
+
+@pytest.mark.parametrize("kind,value,reference", [
+    ("sideways", 1.0, None), ("above", float("nan"), None), ("below", -1.0, None),
+    ("above", "1", None), ("move", 5, None), ("move", 5, float("inf")),
+])
+def test_invalid_alerts_are_rejected(engine, kind, value, reference):
+    with pytest.raises(ValueError):
+        engine.add("u1", "USD", "EUR", kind, value, reference)
+    assert len(engine) == 0
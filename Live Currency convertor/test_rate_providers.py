@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+import pytest
+import rate_providers
+from rate_engine import HttpRateClient
+from rate_providers import CircuitBreaker, MultiProviderFetcher, ProviderError, RateProvider
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves ``server.routes[path]``: a payload, status, delay and optional ETag"""
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        route = self.server.routes[path]
+        self.server.hits[path] += 1
+        self.server.request_headers[path] = dict(self.headers)
+        time.sleep(route.get("delay", 0))
+        etag = route.get("etag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(route.get("payload", {})).encode()
+        self.send_response(route.get("status", 200))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.routes, server.hits, server.request_headers = {}, Counter(), {}
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def make_fetcher():
+    fetchers = []
+
+    def make(providers, strategy="race"):
+        fetcher = MultiProviderFetcher(providers, strategy=strategy, timeout=2.0)
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+def route(stub, name, rates=None, **options):
+    """Register ``/name`` on the stub and return a provider pointing at it"""
+    base_in_rates = options.pop("base_in_rates", True)
+    stub.routes[f"/{name}"] = {"payload": {"rates": rates or {}}, **options}
+    return RateProvider(name, f"{stub.url}/{name}?base={{base}}", base_in_rates=base_in_rates)
+
+def test_race_returns_the_first_valid_snapshot(stub, make_fetcher):
+    providers = [
+        route(stub, "slow", {"USD": 1.0, "EUR": 0.95}, delay=0.5),
+        route(stub, "broken", status=500),
+        route(stub, "fast", {"USD": 1.0, "EUR": 0.9}, delay=0.05),
+    ]
+    fetcher = make_fetcher(providers)
+    started = time.perf_counter()
+    assert fetcher("USD") == {"USD": 1.0, "EUR": 0.9}
+    assert time.perf_counter() - started < 0.5
+    assert fetcher.breakers["broken"].failures == 1
+
+def test_race_raises_when_no_provider_is_valid(stub, make_fetcher):
+    providers = [route(stub, "broken", status=500), route(stub, "rebased", {"USD": 1.1, "EUR": 0.9})]
+    with pytest.raises(ProviderError):
+        make_fetcher(providers)("USD")
+
+def test_median_consensus_ignores_failures_and_missing_currencies(stub, make_fetcher):
+    providers = [
+        route(stub, "a", {"USD": 1.0, "EUR": 0.90, "GBP": 0.78}),
+        route(stub, "b", {"USD": 1.0, "EUR": 0.95, "GBP": 0.80, "JPY": 150.0}),
+        route(stub, "c", {"EUR": 0.92}, base_in_rates=False),
+        route(stub, "broken", status=503),
+    ]
+    rates = make_fetcher(providers, strategy="median")("USD")
+    assert rates == pytest.approx({"USD": 1.0, "EUR": 0.92, "GBP": 0.79, "JPY": 150.0})
+
+def test_circuit_breaker_opens_recovers_and_reopens(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(rate_providers, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60.0)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now += 59.0
+    assert breaker.state == "open"
+    clock.now += 1.0
+    assert breaker.state == "half-open" and breaker.allow()
+    # A failed probe re-opens for a full cool-down
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 60.0
+    assert breaker.state == "half-open"
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_fetcher_skips_open_providers_and_probes_after_cool_down(stub, make_fetcher):
+    providers = [route(stub, "good", {"USD": 1.0, "EUR": 0.9}), route(stub, "flaky", status=500)]
+    fetcher = make_fetcher(providers, strategy="median")
+    fetcher.breakers["flaky"] = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    for _ in range(3):
+        fetcher("USD")
+    assert stub.hits["/flaky"] == 2
+    assert fetcher.breakers["flaky"].state == "open"
+    time.sleep(0.25)
+    fetcher("USD")
+    assert stub.hits["/flaky"] == 3
+    assert fetcher.breakers["flaky"].state == "open"
+    stub.routes["/flaky"] = {"payload": {"rates": {"USD": 1.0, "EUR": 0.92}}}
+    time.sleep(0.25)
+    assert fetcher("USD") == pytest.approx({"USD": 1.0, "EUR": 0.91})
+    assert fetcher.breakers["flaky"].state == "closed"
+
+def test_fetcher_reuses_rates_on_304(stub, make_fetcher):
+    fetcher = make_fetcher([route(stub, "tagged", {"USD": 1.0, "EUR": 0.9}, etag='"v1"')])
+    assert fetcher("USD") == {"USD": 1.0, "EUR": 0.9}
+    assert fetcher("USD") == {"USD": 1.0, "EUR": 0.9}
+    assert stub.request_headers["/tagged"]["If-None-Match"] == '"v1"'
+    assert (fetcher.stats.requests, fetcher.stats.not_modified) == (2, 1)
+    stub.routes["/tagged"] = {"payload": {"rates": {"USD": 1.0, "EUR": 0.91}}, "etag": '"v2"'}
+    assert fetcher("USD") == {"USD": 1.0, "EUR": 0.91}
+    assert fetcher.stats.not_modified == 1
+
+def test_http_client_sends_validators_only_when_given_some(stub):
+    route(stub, "tagged", {"USD": 1.0, "EUR": 0.9}, etag='"v1"')
+    route(stub, "untagged", {"USD": 1.0, "EUR": 0.9})
+    for path, expected_not_modified in (("tagged", 1), ("untagged", 0)):
+        client = HttpRateClient(f"{stub.url}/{path}?base={{base}}")
+        assert client("USD") == client("USD") == {"USD": 1.0, "EUR": 0.9}
+        assert client.stats.not_modified == expected_not_modified
+        assert ("If-None-Match" in stub.request_headers[f"/{path}"]) == bool(expected_not_modified)
+        client.close()